@@ -4,7 +4,19 @@ from sqlmodel import Session
 from app.core.auth import get_current_user
 from app.core.db import get_db
 from app.schemas.auth import UserIn
+from app.services.alpha_vantage_service import (
+    AlphaVantageClient,
+    get_alpha_vantage_client,
+)
+from app.services.market_data_service import (
+    MarketDataProvider,
+    get_market_data_provider,
+)
+from app.services.quote_stream_service import QuoteHub, get_quote_hub
 
 
 CurrentUser = Annotated[UserIn, Depends(get_current_user)]
 SessionDep = Annotated[Session, Depends(get_db)]
+MarketDataDep = Annotated[MarketDataProvider, Depends(get_market_data_provider)]
+QuoteHubDep = Annotated[QuoteHub, Depends(get_quote_hub)]
+AlphaVantageDep = Annotated[AlphaVantageClient, Depends(get_alpha_vantage_client)]
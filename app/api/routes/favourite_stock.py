@@ -2,12 +2,13 @@ from fastapi import APIRouter, status, HTTPException
 from fastapi import Depends
 
 from app.api.dependencies.profile import get_current_profile
-from app.api.deps import SessionDep
+from app.api.deps import MarketDataDep, SessionDep
 from app.models.favourite_stock import FavouriteStock
 from app.schemas.favourite_stock import FavouriteStockCreate, FavouriteStockUpdate
 from app.services import favourite_stock_service
+from app.services import ticker_cache_service
 from app.services.user_profile_service import get_user_profile_by_auth
-import yfinance as yf
+import anyio
 
 
 router = APIRouter(prefix="/favourite-stocks", tags=["favourite stocks"])
@@ -17,6 +18,7 @@ router = APIRouter(prefix="/favourite-stocks", tags=["favourite stocks"])
 def add_favourite(
     payload: FavouriteStockCreate,
     db: SessionDep,
+    market_data: MarketDataDep,
     user=Depends(get_current_profile),
 ):
     profile = get_user_profile_by_auth(db, auth_id=user.id)
@@ -38,11 +40,15 @@ def add_favourite(
         )
 
     try:
-        ticker = yf.Ticker(payload.symbol)
-        info = ticker.info
+        # Sync route: hop back onto the event loop to use the shared info cache
+        info = anyio.from_thread.run(
+            ticker_cache_service.get_ticker_info, market_data, payload.symbol
+        )
         payload.symbol = info.get("symbol", payload.symbol).upper()
         payload.exchange = info.get("exchange", "Unknown")
         payload.company_name = info.get("longName", "Unknown")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=400, detail=f"Invalid symbol '{payload.symbol}': {str(e)}"
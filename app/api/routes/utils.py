@@ -1,8 +1,53 @@
 from fastapi import APIRouter
 
+from app.api.deps import AlphaVantageDep, MarketDataDep, QuoteHubDep
+from app.services import (
+    fundamentals_service,
+    history_service,
+    indicator_service,
+    market_service,
+    news_service,
+    screener_service,
+    symbol_index_service,
+    ticker_cache_service,
+)
+from app.services.prefetch_service import get_prefetch_scheduler
+from app.services.screener_service import get_equity_universe_store
+from app.services.sector_service import get_sector_snapshot_store
+
 router = APIRouter(prefix="/utils", tags=["utils"])
 
 
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
+
+
+@router.get("/market-data-stats/")
+async def market_data_stats(
+    market_data: MarketDataDep,
+    quote_hub: QuoteHubDep,
+    alpha_vantage: AlphaVantageDep,
+) -> dict:
+    """
+    Upstream gateway and cache counters, e.g. how many market data calls were
+    deduplicated by single-flight coalescing.
+    """
+    return {
+        "provider": market_data.stats(),
+        "caches": [
+            *ticker_cache_service.get_cache_stats(),
+            fundamentals_service.get_cache_stats(),
+            news_service.get_cache_stats(),
+            indicator_service.get_cache_stats(),
+            history_service.get_cache_stats(),
+            market_service.get_cache_stats(),
+            screener_service.get_cache_stats(),
+        ],
+        "quote_stream": quote_hub.stats(),
+        "alpha_vantage": alpha_vantage.stats(),
+        "symbol_index": symbol_index_service.get_stats(),
+        "prefetch": get_prefetch_scheduler().stats(),
+        "sector_snapshots": get_sector_snapshot_store().stats(),
+        "equity_universe": get_equity_universe_store().stats(),
+    }
@@ -1,10 +1,9 @@
-import json
 from fastapi import APIRouter, Depends, HTTPException, status
-import yfinance as yf
-
 from app.api.dependencies.profile import get_current_profile
-from app.schemas.stocks import TickerInfoResponse
+from app.api.deps import MarketDataDep
+from app.services.sector_service import get_sector_snapshot_store
 from app.utils.global_variables import SECTOR_INDUSTRY_MAP
+from app.utils.serialization import RawJSONResponse
 
 
 router = APIRouter(prefix="/industry", tags=["industry"])
@@ -23,26 +22,23 @@ async def get_sector_industry_list(
 @router.get("/info/{industry}")
 async def get_industry_info(
     industry: str,
+    market_data: MarketDataDep,
     user=Depends(get_current_profile),
 ):
     """
-    Retrieve summary information for a given sector using Yahoo Finance.
+    Retrieve summary information for a given industry using Yahoo Finance,
+    served from the background-refreshed industry snapshot.
     """
 
     industry = industry.lower()
 
     try:
-        sector_data = yf.Industry(industry)
-        response_data = {
-            "sector": sector_data.name,
-            "symbol": sector_data.symbol,
-            "overview": sector_data.overview,
-            "research_reports": sector_data.research_reports,
-            "industry_info": TickerInfoResponse(**sector_data.ticker.info).model_dump(),
-        }
-
-        response_data = json.loads(json.dumps(response_data, default=str))
-        return response_data
+        snapshot = await get_sector_snapshot_store().get(
+            market_data, "industry", industry
+        )
+        return RawJSONResponse(snapshot.render("info"))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -51,7 +47,10 @@ async def get_industry_info(
 
 @router.get("/top-companies/{industry}")
 async def get_industry_top_companies(
-    industry: str, user=Depends(get_current_profile), limit: int = 25
+    industry: str,
+    market_data: MarketDataDep,
+    user=Depends(get_current_profile),
+    limit: int = 25,
 ):
     """
     Retrieve top companies in a given industry.
@@ -59,25 +58,12 @@ async def get_industry_top_companies(
     industry = industry.lower()
 
     try:
-        industry_data = yf.Industry(industry)
-        top_companies = industry_data.top_companies[:limit]
-        top_growth_companies = industry_data.top_growth_companies[:limit]
-        top_performing_companies = industry_data.top_performing_companies[:limit]
-
-        response_data = {
-            "industry": industry_data.name,
-            "symbol": industry_data.symbol,
-            "top_companies": top_companies.reset_index().to_dict(orient="records"),
-            "top_growth_companies": top_growth_companies.reset_index().to_dict(
-                orient="records"
-            ),
-            "top_performing_companies": top_performing_companies.reset_index().to_dict(
-                orient="records"
-            ),
-        }
-
-        response_data = json.loads(json.dumps(response_data, default=str))
-        return response_data
+        snapshot = await get_sector_snapshot_store().get(
+            market_data, "industry", industry
+        )
+        return RawJSONResponse(snapshot.render("top_companies", limit))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
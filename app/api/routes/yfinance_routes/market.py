@@ -1,34 +1,18 @@
-from datetime import datetime, tzinfo
-import json
-from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
-import yfinance as yf
-
 from app.api.dependencies.profile import get_current_profile
+from app.api.deps import MarketDataDep
+from app.services import market_service
 from app.utils.global_variables import MARKETS
+from app.utils.serialization import FastJSONResponse
 
 
 router = APIRouter(prefix="/market", tags=["market"])
 
 
-def safe_json(obj: Any):
-    """Recursively convert complex types (datetime, tzinfo, etc.) to JSON-serializable forms."""
-    if isinstance(obj, dict):
-        return {k: safe_json(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [safe_json(v) for v in obj]
-    elif isinstance(obj, (datetime,)):
-        return obj.isoformat()
-    elif isinstance(obj, tzinfo):
-        return str(obj)
-    elif hasattr(obj, "__dict__"):
-        return {k: safe_json(v) for k, v in vars(obj).items()}
-    else:
-        return obj
-
-
 @router.get("/yf/info/{market_indicator}")
-async def get_market_info(market_indicator: str, user=Depends(get_current_profile)):
+async def get_market_info(
+    market_indicator: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     """
     Get the current status of a market (open/closed).
 
@@ -46,16 +30,16 @@ async def get_market_info(market_indicator: str, user=Depends(get_current_profil
         )
 
     try:
-        market = yf.Market(market_indicator)
-        market_data = market.summary
+        market = await market_data.get_attrs("market", market_indicator, ["summary"])
 
         response_data = {
             "market": market_indicator,
-            "info": market_data,
+            "info": market["summary"],
         }
 
-        response_data = json.loads(json.dumps(response_data, default=str))
-        return response_data
+        return FastJSONResponse(response_data)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -63,36 +47,37 @@ async def get_market_info(market_indicator: str, user=Depends(get_current_profil
 
 
 @router.get("/yf/status/{market_indicator}")
-async def get_market_status(market_indicator: str, user=Depends(get_current_profile)):
+async def get_market_status(
+    market_indicator: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     """
-    Fetch current market status using Yahoo Finance's Market API.
+    Current market status (open/closed, session, next open and close), computed
+    from the local trading calendar. Accepts a market from MARKETS, whose
+    details also carry Yahoo's status fields (open, close, message, timezone),
+    or a Yahoo exchange code. The status is "unknown" when the exchange may be
+    closed for a holiday the calendar does not model.
 
     Example:
         /api/v1/market/yf/status/US
         /api/v1/market/yf/status/ASIA
+        /api/v1/market/yf/status/LSE
     """
     market_indicator = market_indicator.upper()
 
-    # Optional validation
-    if "MARKETS" in globals() and market_indicator not in MARKETS:
+    try:
+        market_status = await market_service.get_market_status(
+            market_data, market_indicator
+        )
+    except KeyError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid market. Supported markets: {', '.join(MARKETS.keys())}",
+            detail=f"Invalid market. Supported markets: {', '.join(sorted(MARKETS))}",
         )
 
-    try:
-        market_obj = yf.Market(market_indicator)
-        market_status = market_obj.status
-        serializable_status = safe_json(market_status)
-
-        return {
+    return FastJSONResponse(
+        {
             "market": market_indicator,
-            "status": serializable_status.get("status", "unknown"),
-            "details": serializable_status,
+            "status": market_status["status"],
+            "details": market_status,
         }
-
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch market status: {str(e)}",
-        )
+    )
@@ -4,15 +4,15 @@ import yfinance as yf
 from fastapi import HTTPException
 
 from app.api.dependencies.profile import get_current_profile
+from app.api.deps import MarketDataDep
 from app.schemas.screener import ScreenTickerInfo, ScreenerRequest
+from app.services import screener_service
 from app.utils.global_variables import (
     CURATED_EQUITY_SCREENERS,
     CURATED_FUND_SCREENERS,
     SCREENER_LOGICAL_OPERATORS,
 )
 from app.utils.screener import (
-    build_equity_query,
-    build_fund_query,
     load_valid_equity_attributes,
     load_valid_fund_attributes,
 )
@@ -61,6 +61,7 @@ async def get_fund_screener_valid_fields(user=Depends(get_current_profile)):
 
 @router.get("/curated")
 async def get_curated_screen(
+    market_data: MarketDataDep,
     asset_type: str = Literal["equity", "fund"],
     limit: int = 10,
     user=Depends(get_current_profile),
@@ -88,11 +89,13 @@ async def get_curated_screen(
         )
 
     try:
-        data = yf.screen(
+        data = await screener_service.run_named_screen(
+            market_data,
+            f"{asset_type}:popular",
             screener["query"],
-            size=limit,
-            sortField=screener["sort_field"],
-            sortAsc=screener["sort_asc"],
+            limit=limit,
+            sort_field=screener["sort_field"],
+            sort_asc=screener["sort_asc"],
         )
 
         quotes = data.get("quotes", [])
@@ -104,6 +107,8 @@ async def get_curated_screen(
             "results": [ScreenTickerInfo(**q) for q in quotes],
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -114,6 +119,7 @@ async def get_curated_screen(
 @router.get("/predefined-queries-result/{category}")
 async def get_results_by_pre_defined_queries(
     category: str,
+    market_data: MarketDataDep,
     limit: int = 25,
     user=Depends(get_current_profile),
 ):
@@ -130,7 +136,9 @@ async def get_results_by_pre_defined_queries(
         )
 
     try:
-        data = yf.screen(category, count=limit)
+        data = await screener_service.run_predefined_screen(
+            market_data, category, limit=limit
+        )
         quotes = data.get("quotes", [])
         total = data.get("count", 0)
 
@@ -140,13 +148,17 @@ async def get_results_by_pre_defined_queries(
             "results": [ScreenTickerInfo(**quote) for quote in quotes],
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch data: {str(e)}")
 
 
 @router.post("/custom-equity-query-results")
 async def custom_equity_query(
-    request: ScreenerRequest, user=Depends(get_current_profile)
+    request: ScreenerRequest,
+    market_data: MarketDataDep,
+    user=Depends(get_current_profile),
 ):
     """
     Run a custom equity query based on user-defined conditions.
@@ -164,13 +176,8 @@ async def custom_equity_query(
                 detail=f"Invalid operator: {i.operator}",
             )
 
-    # Build query
-    query = build_equity_query(request.conditions, request.logical_operator)
-
-    # Run query
-    results = yf.screen(
-        query, size=request.limit, sortField=request.sort_field, sortAsc=True
-    )
+    # Build, canonicalise and run the query (shared with identical screens)
+    results = await screener_service.run_custom_screen(market_data, "equity", request)
 
     quotes = results.get("quotes", [])
 
@@ -182,7 +189,9 @@ async def custom_equity_query(
 
 @router.post("/custom-fund-query-results")
 async def custom_fund_query(
-    request: ScreenerRequest, user=Depends(get_current_profile)
+    request: ScreenerRequest,
+    market_data: MarketDataDep,
+    user=Depends(get_current_profile),
 ):
     """
     Run a custom fund query based on user-defined conditions.
@@ -200,13 +209,8 @@ async def custom_fund_query(
                 detail=f"Invalid operator: {i.operator}",
             )
 
-    # Build query
-    query = build_fund_query(request.conditions, request.logical_operator)
-
-    # Run query
-    results = yf.screen(
-        query, size=request.limit, sortField=request.sort_field, sortAsc=True
-    )
+    # Build, canonicalise and run the query (shared with identical screens)
+    results = await screener_service.run_custom_screen(market_data, "fund", request)
 
     quotes = results.get("quotes", [])
 
@@ -1,9 +1,9 @@
-import json
 from fastapi import APIRouter, Depends, HTTPException, status
-import yfinance as yf
 from app.api.dependencies.profile import get_current_profile
-from app.schemas.stocks import TickerInfoResponse
+from app.api.deps import MarketDataDep
+from app.services.sector_service import get_sector_snapshot_store
 from app.utils.global_variables import SECTOR_INDUSTRY_MAP
+from app.utils.serialization import RawJSONResponse
 
 
 router = APIRouter(prefix="/sector", tags=["sector"])
@@ -34,9 +34,12 @@ async def get_industries_by_sector(sector: str, user=Depends(get_current_profile
 
 
 @router.get("/info/{sector}")
-async def get_sector_info(sector: str, user=Depends(get_current_profile)):
+async def get_sector_info(
+    sector: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     """
-    Retrieve summary information for a given sector using Yahoo Finance.
+    Retrieve summary information for a given sector using Yahoo Finance,
+    served from the background-refreshed sector snapshot.
     """
 
     sector = sector.lower()
@@ -47,17 +50,10 @@ async def get_sector_info(sector: str, user=Depends(get_current_profile)):
         }
 
     try:
-        sector_data = yf.Sector(sector)
-        response_data = {
-            "sector": sector_data.name,
-            "symbol": sector_data.symbol,
-            "overview": sector_data.overview,
-            "research_reports": sector_data.research_reports,
-            "sector_info": TickerInfoResponse(**sector_data.ticker.info).model_dump(),
-        }
-
-        response_data = json.loads(json.dumps(response_data, default=str))
-        return response_data
+        snapshot = await get_sector_snapshot_store().get(market_data, "sector", sector)
+        return RawJSONResponse(snapshot.render("info"))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -66,7 +62,10 @@ async def get_sector_info(sector: str, user=Depends(get_current_profile)):
 
 @router.get("/top-companies/{sector}")
 async def get_sector_top_companies(
-    sector: str, user=Depends(get_current_profile), limit: int = 25
+    sector: str,
+    market_data: MarketDataDep,
+    user=Depends(get_current_profile),
+    limit: int = 25,
 ):
     """
     Retrieve top companies in a given sector using Yahoo Finance.
@@ -80,16 +79,10 @@ async def get_sector_top_companies(
         }
 
     try:
-        sector_data = yf.Sector(sector)
-        top_companies = sector_data.top_companies[:limit]
-        response_data = {
-            "sector": sector_data.name,
-            "symbol": sector_data.symbol,
-            "top_companies": top_companies.reset_index().to_dict(orient="records"),
-        }
-
-        response_data = json.loads(json.dumps(response_data, default=str))
-        return response_data
+        snapshot = await get_sector_snapshot_store().get(market_data, "sector", sector)
+        return RawJSONResponse(snapshot.render("top_companies", limit))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -98,7 +91,10 @@ async def get_sector_top_companies(
 
 @router.get("/top-etfs/{sector}")
 async def get_sector_top_etfs(
-    sector: str, user=Depends(get_current_profile), limit: int = 25
+    sector: str,
+    market_data: MarketDataDep,
+    user=Depends(get_current_profile),
+    limit: int = 25,
 ):
     """
     Retrieve top ETFs in a given sector using Yahoo Finance.
@@ -112,21 +108,10 @@ async def get_sector_top_etfs(
         }
 
     try:
-        sector_data = yf.Sector(sector)
-        if len(sector_data.top_etfs) == 0:
-            return {"error": f"No ETF data available for sector '{sector}'."}
-        top_etfs_list = [
-            {"symbol": symbol, "name": name}
-            for symbol, name in list(sector_data.top_etfs.items())[:limit]
-        ]
-        response_data = {
-            "sector": sector_data.name,
-            "symbol": sector_data.symbol,
-            "top_etfs": top_etfs_list,
-        }
-
-        response_data = json.loads(json.dumps(response_data, default=str))
-        return response_data
+        snapshot = await get_sector_snapshot_store().get(market_data, "sector", sector)
+        return RawJSONResponse(snapshot.render("top_etfs", limit))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -135,7 +120,10 @@ async def get_sector_top_etfs(
 
 @router.get("/top-mutual-funds/{sector}")
 async def get_sector_top_mutual_funds(
-    sector: str, user=Depends(get_current_profile), limit: int = 25
+    sector: str,
+    market_data: MarketDataDep,
+    user=Depends(get_current_profile),
+    limit: int = 25,
 ):
     """
     Retrieve top mutual funds in a given sector using Yahoo Finance.
@@ -149,21 +137,10 @@ async def get_sector_top_mutual_funds(
         }
 
     try:
-        sector_data = yf.Sector(sector)
-        if len(sector_data.top_mutual_funds) == 0:
-            return {"error": f"No mutual fund data available for sector '{sector}'."}
-        top_mutual_funds_list = [
-            {"symbol": symbol, "name": name}
-            for symbol, name in list(sector_data.top_mutual_funds.items())[:limit]
-        ]
-        response_data = {
-            "sector": sector_data.name,
-            "symbol": sector_data.symbol,
-            "top_mutual_funds": top_mutual_funds_list,
-        }
-
-        response_data = json.loads(json.dumps(response_data, default=str))
-        return response_data
+        snapshot = await get_sector_snapshot_store().get(market_data, "sector", sector)
+        return RawJSONResponse(snapshot.render("top_mutual_funds", limit))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -1,32 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+from typing import Literal
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Request,
+    WebSocket,
+    status,
+)
+from fastapi.security import HTTPAuthorizationCredentials
 from fastapi.params import Query
-import yfinance as yf
-import requests
+from fastapi.responses import StreamingResponse
 from app.api.dependencies.profile import get_current_profile
+from app.api.deps import AlphaVantageDep, MarketDataDep, QuoteHubDep
+from app.core.auth import get_current_user, get_supabase_anon_client
 from app.core.config import settings
 from app.schemas.stocks import (
     SearchResponse,
     TickerFastInfoResponse,
-    TickerHistory,
     TickerInfoResponse,
     TickersRequest,
 )
+from app.services import (
+    bundle_service,
+    correlation_service,
+    fundamentals_service,
+    history_service,
+    indicator_service,
+    news_service,
+    quote_service,
+    symbol_index_service,
+    ticker_cache_service,
+)
 from app.utils.global_variables import STOCK_INTERVALS, STOCK_PERIODS
-from app.utils.stocks import get_regular_market_change
+from app.utils.serialization import FastJSONResponse, dumps, frame_to_records
+from app.utils.stocks import (
+    downsample_history,
+    get_regular_market_change,
+    history_to_columns,
+    history_to_records,
+)
 
 
 router = APIRouter(prefix="/stocks", tags=["stocks"])
 
 
-@router.get("/av/get-ticker-info/{symbol}")
-async def get_alpha_vantage_ticker_data(symbol: str, user=Depends(get_current_profile)):
-    api_key = settings.ALPHA_VANTAGE_API_KEY
-    av_url = settings.ALPHA_VANTAGE_BASE_URL
-    url = f"{av_url}?function=OVERVIEW&symbol={symbol}&apikey={api_key}"
+def _parse_symbols(symbols: str | None) -> list[str]:
+    return [s.strip().upper() for s in (symbols or "").split(",") if s.strip()]
 
+
+@router.get("/av/get-ticker-info/{symbol}")
+async def get_alpha_vantage_ticker_data(
+    symbol: str, alpha_vantage: AlphaVantageDep, user=Depends(get_current_profile)
+):
     try:
-        response = requests.get(url)
-        data = response.json()
+        data = await alpha_vantage.get_overview(symbol)
         if "Error Message" in data:
             return {"error": data["Error Message"]}
         return data
@@ -40,10 +69,13 @@ async def get_alpha_vantage_ticker_data(symbol: str, user=Depends(get_current_pr
 
 
 @router.get("/get-ticker-info/{symbol}")
-async def get_ticker_info(symbol: str, user=Depends(get_current_profile)):
+async def get_ticker_info(
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     try:
-        ticker_data = yf.Ticker(symbol)
-        info = TickerInfoResponse(**ticker_data.get_info())
+        info = TickerInfoResponse(
+            **await ticker_cache_service.get_ticker_info(market_data, symbol)
+        )
         if info is None or info.symbol is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -60,31 +92,63 @@ async def get_ticker_info(symbol: str, user=Depends(get_current_profile)):
 
 
 @router.post("/get-tickers-info")
-async def get_tickers_info(request: TickersRequest, user=Depends(get_current_profile)):
-    try:
-        tickers_data = yf.Tickers(" ".join(request.symbols))
-        results = {}
-
-        for symbol in request.symbols:
-            info = tickers_data.tickers[symbol].get_info()
-            results[symbol] = TickerInfoResponse(**info)
+async def get_tickers_info(
+    request: TickersRequest,
+    market_data: MarketDataDep,
+    user=Depends(get_current_profile),
+    concurrency: int = Query(
+        settings.TICKERS_INFO_CONCURRENCY,
+        ge=1,
+        le=32,
+        description="Maximum number of symbols fetched in parallel",
+    ),
+    deadline: float = Query(
+        settings.TICKERS_INFO_DEADLINE_SECONDS,
+        gt=0,
+        le=60,
+        description="Overall deadline in seconds; unfinished symbols are reported as errors",
+    ),
+    stream: bool = Query(
+        False, description="Stream each result as NDJSON as soon as it is ready"
+    ),
+):
+    infos = ticker_cache_service.iter_ticker_infos(
+        market_data, request.symbols, concurrency=concurrency, deadline=deadline
+    )
+
+    if stream:
+
+        async def ndjson_lines():
+            async for symbol, info, error in infos:
+                if error:
+                    line = {"symbol": symbol, "error": error}
+                else:
+                    line = {"symbol": symbol, "result": info.model_dump(mode="json")}
+                yield dumps(line) + b"\n"
+
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+    results, errors = {}, {}
+    async for symbol, info, error in infos:
+        if error:
+            errors[symbol] = error
+        else:
+            results[symbol] = info
 
-        return results
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch fast info for '{symbol}': {str(e)}",
-        )
+    return {
+        "results": {s: results[s] for s in request.symbols if s in results},
+        "errors": errors,
+    }
 
 
 @router.get("/get-ticker-fast-info/{symbol}")
-async def get_ticker_fast_info(symbol: str, user=Depends(get_current_profile)):
+async def get_ticker_fast_info(
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     try:
-        ticker_data = yf.Ticker(symbol)
         fast_info = TickerFastInfoResponse(
-            symbol=symbol.upper(), **ticker_data.get_fast_info()
+            symbol=symbol.upper(),
+            **await ticker_cache_service.get_ticker_fast_info(market_data, symbol),
         )
         return fast_info
     except HTTPException:
@@ -98,36 +162,31 @@ async def get_ticker_fast_info(symbol: str, user=Depends(get_current_profile)):
 
 @router.post("/get-tickers-fast-info")
 async def get_tickers_fast_info(
-    request: TickersRequest, user=Depends(get_current_profile)
+    request: TickersRequest,
+    market_data: MarketDataDep,
+    user=Depends(get_current_profile),
 ):
     try:
-        tickers_data = yf.Tickers(" ".join(request.symbols))
-        results = {}
-        for symbol in request.symbols:
-            try:
-                fi = tickers_data.tickers[symbol].fast_info
-                results[symbol] = TickerFastInfoResponse(symbol=symbol.upper(), **fi)
-            except Exception as inner_e:
-                results[symbol] = {"error": str(inner_e)}
-
+        results = await quote_service.get_batch_fast_info(market_data, request.symbols)
         return {"results": results}
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch fast info for '{symbol}': {str(e)}",
+            detail=f"Failed to fetch fast info for {request.symbols}: {str(e)}",
         )
 
 
 @router.get("/get-ticker-major-holders/{symbol}")
-async def get_ticker_major_holders(symbol: str, user=Depends(get_current_profile)):
+async def get_ticker_major_holders(
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     try:
-        ticker_data = yf.Ticker(symbol)
-        major_holders = ticker_data.major_holders
+        major_holders = await market_data.get_ticker_attr(symbol, "major_holders")
         if major_holders is None or len(major_holders) == 0:
             return {"symbol": symbol, "major_holders": {}}
-        return {"symbol": symbol, "major_holders": major_holders}
+        return FastJSONResponse({"symbol": symbol, "major_holders": major_holders})
     except HTTPException:
         raise
     except Exception as e:
@@ -138,15 +197,16 @@ async def get_ticker_major_holders(symbol: str, user=Depends(get_current_profile
 
 
 @router.get("/get-ticker-earnings/{symbol}")
-async def get_ticker_earnings(symbol: str, user=Depends(get_current_profile)):
+async def get_ticker_earnings(
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     try:
-        ticker_data = yf.Ticker(symbol)
-        earnings = ticker_data.earnings
+        earnings = await fundamentals_service.get_fundamental(
+            market_data, symbol, "earnings"
+        )
         if earnings is None or earnings.empty:
             return {"symbol": symbol, "earnings": []}
-        earnings = earnings.fillna(0)
-        earnings = earnings.reset_index().to_dict(orient="records")
-        return earnings
+        return FastJSONResponse(frame_to_records(earnings, fill_nan=0))
     except HTTPException:
         raise
     except Exception as e:
@@ -157,13 +217,16 @@ async def get_ticker_earnings(symbol: str, user=Depends(get_current_profile)):
 
 
 @router.get("/get-ticker-earnings-history/{symbol}")
-async def get_ticker_earnings_history(symbol: str, user=Depends(get_current_profile)):
+async def get_ticker_earnings_history(
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     try:
-        ticker_data = yf.Ticker(symbol)
-        eh = ticker_data.earnings_history
+        eh = await fundamentals_service.get_fundamental(
+            market_data, symbol, "earnings_history"
+        )
         if eh is None or len(eh) == 0:
             return {"symbol": symbol, "earnings_history": {}}
-        return {"symbol": symbol, "earnings_history": eh}
+        return FastJSONResponse({"symbol": symbol, "earnings_history": eh})
     except HTTPException:
         raise
     except Exception as e:
@@ -174,15 +237,18 @@ async def get_ticker_earnings_history(symbol: str, user=Depends(get_current_prof
 
 
 @router.get("/get-ticker-earnings-estimate/{symbol}")
-async def get_ticker_earnings_estimates(symbol: str, user=Depends(get_current_profile)):
+async def get_ticker_earnings_estimates(
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     try:
-        ticker_data = yf.Ticker(symbol)
-        ee = ticker_data.earnings_estimate
+        ee = await fundamentals_service.get_fundamental(
+            market_data, symbol, "earnings_estimate"
+        )
         if ee is None or ee.empty:
             return {"symbol": symbol, "earnings_estimates": []}
-        ee = ee.fillna(0)
-        ee = ee.reset_index().to_dict(orient="records")
-        return {"symbol": symbol, "earnings_estimates": ee}
+        return FastJSONResponse(
+            {"symbol": symbol, "earnings_estimates": frame_to_records(ee, fill_nan=0)}
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -193,15 +259,18 @@ async def get_ticker_earnings_estimates(symbol: str, user=Depends(get_current_pr
 
 
 @router.get("/get-ticker-revenue-estimate/{symbol}")
-async def get_ticker_revenue_estimates(symbol: str, user=Depends(get_current_profile)):
+async def get_ticker_revenue_estimates(
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     try:
-        ticker_data = yf.Ticker(symbol)
-        re = ticker_data.revenue_estimate
+        re = await fundamentals_service.get_fundamental(
+            market_data, symbol, "revenue_estimate"
+        )
         if re is None or re.empty:
             return {"symbol": symbol, "revenue_estimate": []}
-        re = re.fillna(0)
-        re = re.reset_index().to_dict(orient="records")
-        return {"symbol": symbol, "revenue_estimate": re}
+        return FastJSONResponse(
+            {"symbol": symbol, "revenue_estimate": frame_to_records(re, fill_nan=0)}
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -212,15 +281,18 @@ async def get_ticker_revenue_estimates(symbol: str, user=Depends(get_current_pro
 
 
 @router.get("/get-ticker-growth-estimates/{symbol}")
-async def get_ticker_growth_estimates(symbol: str, user=Depends(get_current_profile)):
+async def get_ticker_growth_estimates(
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     try:
-        ticker_data = yf.Ticker(symbol)
-        ge = ticker_data.growth_estimates
+        ge = await fundamentals_service.get_fundamental(
+            market_data, symbol, "growth_estimates"
+        )
         if ge is None or ge.empty:
             return {"symbol": symbol, "growth_estimates": []}
-        ge = ge.fillna(0)
-        ge = ge.reset_index().to_dict(orient="records")
-        return {"symbol": symbol, "growth_estimates": ge}
+        return FastJSONResponse(
+            {"symbol": symbol, "growth_estimates": frame_to_records(ge, fill_nan=0)}
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -231,15 +303,18 @@ async def get_ticker_growth_estimates(symbol: str, user=Depends(get_current_prof
 
 
 @router.get("/get-ticker-dividends/{symbol}")
-async def get_ticker_dividends(symbol: str, user=Depends(get_current_profile)):
+async def get_ticker_dividends(
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     try:
-        ticker = yf.Ticker(symbol)
-        dividends = ticker.dividends
+        dividends = await fundamentals_service.get_fundamental(
+            market_data, symbol, "dividends"
+        )
         if dividends is None or dividends.empty:
             return {"symbol": symbol, "dividends": []}
-        dividends = dividends.fillna(0)
-        dividends = ticker.dividends.reset_index().to_dict(orient="records")
-        return {"symbol": symbol, "dividends": dividends}
+        return FastJSONResponse(
+            {"symbol": symbol, "dividends": frame_to_records(dividends, fill_nan=0)}
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -250,15 +325,18 @@ async def get_ticker_dividends(symbol: str, user=Depends(get_current_profile)):
 
 
 @router.get("/get-ticker-splits/{symbol}")
-async def get_ticker_splits(symbol: str, user=Depends(get_current_profile)):
+async def get_ticker_splits(
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     try:
-        ticker = yf.Ticker(symbol)
-        splits = ticker.splits
+        splits = await fundamentals_service.get_fundamental(
+            market_data, symbol, "splits"
+        )
         if splits is None or splits.empty:
             return {"symbol": symbol, "splits": []}
-        splits = splits.fillna(0)
-        splits = splits.reset_index().to_dict(orient="records")
-        return {"symbol": symbol, "splits": splits}
+        return FastJSONResponse(
+            {"symbol": symbol, "splits": frame_to_records(splits, fill_nan=0)}
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -269,15 +347,18 @@ async def get_ticker_splits(symbol: str, user=Depends(get_current_profile)):
 
 
 @router.get("/get-ticker-balance-sheet/{symbol}")
-async def get_balance_sheet(symbol: str, user=Depends(get_current_profile)):
+async def get_balance_sheet(
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     try:
-        ticker = yf.Ticker(symbol)
-        bs = ticker.balance_sheet
+        bs = await fundamentals_service.get_fundamental(
+            market_data, symbol, "balance_sheet"
+        )
         if bs is None or bs.empty:
             return {"symbol": symbol, "balance_sheet": []}
-        bs = bs.fillna(0)
-        bs = bs.reset_index().to_dict(orient="records")
-        return {"symbol": symbol, "balance_sheet": bs}
+        return FastJSONResponse(
+            {"symbol": symbol, "balance_sheet": frame_to_records(bs, fill_nan=0)}
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -288,15 +369,16 @@ async def get_balance_sheet(symbol: str, user=Depends(get_current_profile)):
 
 
 @router.get("/get-ticker-cashflow/{symbol}")
-async def get_cashflow(symbol: str, user=Depends(get_current_profile)):
+async def get_cashflow(
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     try:
-        ticker = yf.Ticker(symbol)
-        cf = ticker.cashflow
+        cf = await fundamentals_service.get_fundamental(market_data, symbol, "cashflow")
         if cf is None or cf.empty:
             return {"symbol": symbol, "cashflow": []}
-        cf = cf.fillna(0)
-        cf = cf.reset_index().to_dict(orient="records")
-        return {"symbol": symbol, "cashflow": cf}
+        return FastJSONResponse(
+            {"symbol": symbol, "cashflow": frame_to_records(cf, fill_nan=0)}
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -307,13 +389,16 @@ async def get_cashflow(symbol: str, user=Depends(get_current_profile)):
 
 
 @router.get("/get-ticker-financials/{symbol}")
-async def get_financials(symbol: str, user=Depends(get_current_profile)):
+async def get_financials(
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     try:
-        ticker = yf.Ticker(symbol)
-        fin = ticker.financials
+        fin = await fundamentals_service.get_fundamental(
+            market_data, symbol, "financials"
+        )
         if fin is None or len(fin) == 0:
             return {"symbol": symbol, "financials": {}}
-        return {"symbol": symbol, "financials": fin}
+        return FastJSONResponse({"symbol": symbol, "financials": fin})
     except HTTPException:
         raise
     except Exception as e:
@@ -324,13 +409,12 @@ async def get_financials(symbol: str, user=Depends(get_current_profile)):
 
 
 @router.get("/get-ticker-sustainability/{symbol}")
-async def get_sustainability(symbol: str):
+async def get_sustainability(symbol: str, market_data: MarketDataDep):
     try:
-        ticker = yf.Ticker(symbol)
-        sus = ticker.sustainability
+        sus = await market_data.get_ticker_attr(symbol, "sustainability")
         if sus is None or len(sus) == 0:
             return {"symbol": symbol, "sustainability": {}}
-        return {"symbol": symbol, "sustainability": sus}
+        return FastJSONResponse({"symbol": symbol, "sustainability": sus})
     except HTTPException:
         raise
     except Exception as e:
@@ -341,13 +425,16 @@ async def get_sustainability(symbol: str):
 
 
 @router.get("/get-ticker-calendar/{symbol}")
-async def get_calendar(symbol: str, user=Depends(get_current_profile)):
+async def get_calendar(
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     try:
-        ticker = yf.Ticker(symbol)
-        cal = ticker.calendar
+        cal = await fundamentals_service.get_fundamental(
+            market_data, symbol, "calendar"
+        )
         if not cal or len(cal) == 0:
             return {"symbol": symbol, "calendar": {}}
-        return {"symbol": symbol, "calendar": cal}
+        return FastJSONResponse({"symbol": symbol, "calendar": cal})
     except HTTPException:
         raise
     except Exception as e:
@@ -358,13 +445,14 @@ async def get_calendar(symbol: str, user=Depends(get_current_profile)):
 
 
 @router.get("/get-ticker-analyst-price-targets/{symbol}")
-async def get_analyst_price_targets(symbol: str, user=Depends(get_current_profile)):
+async def get_analyst_price_targets(
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     try:
-        ticker = yf.Ticker(symbol)
-        apt = ticker.analyst_price_targets
+        apt = await market_data.get_ticker_attr(symbol, "analyst_price_targets")
         if apt is None or len(apt) == 0:
             return {"symbol": symbol, "analyst_price_targets": []}
-        return {"symbol": symbol, "analyst_price_targets": apt}
+        return FastJSONResponse({"symbol": symbol, "analyst_price_targets": apt})
     except HTTPException:
         raise
     except Exception as e:
@@ -380,25 +468,17 @@ async def get_analyst_price_targets(symbol: str, user=Depends(get_current_profil
 @router.get("/lookup-stocks/{query}")
 async def lookup_tickers(
     query: str,
+    market_data: MarketDataDep,
     user=Depends(get_current_profile),
     count: int = Query(10, description="Number of results to return"),
 ):
     try:
-        # Create Lookup object
-        lookup = yf.Lookup(query=query)
-
-        # get_stock returns a Pandas DataFrame
-        df = lookup.get_stock(count=count)
-
-        df = df.fillna("")
-
-        if df.empty:
-            return {"query": query, "results": []}
-
-        # Convert DataFrame to list of dicts for JSON response
-        results = df.to_dict(orient="records")
+        # Served from the local symbol index; Yahoo only when it has too few matches
+        results = await symbol_index_service.lookup(
+            market_data, query, kind="stock", count=count
+        )
 
-        return {"query": query, "results": results}
+        return FastJSONResponse({"query": query, "results": results})
 
     except HTTPException:
         raise
@@ -411,25 +491,17 @@ async def lookup_tickers(
 @router.get("/lookup-all/{query}")
 async def lookup_all(
     query: str,
+    market_data: MarketDataDep,
     user=Depends(get_current_profile),
     count: int = Query(10, description="Number of results to return"),
 ):
     try:
-        # Create Lookup object
-        lookup = yf.Lookup(query=query)
-
-        # get_stock returns a Pandas DataFrame
-        df = lookup.get_all(count=count)
-
-        df = df.fillna("")
-
-        if df.empty:
-            return {"query": query, "results": []}
+        # Served from the local symbol index; Yahoo only when it has too few matches
+        results = await symbol_index_service.lookup(
+            market_data, query, kind="all", count=count
+        )
 
-        # Convert DataFrame to list of dicts for JSON response
-        results = df.to_dict(orient="records")
-
-        return {"query": query, "results": results}
+        return FastJSONResponse({"query": query, "results": results})
 
     except HTTPException:
         raise
@@ -442,26 +514,22 @@ async def lookup_all(
 @router.get("/search-quotes/{query}")
 async def search_tickers(
     query: str,
+    market_data: MarketDataDep,
     user=Depends(get_current_profile),
     max_results: int = Query(10, description="Number of results to return"),
     recommended: int = Query(10, description="Recommended number of results to return"),
     enable_fuzzy_query: bool = Query(True, description="Enable fuzzy search"),
 ):
     try:
-        # Create Search object
-        search = yf.Search(
-            query=query,
+        # Served from the local symbol index; Yahoo only when it has too few matches
+        quotes = await symbol_index_service.search_quotes(
+            market_data,
+            query,
             max_results=max_results,
             recommended=recommended,
             enable_fuzzy_query=enable_fuzzy_query,
         )
 
-        # Run the search
-        search.search()
-
-        # Get quotes (stock results only)
-        quotes = search.quotes
-
         # Clean up output
         results = [SearchResponse(**item) for item in quotes]
 
@@ -478,6 +546,7 @@ async def search_tickers(
 @router.get("/search-all/{query}")
 async def search_all(
     query: str,
+    market_data: MarketDataDep,
     user=Depends(get_current_profile),
     max_results: int = Query(10, description="Number of results to return"),
     news_count: int = Query(10, description="Number of news results to return"),
@@ -486,23 +555,20 @@ async def search_all(
     enable_fuzzy_query: bool = Query(True, description="Enable fuzzy search"),
 ):
     try:
-        # Create Search object
-        search = yf.Search(
-            query=query,
+        # Run the search and get all results
+        all_results = await market_data.search(
+            query,
             max_results=max_results,
             news_count=news_count,
             lists_count=lists_count,
             recommended=recommended,
             enable_fuzzy_query=enable_fuzzy_query,
         )
+        symbol_index_service.add_search_quotes(
+            symbol_index_service.symbol_index, all_results.get("quotes")
+        )
 
-        # Run the search
-        search.search()
-
-        # Get all results
-        all_results = search.all
-
-        return {"query": query, "results": all_results}
+        return FastJSONResponse({"query": query, "results": all_results})
 
     except HTTPException:
         raise
@@ -516,11 +582,12 @@ async def search_all(
 
 
 @router.get("/get-ticker-news/{symbol}")
-async def get_ticker_news(symbol: str, user=Depends(get_current_profile)):
+async def get_ticker_news(
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     try:
-        ticker_data = yf.Ticker(symbol)
-        news = ticker_data.news
-        return news
+        news = await news_service.get_ticker_news(market_data, symbol)
+        return FastJSONResponse(news)
     except HTTPException:
         raise
     except Exception as e:
@@ -530,20 +597,59 @@ async def get_ticker_news(symbol: str, user=Depends(get_current_profile)):
         )
 
 
+@router.get("/get-tickers-news")
+async def get_tickers_news(
+    market_data: MarketDataDep,
+    user=Depends(get_current_profile),
+    symbols: str = Query(..., description="Comma-separated ticker symbols"),
+    limit: int = Query(20, ge=1, le=100, description="Articles per page"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+):
+    """
+    One deduplicated, newest-first news feed for many symbols. Articles found
+    under several symbols appear once, listing all of them.
+    """
+    requested = _parse_symbols(symbols)
+    if not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="No symbols given."
+        )
+    if len(requested) > settings.NEWS_FEED_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.NEWS_FEED_MAX_SYMBOLS} symbols per request.",
+        )
+
+    feed, errors = await news_service.get_news_feed(
+        market_data,
+        requested,
+        concurrency=settings.NEWS_FEED_CONCURRENCY,
+        deadline=settings.NEWS_FEED_DEADLINE_SECONDS,
+    )
+    try:
+        articles, next_cursor = news_service.paginate(feed, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return FastJSONResponse(
+        {"articles": articles, "next_cursor": next_cursor, "errors": errors}
+    )
+
+
 ### Analyst Recommendation Data Endpoints
 
 
 @router.get("/get-ticker-analyst-recommendations/{symbol}")
-async def get_analyst_recommendations(symbol: str, user=Depends(get_current_profile)):
+async def get_analyst_recommendations(
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
+):
     try:
-        ticker = yf.Ticker(symbol)
-        recs = ticker.recommendations
+        recs = await market_data.get_ticker_attr(symbol, "recommendations")
         if recs is None or recs.empty:
             return {"symbol": symbol, "recommendations": []}
-        return {
-            "symbol": symbol,
-            "recommendations": recs.reset_index().to_dict(orient="records"),
-        }
+        return FastJSONResponse(
+            {"symbol": symbol, "recommendations": frame_to_records(recs)}
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -558,17 +664,15 @@ async def get_analyst_recommendations(symbol: str, user=Depends(get_current_prof
 
 @router.get("yf/get-ticker-analyst-recommendations-summary/{symbol}")
 async def get_analyst_recommendations_summary(
-    symbol: str, user=Depends(get_current_profile)
+    symbol: str, market_data: MarketDataDep, user=Depends(get_current_profile)
 ):
     try:
-        ticker = yf.Ticker(symbol)
-        ars = ticker.recommendations_summary
+        ars = await market_data.get_ticker_attr(symbol, "recommendations_summary")
         if ars is None or ars.empty:
             return {"symbol": symbol, "recommendations_summary": []}
-        return {
-            "symbol": symbol,
-            "recommendations_summary": ars.reset_index().to_dict(orient="records"),
-        }
+        return FastJSONResponse(
+            {"symbol": symbol, "recommendations_summary": frame_to_records(ars)}
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -587,6 +691,7 @@ async def get_analyst_recommendations_summary(
 )
 async def get_ticker_history_simple(
     symbol: str,
+    market_data: MarketDataDep,
     user=Depends(get_current_profile),
     period: str = Query(
         "1mo",
@@ -596,6 +701,19 @@ async def get_ticker_history_simple(
         "1d",
         description=f"Valid intervals: {', '.join(list(STOCK_INTERVALS))} (Intraday data cannot extend last 60 days)",
     ),
+    orient: Literal["records", "columns"] = Query(
+        "records",
+        description="records: one object per bar. columns: {timestamp: [...], open: [...], ...}",
+    ),
+    max_points: int | None = Query(
+        None,
+        ge=3,
+        description="Downsample to at most this many bars (e.g. the chart width in pixels)",
+    ),
+    downsample: Literal["ohlc", "lttb"] = Query(
+        "ohlc",
+        description="ohlc: aggregate bars into candles. lttb: keep the bars that best preserve the close line",
+    ),
 ):
     if interval not in STOCK_INTERVALS:
         raise HTTPException(
@@ -608,19 +726,18 @@ async def get_ticker_history_simple(
             detail=f"Invalid period '{period}'. Must be one of {sorted(list(STOCK_PERIODS))}",
         )
     try:
-        ticker_data = yf.Ticker(symbol)
-        history = ticker_data.history(interval=interval, period=period)
+        history = await history_service.get_history(
+            market_data, symbol, interval=interval, period=period
+        )
 
         if history.empty:
             return {"symbol": symbol, "history": []}
 
-        history = history.reset_index()
-        records = history.to_dict(orient="records")
+        if max_points:
+            history = downsample_history(history, max_points, downsample)
 
-        models = [TickerHistory(**row) for row in records]
-        history_list = [m.model_dump(by_alias=True) for m in models]
-
-        return {"symbol": symbol, "history": history_list}
+        serialize = history_to_columns if orient == "columns" else history_to_records
+        return FastJSONResponse({"symbol": symbol, "history": serialize(history)})
     except HTTPException:
         raise
     except Exception as e:
@@ -636,6 +753,7 @@ async def get_ticker_history_simple(
 )
 async def get_ticker_history(
     symbol: str,
+    market_data: MarketDataDep,
     user=Depends(get_current_profile),
     interval: str = Query(
         "1d",
@@ -647,6 +765,19 @@ async def get_ticker_history(
         "1mo",
         description=f"Alternative to start/end: {', '.join(list(STOCK_PERIODS))}",
     ),
+    orient: Literal["records", "columns"] = Query(
+        "records",
+        description="records: one object per bar. columns: {timestamp: [...], open: [...], ...}",
+    ),
+    max_points: int | None = Query(
+        None,
+        ge=3,
+        description="Downsample to at most this many bars (e.g. the chart width in pixels)",
+    ),
+    downsample: Literal["ohlc", "lttb"] = Query(
+        "ohlc",
+        description="ohlc: aggregate bars into candles. lttb: keep the bars that best preserve the close line",
+    ),
 ):
     if interval not in STOCK_INTERVALS:
         raise HTTPException(
@@ -664,22 +795,30 @@ async def get_ticker_history(
             detail="Either start/end or period must be provided.",
         )
     try:
-        ticker_data = yf.Ticker(symbol)
-
         if period and period == "1d":
             is_intraday = True
-            inc_prepost = True and ticker_data.info.get("hasPrePostMarketData", False)
+            metadata = await quote_service.get_ticker_metadata(market_data, symbol)
+            inc_prepost = metadata["hasPrePostMarketData"]
         else:
             is_intraday = False
             inc_prepost = False
 
         if start and end and interval:
-            history = ticker_data.history(
-                interval=interval, start=start, end=end, prepost=inc_prepost
+            history = await history_service.get_history(
+                market_data,
+                symbol,
+                interval=interval,
+                start=start,
+                end=end,
+                prepost=inc_prepost,
             )
         elif period and interval:
-            history = ticker_data.history(
-                interval=interval, period=period, prepost=inc_prepost
+            history = await history_service.get_history(
+                market_data,
+                symbol,
+                interval=interval,
+                period=period,
+                prepost=inc_prepost,
             )
         else:
             raise HTTPException(
@@ -690,18 +829,14 @@ async def get_ticker_history(
         if history.empty:
             return {"symbol": symbol, "history": []}
 
-        ticker_data = yf.Ticker(symbol)
+        # Usually already cached by the metadata lookup or a recent quote
         fast_info = TickerFastInfoResponse(
-            symbol=symbol.upper(), **ticker_data.fast_info
+            symbol=symbol.upper(),
+            **await quote_service.get_quote_fast_info(market_data, symbol),
         )
 
-        history = history.reset_index()
-        records = history.to_dict(orient="records")
-
-        models = [TickerHistory(**row) for row in records]
-        models.sort(key=lambda x: x.timestamp)
-
-        history_list = [m.model_dump(by_alias=True) for m in models]
+        history = history.sort_index()
+        serialize = history_to_columns if orient == "columns" else history_to_records
 
         if is_intraday:
             period_change, period_percent = get_regular_market_change(
@@ -713,15 +848,20 @@ async def get_ticker_history(
             period_change, period_percent = get_regular_market_change(
                 last_price=fast_info.lastPrice,
                 is_intraday=is_intraday,
-                prev_close=models[0].close,
+                prev_close=float(history["Close"].iloc[0]),
             )
 
-        return {
-            "symbol": symbol,
-            "change": period_change,
-            "change_percentage": period_percent,
-            "history": history_list,
-        }
+        if max_points:
+            history = downsample_history(history, max_points, downsample)
+
+        return FastJSONResponse(
+            {
+                "symbol": symbol,
+                "change": period_change,
+                "change_percentage": period_percent,
+                "history": serialize(history),
+            }
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -729,3 +869,284 @@ async def get_ticker_history(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch fast info for '{symbol}': {str(e)}",
         )
+
+
+### Technical Indicator Endpoints
+
+
+@router.get(
+    "/indicators/{symbol}",
+    description="Technical indicators computed server-side over the cached history.",
+)
+async def get_ticker_indicators(
+    symbol: str,
+    market_data: MarketDataDep,
+    user=Depends(get_current_profile),
+    indicators: str = Query(
+        "sma:20,ema:20,rsi:14",
+        description="Comma-separated name[:param...] list, e.g. sma:50,ema:200,rsi:14,"
+        "macd:12:26:9,bbands:20:2,atr:14",
+    ),
+    interval: str = Query(
+        "1d",
+        description=f"Valid intervals: {', '.join(list(STOCK_INTERVALS))}",
+    ),
+    period: str | None = Query(
+        "1y",
+        description=f"Window to return: {', '.join(list(STOCK_PERIODS))}",
+    ),
+    start: str = Query(None, description="Start date in YYYY-MM-DD format"),
+    end: str = Query(None, description="Ends date in YYYY-MM-DD format"),
+):
+    if interval not in STOCK_INTERVALS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid interval '{interval}'. Must be one of {sorted(list(STOCK_INTERVALS))}",
+        )
+    if period and period not in STOCK_PERIODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid period '{period}'. Must be one of {sorted(list(STOCK_PERIODS))}",
+        )
+    try:
+        requested = [
+            indicator_service.parse_indicator(spec)
+            for spec in indicators.split(",")
+            if spec.strip()
+        ]
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="No indicators given."
+        )
+
+    try:
+        result = await indicator_service.get_indicators(
+            market_data,
+            symbol,
+            requested,
+            interval=interval,
+            period=None if start and end else period,
+            start=start,
+            end=end,
+        )
+        return FastJSONResponse({"symbol": symbol, "interval": interval, **result})
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to compute indicators for '{symbol}': {str(e)}",
+        )
+
+
+### Returns and Correlation Endpoints
+
+
+@router.get(
+    "/correlation",
+    description="Aligned daily returns, covariance, correlation and rolling correlation for many symbols.",
+)
+async def get_tickers_correlation(
+    market_data: MarketDataDep,
+    user=Depends(get_current_profile),
+    symbols: str = Query(..., description="Comma-separated ticker symbols"),
+    period: str = Query(
+        "1y",
+        description=f"Valid periods: {', '.join(list(STOCK_PERIODS))}",
+    ),
+    method: Literal["simple", "log"] = Query("simple", description="Return type"),
+    window: int = Query(
+        63, ge=2, le=1000, description="Rolling correlation window in trading days"
+    ),
+    benchmark: str | None = Query(
+        None, description="Symbol for rolling correlations (default: the first)"
+    ),
+    include_returns: bool = Query(True, description="Include the returns matrix"),
+):
+    requested = _parse_symbols(symbols)
+    if not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="No symbols given."
+        )
+    if len(requested) > settings.CORRELATION_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.CORRELATION_MAX_SYMBOLS} symbols per request.",
+        )
+    if period not in STOCK_PERIODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid period '{period}'. Must be one of {sorted(list(STOCK_PERIODS))}",
+        )
+
+    try:
+        result = await correlation_service.get_correlation(
+            market_data,
+            requested,
+            period=period,
+            method=method,
+            window=window,
+            benchmark=benchmark,
+            include_returns=include_returns,
+            concurrency=settings.CORRELATION_BACKFILL_CONCURRENCY,
+            deadline=settings.CORRELATION_DEADLINE_SECONDS,
+        )
+        return FastJSONResponse(result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to compute correlations: {str(e)}",
+        )
+
+
+### Ticker Bundle Endpoint
+
+
+@router.get("/bundle/{symbol}")
+async def get_ticker_bundle(
+    symbol: str,
+    market_data: MarketDataDep,
+    user=Depends(get_current_profile),
+    sections: str | None = Query(
+        None,
+        description="Comma-separated sections to include (default: all). One of: "
+        + ", ".join(bundle_service.BUNDLE_SECTIONS),
+    ),
+    concurrency: int = Query(
+        settings.BUNDLE_CONCURRENCY,
+        ge=1,
+        le=32,
+        description="Maximum number of sections fetched in parallel",
+    ),
+    deadline: float = Query(
+        settings.BUNDLE_DEADLINE_SECONDS,
+        gt=0,
+        le=60,
+        description="Overall deadline in seconds; unfinished sections are reported as errors",
+    ),
+):
+    requested = [s.strip().lower() for s in (sections or "").split(",") if s.strip()]
+    requested = requested or list(bundle_service.BUNDLE_SECTIONS)
+    unknown = [s for s in requested if s not in bundle_service.BUNDLE_SECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown bundle sections: {', '.join(unknown)}",
+        )
+
+    bundle = await bundle_service.get_bundle(
+        market_data, symbol, requested, concurrency=concurrency, deadline=deadline
+    )
+    return FastJSONResponse(bundle)
+
+
+### Streaming Endpoints
+
+
+@router.websocket("/stream")
+async def stream_quotes(
+    websocket: WebSocket,
+    hub: QuoteHubDep,
+    symbols: str | None = Query(None, description="Comma-separated initial symbols"),
+    token: str | None = Query(
+        None, description="Access token (browsers cannot set headers)"
+    ),
+):
+    """
+    Live quotes over a WebSocket.
+
+    Send {"action": "subscribe" | "unsubscribe", "symbols": [...]} to change the
+    subscription ("symbols" may also be a comma-separated string). The server sends a full {"type": "snapshot"} per symbol, then
+    {"type": "update"} messages with only the fields that changed.
+    """
+    auth = websocket.headers.get("authorization", "")
+    token = token or auth.removeprefix("Bearer ").strip()
+    try:
+        await get_current_user(
+            HTTPAuthorizationCredentials(scheme="Bearer", credentials=token),
+            await get_supabase_anon_client(),
+        )
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscriber = hub.connect()
+    hub.subscribe(subscriber, _parse_symbols(symbols))
+
+    async def receive():
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                action, items = message.get("action"), message.get("symbols") or []
+            except (ValueError, AttributeError):
+                subscriber.push({"type": "error", "error": "Invalid message."})
+                continue
+            if isinstance(items, str):
+                items = _parse_symbols(items)
+            elif not isinstance(items, list) or not all(
+                isinstance(item, str) for item in items
+            ):
+                subscriber.push(
+                    {"type": "error", "error": "'symbols' must be a list of strings."}
+                )
+                continue
+            if action == "subscribe":
+                hub.subscribe(subscriber, items)
+            elif action == "unsubscribe":
+                hub.unsubscribe(subscriber, items)
+            else:
+                subscriber.push(
+                    {"type": "error", "error": f"Unknown action '{action}'."}
+                )
+
+    async def send():
+        while True:
+            await websocket.send_json(await subscriber.get())
+
+    tasks = [asyncio.create_task(receive()), asyncio.create_task(send())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            # WebSocketDisconnect ends the connection normally
+            task.exception()
+    finally:
+        for task in tasks:
+            task.cancel()
+        hub.disconnect(subscriber)
+
+
+@router.get(
+    "/stream/sse",
+    description="Server-Sent Events fallback for /stream with the same messages.",
+)
+async def stream_quotes_sse(
+    request: Request,
+    hub: QuoteHubDep,
+    symbols: str = Query(..., description="Comma-separated symbols"),
+    user=Depends(get_current_profile),
+):
+    subscriber = hub.connect()
+    hub.subscribe(subscriber, _parse_symbols(symbols))
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(subscriber.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {message['type']}\ndata: {dumps(message).decode()}\n\n"
+        finally:
+            hub.disconnect(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
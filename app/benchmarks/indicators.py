@@ -0,0 +1,172 @@
+"""
+Compare the NumPy indicator engine with per-row loops and pandas.
+
+    python -m app.benchmarks.indicators [--bars 100000] [--repeat 5]
+
+Prices are a synthetic random walk; each implementation's output is checked
+against the engine before it is timed.
+"""
+
+import argparse
+import time
+from functools import partial
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from app.utils import indicators
+
+
+def make_bars(bars: int) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+    spread = rng.random(bars) * 0.01
+    return {"high": close * (1 + spread), "low": close * (1 - spread), "close": close}
+
+
+# Per-row loops, the way the client computed them
+
+
+def loop_sma(close, period=20):
+    out = [float("nan")] * len(close)
+    total = 0.0
+    for i, value in enumerate(close):
+        total += value
+        if i >= period:
+            total -= close[i - period]
+        if i >= period - 1:
+            out[i] = total / period
+    return out
+
+
+def loop_ema(close, period=20):
+    out = [float("nan")] * len(close)
+    alpha = 2 / (period + 1)
+    value = sum(close[:period]) / period
+    out[period - 1] = value
+    for i in range(period, len(close)):
+        value = alpha * close[i] + (1 - alpha) * value
+        out[i] = value
+    return out
+
+
+def loop_rsi(close, period=14):
+    out = [float("nan")] * len(close)
+    gains = losses = 0.0
+    for i in range(1, period + 1):
+        delta = close[i] - close[i - 1]
+        gains += max(delta, 0)
+        losses += max(-delta, 0)
+    gains, losses = gains / period, losses / period
+    out[period] = 100 - 100 / (1 + gains / losses)
+    for i in range(period + 1, len(close)):
+        delta = close[i] - close[i - 1]
+        gains = (gains * (period - 1) + max(delta, 0)) / period
+        losses = (losses * (period - 1) + max(-delta, 0)) / period
+        out[i] = 100 - 100 / (1 + gains / losses)
+    return out
+
+
+def loop_atr(high, low, close, period=14):
+    out = [float("nan")] * len(close)
+    ranges = [
+        max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+        for i in range(1, len(close))
+    ]
+    value = sum(ranges[:period]) / period
+    out[period] = value
+    for i in range(period + 1, len(close)):
+        value = (value * (period - 1) + ranges[i - 1]) / period
+        out[i] = value
+    return out
+
+
+# pandas equivalents
+
+
+def pandas_sma(close, period=20):
+    return pd.Series(close).rolling(period).mean().to_numpy()
+
+
+def pandas_ema(close, period=20):
+    series = pd.Series(close)
+    seeded = series.copy()
+    seeded.iloc[: period - 1] = np.nan
+    seeded.iloc[period - 1] = series.iloc[:period].mean()
+    return seeded.ewm(span=period, adjust=False, ignore_na=True).mean().to_numpy()
+
+
+def pandas_rsi(close, period=14):
+    delta = pd.Series(close).diff()
+    gains, losses = delta.clip(lower=0), -delta.clip(upper=0)
+    seeded_gain = gains.copy()
+    seeded_loss = losses.copy()
+    seeded_gain.iloc[:period] = np.nan
+    seeded_loss.iloc[:period] = np.nan
+    seeded_gain.iloc[period] = gains.iloc[1 : period + 1].mean()
+    seeded_loss.iloc[period] = losses.iloc[1 : period + 1].mean()
+    avg_gain = seeded_gain.ewm(alpha=1 / period, adjust=False, ignore_na=True).mean()
+    avg_loss = seeded_loss.ewm(alpha=1 / period, adjust=False, ignore_na=True).mean()
+    return (100 - 100 / (1 + avg_gain / avg_loss)).to_numpy()
+
+
+CASES: dict[str, dict[str, tuple[Callable, tuple[str, ...]]]] = {
+    "sma 20": {
+        "loop": (loop_sma, ("close",)),
+        "pandas": (pandas_sma, ("close",)),
+        "numpy": (indicators.sma, ("close",)),
+    },
+    "ema 20": {
+        "loop": (loop_ema, ("close",)),
+        "pandas": (pandas_ema, ("close",)),
+        "numpy": (indicators.ema, ("close",)),
+    },
+    "rsi 14": {
+        "loop": (loop_rsi, ("close",)),
+        "pandas": (pandas_rsi, ("close",)),
+        "numpy": (indicators.rsi, ("close",)),
+    },
+    "atr 14": {
+        "loop": (loop_atr, ("high", "low", "close")),
+        "numpy": (indicators.atr, ("high", "low", "close")),
+    },
+}
+
+
+def timeit(fn: Callable[[], Any], repeat: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bars", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    arrays = make_bars(args.bars)
+    lists = {name: values.tolist() for name, values in arrays.items()}
+    print(f"{args.bars} bars")
+
+    for case, paths in CASES.items():
+        print(f"\n{case}")
+        fn, inputs = paths["numpy"]
+        expected = fn(*(arrays[name] for name in inputs))
+        baseline = None
+        for label, (fn, inputs) in paths.items():
+            source = lists if label == "loop" else arrays
+            call = partial(fn, *(source[name] for name in inputs))
+            np.testing.assert_allclose(
+                np.asarray(call(), dtype=float), expected, rtol=1e-9, equal_nan=True
+            )
+            ms = timeit(call, args.repeat)
+            baseline = baseline or ms
+            print(f"  {label:<8} {ms:9.2f} ms  {baseline / ms:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
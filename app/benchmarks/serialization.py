@@ -0,0 +1,108 @@
+"""
+Compare the shared serializer with the per-route paths it replaced.
+
+    python -m app.benchmarks.serialization [--rows 400] [--periods 40] [--repeat 20]
+
+Payloads are synthetic but shaped like yfinance data: a wide financial statement
+(line items x reporting dates, with NaN gaps) and a long dividends Series.
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from app.utils.serialization import dumps, frame_to_records
+
+
+def make_statement(rows: int, periods: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    values = rng.normal(1e9, 5e8, (rows, periods))
+    values[rng.random((rows, periods)) < 0.15] = np.nan
+    columns = pd.date_range(end="2025-09-30", periods=periods, freq="QE")
+    index = [f"Line Item {i}" for i in range(rows)]
+    return pd.DataFrame(values, index=index, columns=columns)
+
+
+def make_dividends(rows: int) -> pd.Series:
+    index = pd.date_range(
+        end="2025-09-30", periods=rows, freq="D", tz="America/New_York", name="Date"
+    )
+    return pd.Series(
+        np.random.default_rng(1).random(rows), index=index, name="Dividends"
+    )
+
+
+def starlette_render(content: Any) -> bytes:
+    """What FastAPI did for a plain dict return value."""
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+def old_records(frame) -> bytes:
+    records = frame.fillna(0).reset_index().to_dict(orient="records")
+    return starlette_render({"symbol": "BENCH", "data": records})
+
+
+def old_round_trip(frame) -> bytes:
+    # json.dumps rejects Timestamp keys, so labels are stringified up front
+    frame = frame.to_frame() if isinstance(frame, pd.Series) else frame
+    records = frame.rename(columns=str).reset_index().to_dict(orient="records")
+    content = json.loads(json.dumps({"data": records}, default=str))
+    return json.dumps(content, default=str).encode()
+
+
+def new_records(frame) -> bytes:
+    return dumps({"symbol": "BENCH", "data": frame_to_records(frame, fill_nan=0)})
+
+
+def timeit(fn: Callable[[], Any], repeat: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=400)
+    parser.add_argument("--periods", type=int, default=40)
+    parser.add_argument("--dividends", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    payloads = {
+        f"statement {args.rows}x{args.periods}": make_statement(
+            args.rows, args.periods
+        ),
+        f"dividends {args.dividends}": make_dividends(args.dividends),
+    }
+    paths = {
+        "fillna/reset_index/to_dict + jsonable_encoder": old_records,
+        "json.loads(json.dumps(default=str))": old_round_trip,
+        "serialization.dumps(frame_to_records)": new_records,
+    }
+
+    for name, payload in payloads.items():
+        print(f"\n{name}")
+        baseline = None
+        for label, fn in paths.items():
+            ms = timeit(lambda: fn(payload), args.repeat)
+            baseline = baseline or ms
+            size = len(fn(payload))
+            print(
+                f"  {label:<48} {ms:9.2f} ms  {baseline / ms:6.1f}x  {size / 1024:8.0f} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
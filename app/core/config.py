@@ -1,4 +1,6 @@
+import os
 import secrets
+import tempfile
 import warnings
 from typing import Annotated, Any, Literal, Self
 
@@ -77,6 +79,152 @@ class Settings(BaseSettings):
 
     ALPHA_VANTAGE_API_KEY: str
     ALPHA_VANTAGE_BASE_URL: str = "https://www.alphavantage.co/query"
+    # Quota of the API key (free tier: 5/minute, 25/day). Calls beyond the
+    # per-minute rate queue for up to ALPHA_VANTAGE_MAX_WAIT_SECONDS. Responses
+    # are kept on disk and served expired once the quota is spent.
+    ALPHA_VANTAGE_REQUESTS_PER_MINUTE: int = 5
+    ALPHA_VANTAGE_REQUESTS_PER_DAY: int = 25
+    ALPHA_VANTAGE_TIMEOUT_SECONDS: float = 10.0
+    ALPHA_VANTAGE_MAX_WAIT_SECONDS: float = 15.0
+    ALPHA_VANTAGE_MAX_CONNECTIONS: int = 4
+    ALPHA_VANTAGE_CACHE_TTL_SECONDS: float = 24 * 60 * 60
+    # Empty and "Error Message" responses (unknown symbol...) are cached too,
+    # for this long, so they do not spend the quota on every request
+    ALPHA_VANTAGE_NEGATIVE_CACHE_TTL_SECONDS: float = 60 * 60
+    ALPHA_VANTAGE_CACHE_DIR: str | None = os.path.join(
+        tempfile.gettempdir(), "finforum", "alpha_vantage"
+    )
+
+    ## Market data
+    # "yahoo" talks to Yahoo Finance through yfinance, "fake" serves synthetic
+    # data so throughput can be measured offline.
+    MARKET_DATA_PROVIDER: Literal["yahoo", "fake"] = "yahoo"
+    MARKET_DATA_MAX_WORKERS: int = 16
+    MARKET_DATA_HOST_CONCURRENCY: int = 8
+    MARKET_DATA_TIMEOUT_SECONDS: float = 15.0
+    MARKET_DATA_FAKE_LATENCY_SECONDS: float = 0.0
+    # How long one yf.Ticker is reused for calls on the same symbol
+    MARKET_DATA_TICKER_REUSE_SECONDS: float = 60.0
+    # Per-host concurrency adapts between the minimum and HOST_CONCURRENCY:
+    # it halves on rate limits/timeouts and grows back by one per round of calls
+    MARKET_DATA_MIN_CONCURRENCY: int = 1
+    # Circuit breaker per upstream host. Over the last WINDOW seconds (at least
+    # MIN_CALLS calls) it opens when FAILURE_RATE of calls fail or SLOW_CALL_RATE
+    # take longer than SLOW_CALL_SECONDS. After OPEN_SECONDS, HALF_OPEN_PROBES
+    # trial calls decide; each failed probe doubles the wait up to MAX_OPEN_SECONDS.
+    MARKET_DATA_BREAKER_ENABLED: bool = True
+    MARKET_DATA_BREAKER_WINDOW_SECONDS: float = 30.0
+    MARKET_DATA_BREAKER_MIN_CALLS: int = 10
+    MARKET_DATA_BREAKER_FAILURE_RATE: float = 0.5
+    MARKET_DATA_BREAKER_SLOW_CALL_SECONDS: float = 8.0
+    MARKET_DATA_BREAKER_SLOW_CALL_RATE: float = 0.8
+    MARKET_DATA_BREAKER_OPEN_SECONDS: float = 15.0
+    MARKET_DATA_BREAKER_MAX_OPEN_SECONDS: float = 300.0
+    MARKET_DATA_BREAKER_HALF_OPEN_PROBES: int = 2
+
+    # Ticker caches: fast_info is volatile (seconds), info changes slowly (hours).
+    # Stale entries are served while a background refresh runs.
+    FAST_INFO_CACHE_TTL_SECONDS: float = 15
+    FAST_INFO_CACHE_STALE_SECONDS: float = 120
+    INFO_CACHE_TTL_SECONDS: float = 4 * 60 * 60
+    INFO_CACHE_STALE_SECONDS: float = 24 * 60 * 60
+    # Ticker metadata (exchange, currency, prepost support...) almost never changes
+    METADATA_CACHE_TTL_SECONDS: float = 7 * 24 * 60 * 60
+    METADATA_CACHE_STALE_SECONDS: float = 30 * 24 * 60 * 60
+    TICKER_CACHE_MAX_ENTRIES: int = 5000
+    # Symbols per bulk quote request
+    BATCH_QUOTE_CHUNK_SIZE: int = 200
+    # Fan-out defaults for multi-symbol info requests
+    TICKERS_INFO_CONCURRENCY: int = 8
+    TICKERS_INFO_DEADLINE_SECONDS: float = 20.0
+    # Local symbol search index. Yahoo is only queried when the index cannot fill
+    # the requested count for a query it has not sent upstream recently.
+    # The bundled listing is a placeholder of about 140 large caps, ETFs,
+    # indices and currencies; point this at a full directory (e.g. Nasdaq
+    # Trader's nasdaqlisted/otherlisted files converted to the same columns)
+    # in production, or most searches will still go upstream.
+    SYMBOL_LISTING_FILE: str | None = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), "data", "symbol_listing.csv"
+    )
+    SYMBOL_INDEX_UPSTREAM_TTL_SECONDS: float = 24 * 60 * 60
+    SYMBOL_INDEX_MAX_UPSTREAM_QUERIES: int = 10000
+    # Indicator results, keyed on the last bar of the history they were computed on
+    INDICATOR_CACHE_TTL_SECONDS: float = 24 * 60 * 60
+    INDICATOR_CACHE_MAX_ENTRIES: int = 5000
+    # Ticker news: short-lived per-symbol cache behind the multi-symbol feed
+    NEWS_CACHE_TTL_SECONDS: float = 120
+    NEWS_CACHE_STALE_SECONDS: float = 600
+    NEWS_FEED_MAX_SYMBOLS: int = 50
+    NEWS_FEED_CONCURRENCY: int = 8
+    NEWS_FEED_DEADLINE_SECONDS: float = 10.0
+    # Fan-out defaults for the ticker bundle endpoint
+    BUNDLE_CONCURRENCY: int = 8
+    BUNDLE_DEADLINE_SECONDS: float = 10.0
+    # Local OHLCV history store; bars newer than the last stored one are
+    # fetched once the store is older than the refresh interval.
+    HISTORY_STORE_ENABLED: bool = True
+    HISTORY_STORE_DIR: str = os.path.join(tempfile.gettempdir(), "finforum", "history")
+    HISTORY_STORE_REFRESH_SECONDS: float = 60
+    # Multi-symbol returns/correlation: symbols missing from the history store are
+    # backfilled this many at a time; stored ones are refreshed in one bulk download.
+    CORRELATION_MAX_SYMBOLS: int = 250
+    CORRELATION_BACKFILL_CONCURRENCY: int = 8
+    CORRELATION_DEADLINE_SECONDS: float = 30.0
+    # Fundamentals (statements, estimates, dividends) expire around reporting dates.
+    # Set FUNDAMENTALS_CACHE_DIR to persist them across restarts.
+    FUNDAMENTALS_CACHE_TTL_SECONDS: float = 3 * 24 * 60 * 60
+    FUNDAMENTALS_POST_REPORT_TTL_SECONDS: float = 6 * 60 * 60
+    FUNDAMENTALS_POST_REPORT_WINDOW_SECONDS: float = 3 * 24 * 60 * 60
+    FUNDAMENTALS_CACHE_MAX_ENTRIES: int = 20000
+    FUNDAMENTALS_CACHE_DIR: str | None = None
+    # Market-bound caches (fast_info, pre/post bars, stored history) keep their
+    # normal TTL while the symbol's exchange trades; while it is closed they last
+    # until it reopens (see app/utils/trading_calendar.py), at most this long.
+    CLOSED_MARKET_CACHE_MAX_TTL_SECONDS: float = 24 * 60 * 60
+    # Yahoo's status payload per MARKETS entry, merged into the calendar's status
+    # and kept until the next session boundary (at most the max TTL above)
+    MARKET_STATUS_CACHE_TTL_SECONDS: float = 60
+    MARKET_STATUS_CACHE_STALE_SECONDS: float = 300
+    # Sector and industry pages for everything in SECTOR_INDUSTRY_MAP, refreshed
+    # in the background and served as pre-encoded JSON
+    SECTOR_SNAPSHOT_ENABLED: bool = True
+    SECTOR_SNAPSHOT_REFRESH_SECONDS: float = 60 * 60
+    SECTOR_SNAPSHOT_CONCURRENCY: int = 4
+    # Screener results, keyed on a canonical fingerprint of the screen. Results
+    # are fetched in blocks of SCREENER_PAGE_SIZE rows so nearby pages share a call.
+    SCREENER_CACHE_TTL_SECONDS: float = 120
+    SCREENER_CACHE_STALE_SECONDS: float = 300
+    SCREENER_CACHE_MAX_ENTRIES: int = 1000
+    SCREENER_PAGE_SIZE: int = 50
+    # Local equity screener: every equity in these regions, paged from Yahoo's
+    # screener one sector at a time (at most MAX_ROWS per sector) and rebuilt in
+    # the background. Equity screens limited to these regions run in-process;
+    # ones on intraday fields only while the snapshot is younger than the
+    # screener cache TTL.
+    SCREENER_UNIVERSE_ENABLED: bool = True
+    SCREENER_UNIVERSE_REGIONS: Annotated[
+        list[str] | str, BeforeValidator(parse_cors)
+    ] = ["us"]
+    SCREENER_UNIVERSE_REFRESH_SECONDS: float = 15 * 60
+    SCREENER_UNIVERSE_MAX_ROWS: int = 10000
+    SCREENER_UNIVERSE_CONCURRENCY: int = 2
+    # Background prefetch of hot symbols (favourites, watchlists, recent requests).
+    # Every cycle re-warms fast_info and, while their exchange trades, today's
+    # intraday bars, spending at most PREFETCH_REQUESTS_PER_MINUTE upstream calls.
+    PREFETCH_ENABLED: bool = True
+    PREFETCH_MAX_SYMBOLS: int = 100
+    PREFETCH_OPEN_INTERVAL_SECONDS: float = 30
+    PREFETCH_CLOSED_INTERVAL_SECONDS: float = 600
+    PREFETCH_HOT_SET_REFRESH_SECONDS: float = 300
+    PREFETCH_REQUESTS_PER_MINUTE: float = 60
+    PREFETCH_ACCESS_WEIGHT: float = 1.0
+    PREFETCH_INTRADAY_INTERVAL: str = "5m"
+    # Live quote hub: poll interval per market state, "fake" swaps in an offline feed
+    QUOTE_STREAM_FEED: Literal["provider", "fake"] = "provider"
+    QUOTE_STREAM_REGULAR_INTERVAL_SECONDS: float = 2
+    QUOTE_STREAM_EXTENDED_INTERVAL_SECONDS: float = 10
+    QUOTE_STREAM_CLOSED_INTERVAL_SECONDS: float = 60
+    QUOTE_STREAM_QUEUE_SIZE: int = 100
 
     @computed_field
     @property
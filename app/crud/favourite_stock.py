@@ -1,5 +1,5 @@
 from typing import Optional, List
-from sqlmodel import select, Session
+from sqlmodel import func, select, Session
 from app.models.favourite_stock import FavouriteStock
 from app.schemas.favourite_stock import FavouriteStockCreate, FavouriteStockUpdate
 from app.crud.base import CRUDBase
@@ -24,5 +24,15 @@ class CRUDFavouriteStock(
         statement = select(FavouriteStock).where(FavouriteStock.user_id == user_id)
         return db.exec(statement).all()
 
+    def count_by_symbol(self, db: Session) -> List[tuple[str, str, Optional[str], int]]:
+        """(symbol, exchange, company_name, number of users) for every favourite."""
+        statement = select(
+            FavouriteStock.symbol,
+            FavouriteStock.exchange,
+            func.max(FavouriteStock.company_name),
+            func.count(),
+        ).group_by(FavouriteStock.symbol, FavouriteStock.exchange)
+        return list(db.exec(statement).all())
+
 
 favourite_stock = CRUDFavouriteStock(FavouriteStock)
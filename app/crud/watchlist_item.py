@@ -1,8 +1,9 @@
 from __future__ import annotations
 from typing import Iterable, List, Optional
-from sqlmodel import Session, select
+from sqlmodel import Session, func, select
 
 from app.crud.base import CRUDBase
+from app.models.watchlist import Watchlist
 from app.models.watchlist_item import WatchlistItem
 from app.schemas.watchlist_item import WatchlistItemCreate, WatchlistItemUpdate
 
@@ -27,6 +28,26 @@ class CRUDWatchlistItem(
         )
         return list(session.exec(stmt).all())
 
+    def count_by_symbol(self, session: Session) -> List[tuple[str, str, int]]:
+        """
+        (symbol, exchange, number of items) across all watchlists.
+        """
+        stmt = select(
+            WatchlistItem.symbol, WatchlistItem.exchange, func.count()
+        ).group_by(WatchlistItem.symbol, WatchlistItem.exchange)
+        return list(session.exec(stmt).all())
+
+    def count_users_by_symbol(self, session: Session) -> List[tuple[str, int]]:
+        """
+        (symbol, number of distinct users watching it) across all watchlists.
+        """
+        stmt = (
+            select(WatchlistItem.symbol, func.count(func.distinct(Watchlist.user_id)))
+            .join(Watchlist, Watchlist.id == WatchlistItem.watchlist_id)
+            .group_by(WatchlistItem.symbol)
+        )
+        return list(session.exec(stmt).all())
+
     def create(
         self,
         session: Session,
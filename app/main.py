@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from collections.abc import AsyncGenerator
 from typing import Any
@@ -11,7 +12,24 @@ from uvicorn.config import LOGGING_CONFIG
 
 from app.api.main import api_router
 from app.core.config import settings
+from app.services.alpha_vantage_service import set_alpha_vantage_client
+from app.services.market_data_service import set_market_data_provider
+from app.services.prefetch_service import (
+    get_prefetch_scheduler,
+    set_prefetch_scheduler,
+)
+from app.services.quote_stream_service import set_quote_hub
+from app.services.screener_service import (
+    get_equity_universe_store,
+    set_equity_universe_store,
+)
+from app.services.sector_service import (
+    get_sector_snapshot_store,
+    set_sector_snapshot_store,
+)
+from app.services.symbol_index_service import warm_symbol_index
 from app.utils import custom_generate_unique_id
+from app.utils.freshness import FreshnessMiddleware
 
 logger = logging.getLogger("uvicorn")
 
@@ -42,12 +60,34 @@ def register_models():
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:  # noqa ARG001
     """life span events"""
+    warm_up = None
     try:
         logger.info("lifespan start")
         # Register models to SQLModel metadata
         register_models()
+        # Seed the symbol search index without delaying startup
+        warm_up = asyncio.create_task(warm_symbol_index())
+        # Keep hot symbols' quotes and intraday bars cached in the background
+        if settings.PREFETCH_ENABLED:
+            get_prefetch_scheduler().start()
+        # Sector and industry pages are rebuilt off the request path
+        if settings.SECTOR_SNAPSHOT_ENABLED:
+            get_sector_snapshot_store().start()
+        # Equity screens run against a local snapshot of the universe
+        if settings.SCREENER_UNIVERSE_ENABLED:
+            get_equity_universe_store().start()
         yield
     finally:
+        if warm_up is not None:
+            warm_up.cancel()
+        # Stop background loops, close pooled connections and release the
+        # market data executor threads
+        set_prefetch_scheduler(None)
+        set_sector_snapshot_store(None)
+        set_equity_universe_store(None)
+        set_quote_hub(None)
+        await set_alpha_vantage_client(None)
+        set_market_data_provider(None)
         logger.info("lifespan exit")
 
 
@@ -68,9 +108,14 @@ if settings.all_cors_origins:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Data-Freshness", "Age", "Retry-After"],
     )
 
 
+# Flag responses served from expired cache data (e.g. while upstream is down)
+app.add_middleware(FreshnessMiddleware)
+
+
 # Include the routers
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
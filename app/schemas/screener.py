@@ -11,7 +11,8 @@ class ScreenerCondition(BaseModel):
 class ScreenerRequest(BaseModel):
     conditions: List[ScreenerCondition]
     logical_operator: str = "and"
-    limit: int = 50
+    limit: int = Field(50, ge=1, le=250)
+    offset: int = Field(0, ge=0)
     sort_field: Optional[str] = None
     sort_type: Optional[str] = None
 
@@ -96,6 +96,21 @@ class TickersFastInfoResponse(BaseModel):
     results: Dict[str, TickerFastInfoResponse]
 
 
+class TickerMetadata(BaseModel):
+    symbol: str = Field(..., description="Ticker symbol, e.g., AAPL or BHP.AX")
+    quoteType: Optional[str] = Field(
+        None, description="Type of instrument, e.g., EQUITY, ETF, INDEX, CRYPTO"
+    )
+    exchange: Optional[str] = Field(None, description="Stock exchange, e.g., NMS, ASX")
+    currency: Optional[str] = Field(None, description="Trading currency, e.g., USD")
+    timezone: Optional[str] = Field(
+        None, description="Exchange timezone, e.g., America/New_York"
+    )
+    hasPrePostMarketData: bool = Field(
+        False, description="Whether pre/post-market bars are available"
+    )
+
+
 class CompanyOfficer(BaseModel):
     name: Optional[str] = Field(None, description="Officer's full name")
     title: Optional[str] = Field(None, description="Job title or role")
@@ -0,0 +1,345 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import httpx
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.utils.concurrency import RateLimitExceeded, SingleFlight, TokenBucket
+from app.utils.freshness import mark_stale
+
+logger = logging.getLogger(__name__)
+
+# Alpha Vantage answers over-quota calls with HTTP 200 and one of these keys
+_RATE_LIMIT_KEYS = ("Note", "Information")
+
+
+class DailyQuota:
+    """
+    Count of requests made with the API key today (UTC). Saved next to the
+    response cache so a restart does not forget the calls already spent.
+    """
+
+    def __init__(self, limit: int, path: Optional[str] = None):
+        self.limit = limit
+        self.path = path
+        self.day: Optional[str] = None
+        self.used = 0
+        self._loaded = False
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).date().isoformat()
+
+    def _load(self) -> None:
+        self._loaded = True
+        if not self.path:
+            return
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+            self.day, self.used = saved["day"], int(saved["used"])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("Could not load Alpha Vantage quota usage: %s", e)
+
+    def _roll(self) -> None:
+        if not self._loaded:
+            self._load()
+        today = self._today()
+        if self.day != today:
+            self.day, self.used = today, 0
+
+    @property
+    def remaining(self) -> int:
+        self._roll()
+        return max(0, self.limit - self.used)
+
+    def seconds_until_reset(self) -> float:
+        now = datetime.now(timezone.utc)
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return 24 * 60 * 60 - (now - midnight).total_seconds()
+
+    async def spend(self) -> None:
+        self._roll()
+        self.used += 1
+        if self.path:
+            try:
+                await asyncio.to_thread(
+                    _write_json, self.path, {"day": self.day, "used": self.used}
+                )
+            except Exception as e:
+                logger.warning("Could not save Alpha Vantage quota usage: %s", e)
+
+
+def _write_json(path: str, payload: Any) -> None:
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class AlphaVantageClient:
+    """
+    Async Alpha Vantage client sharing one pooled HTTP connection.
+
+    - Responses are cached in memory and on disk for ``cache_ttl`` seconds;
+      empty and "Error Message" responses for ``negative_cache_ttl``.
+    - Concurrent identical queries share one upstream call.
+    - Calls are paced by a token bucket sized to the key's per-minute quota and
+      capped by its daily quota. When no call can be made (quota spent, upstream
+      throttling or failure) an expired cached response is served if one exists;
+      otherwise a 429 with Retry-After is raised.
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        base_url: str,
+        requests_per_minute: int,
+        requests_per_day: int,
+        timeout: float,
+        max_wait: float,
+        max_connections: int,
+        cache_ttl: float,
+        negative_cache_ttl: float,
+        cache_dir: Optional[str] = None,
+        max_entries: int = 1000,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_wait = max_wait
+        self.max_connections = max_connections
+        self.cache_ttl = cache_ttl
+        self.negative_cache_ttl = negative_cache_ttl
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._client: Optional[httpx.AsyncClient] = None
+        self._bucket = TokenBucket(
+            rate=requests_per_minute / 60, capacity=requests_per_minute
+        )
+        self._quota = DailyQuota(
+            requests_per_day,
+            os.path.join(cache_dir, "quota.json") if cache_dir else None,
+        )
+        self._single_flight = SingleFlight()
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.upstream_calls = 0
+        self.throttled = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # Cache
+    # -----------------------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def _cache_key(function: str, params: dict[str, str]) -> str:
+        return json.dumps([function, sorted(params.items())])
+
+    def _path(self, key: str) -> str:
+        function = json.loads(key)[0]
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{function}.{digest}.json")
+
+    def _load(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Could not load cached Alpha Vantage response: %s", e)
+            return None
+
+    def _remember(self, key: str, entry: dict) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _cached(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None and self.cache_dir:
+            entry = await asyncio.to_thread(self._load, key)
+            if entry is not None:
+                self._remember(key, entry)
+        return entry
+
+    async def _store(self, key: str, data: dict, ttl: float) -> None:
+        entry = {"fetched_at": time.time(), "ttl": ttl, "data": data}
+        self._remember(key, entry)
+        if self.cache_dir:
+            try:
+                await asyncio.to_thread(_write_json, self._path(key), entry)
+            except Exception as e:
+                logger.warning("Could not persist Alpha Vantage response: %s", e)
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # Queries
+    # -----------------------------------------------------------------------------------------------------------------
+
+    def _throttled(self, retry_after: float, detail: str) -> HTTPException:
+        self.throttled += 1
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(max(1, round(retry_after)))},
+        )
+
+    async def _fetch(self, key: str, function: str, params: dict[str, str]) -> dict:
+        if self._quota.remaining <= 0:
+            raise self._throttled(
+                self._quota.seconds_until_reset(),
+                "Alpha Vantage daily request quota exhausted.",
+            )
+        try:
+            await self._bucket.acquire(max_wait=self.max_wait)
+        except RateLimitExceeded as e:
+            raise self._throttled(
+                e.retry_after, "Alpha Vantage per-minute request quota exhausted."
+            )
+
+        await self._quota.spend()
+        self.upstream_calls += 1
+        try:
+            response = await self.client.get(
+                self.base_url,
+                params={"function": function, **params, "apikey": self.api_key},
+            )
+            response.raise_for_status()
+            data = response.json()
+        except httpx.TimeoutException:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail=f"Alpha Vantage request timed out after {self.timeout:g}s.",
+            )
+        except (httpx.HTTPError, ValueError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Alpha Vantage request failed: {e}",
+            )
+
+        if any(k in data for k in _RATE_LIMIT_KEYS) and len(data) == 1:
+            # Upstream disagrees with our count; stop calling until it refills
+            self._bucket.drain()
+            raise self._throttled(self._bucket.wait_time(), next(iter(data.values())))
+        negative = not data or "Error Message" in data
+        await self._store(
+            key, data, self.negative_cache_ttl if negative else self.cache_ttl
+        )
+        return data
+
+    async def query(self, function: str, **params: Any) -> dict:
+        """
+        Run an Alpha Vantage ``function`` (e.g. ``OVERVIEW``) with the given
+        query parameters and return the decoded JSON.
+        """
+        params = {k: str(v) for k, v in params.items()}
+        key = self._cache_key(function, params)
+
+        entry = await self._cached(key)
+        if entry is not None and time.time() - entry["fetched_at"] < entry.get(
+            "ttl", self.cache_ttl
+        ):
+            self.hits += 1
+            return entry["data"]
+
+        self.misses += 1
+        try:
+            return await self._single_flight.do(
+                key, lambda: self._fetch(key, function, params)
+            )
+        except HTTPException as e:
+            if entry is None:
+                raise
+            self.stale_hits += 1
+            mark_stale(time.time() - entry["fetched_at"])
+            logger.warning("Serving expired Alpha Vantage %s: %s", function, e.detail)
+            return entry["data"]
+
+    async def get_overview(self, symbol: str) -> dict:
+        return await self.query("OVERVIEW", symbol=symbol.strip().upper())
+
+    def stats(self) -> dict:
+        return {
+            "name": "alpha_vantage",
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "upstream_calls": self.upstream_calls,
+            "throttled": self.throttled,
+            "daily_remaining": self._quota.remaining,
+            "single_flight": self._single_flight.stats(),
+            "rate_limiter": self._bucket.stats(),
+        }
+
+
+def _build_client() -> AlphaVantageClient:
+    return AlphaVantageClient(
+        api_key=settings.ALPHA_VANTAGE_API_KEY,
+        base_url=settings.ALPHA_VANTAGE_BASE_URL,
+        requests_per_minute=settings.ALPHA_VANTAGE_REQUESTS_PER_MINUTE,
+        requests_per_day=settings.ALPHA_VANTAGE_REQUESTS_PER_DAY,
+        timeout=settings.ALPHA_VANTAGE_TIMEOUT_SECONDS,
+        max_wait=settings.ALPHA_VANTAGE_MAX_WAIT_SECONDS,
+        max_connections=settings.ALPHA_VANTAGE_MAX_CONNECTIONS,
+        cache_ttl=settings.ALPHA_VANTAGE_CACHE_TTL_SECONDS,
+        negative_cache_ttl=settings.ALPHA_VANTAGE_NEGATIVE_CACHE_TTL_SECONDS,
+        cache_dir=settings.ALPHA_VANTAGE_CACHE_DIR,
+    )
+
+
+_client: Optional[AlphaVantageClient] = None
+
+
+def get_alpha_vantage_client() -> AlphaVantageClient:
+    """Process-wide Alpha Vantage client, created on first use."""
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
+async def set_alpha_vantage_client(client: Optional[AlphaVantageClient]) -> None:
+    """Swap the Alpha Vantage client, closing the connections of the old one."""
+    global _client
+    if _client is not None and _client is not client:
+        await _client.aclose()
+    _client = client
@@ -0,0 +1,124 @@
+from typing import Any, Awaitable, Callable, Iterable
+
+from app.schemas.stocks import TickerFastInfoResponse, TickerInfoResponse
+from app.services import fundamentals_service, quote_service, ticker_cache_service
+from app.services.market_data_service import MarketDataProvider
+from app.utils.concurrency import fan_out
+from app.utils.serialization import frame_to_records
+
+SectionFetcher = Callable[[MarketDataProvider, str], Awaitable[Any]]
+
+
+def _is_empty(value: Any) -> bool:
+    if value is None:
+        return True
+    empty = getattr(value, "empty", None)
+    return empty if isinstance(empty, bool) else len(value) == 0
+
+
+async def _info(provider: MarketDataProvider, symbol: str) -> TickerInfoResponse:
+    info = TickerInfoResponse(
+        **await ticker_cache_service.get_ticker_info(provider, symbol)
+    )
+    if info.symbol is None:
+        raise LookupError(f"Ticker '{symbol}' not found or has no info.")
+    return info
+
+
+async def _fast_info(
+    provider: MarketDataProvider, symbol: str
+) -> TickerFastInfoResponse:
+    return TickerFastInfoResponse(
+        symbol=symbol, **await quote_service.get_quote_fast_info(provider, symbol)
+    )
+
+
+async def _metadata(provider: MarketDataProvider, symbol: str) -> dict:
+    return await quote_service.get_ticker_metadata(provider, symbol)
+
+
+def _fundamental_records(attr: str) -> SectionFetcher:
+    """Statement-like sections, shaped like their single endpoints (NaN -> 0)."""
+
+    async def fetch(provider: MarketDataProvider, symbol: str) -> list:
+        value = await fundamentals_service.get_fundamental(provider, symbol, attr)
+        return [] if _is_empty(value) else frame_to_records(value, fill_nan=0)
+
+    return fetch
+
+
+def _fundamental(attr: str) -> SectionFetcher:
+    async def fetch(provider: MarketDataProvider, symbol: str) -> Any:
+        value = await fundamentals_service.get_fundamental(provider, symbol, attr)
+        return {} if _is_empty(value) else value
+
+    return fetch
+
+
+def _attr(attr: str, records: bool = False) -> SectionFetcher:
+    async def fetch(provider: MarketDataProvider, symbol: str) -> Any:
+        value = await provider.get_ticker_attr(symbol, attr)
+        if _is_empty(value):
+            return [] if records or isinstance(value, list) else {}
+        return frame_to_records(value) if records else value
+
+    return fetch
+
+
+BUNDLE_SECTIONS: dict[str, SectionFetcher] = {
+    "info": _info,
+    "fast_info": _fast_info,
+    "metadata": _metadata,
+    "earnings": _fundamental_records("earnings"),
+    "earnings_history": _fundamental("earnings_history"),
+    "earnings_estimate": _fundamental_records("earnings_estimate"),
+    "revenue_estimate": _fundamental_records("revenue_estimate"),
+    "growth_estimates": _fundamental_records("growth_estimates"),
+    "dividends": _fundamental_records("dividends"),
+    "splits": _fundamental_records("splits"),
+    "balance_sheet": _fundamental_records("balance_sheet"),
+    "cashflow": _fundamental_records("cashflow"),
+    "financials": _fundamental("financials"),
+    "calendar": _fundamental("calendar"),
+    "major_holders": _attr("major_holders"),
+    "sustainability": _attr("sustainability"),
+    "analyst_price_targets": _attr("analyst_price_targets"),
+    "recommendations": _attr("recommendations", records=True),
+    "recommendations_summary": _attr("recommendations_summary", records=True),
+    "news": _attr("news"),
+}
+
+
+async def get_bundle(
+    provider: MarketDataProvider,
+    symbol: str,
+    sections: Iterable[str],
+    *,
+    concurrency: int,
+    deadline: float,
+) -> dict:
+    """
+    Fetch several sections of a ticker page concurrently (at most ``concurrency``
+    at a time). Sections that fail or miss the ``deadline`` are reported under
+    ``errors`` instead of failing the whole bundle.
+    """
+    symbol = ticker_cache_service.normalize_symbol(symbol)
+    sections = list(dict.fromkeys(sections))
+    results, errors = {}, {}
+
+    async for section, value, error in fan_out(
+        sections,
+        lambda section: BUNDLE_SECTIONS[section](provider, symbol),
+        limit=concurrency,
+        deadline=deadline,
+    ):
+        if error is None:
+            results[section] = value
+        else:
+            errors[section] = str(error) or type(error).__name__
+
+    return {
+        "symbol": symbol,
+        "results": {s: results[s] for s in sections if s in results},
+        "errors": {s: errors[s] for s in sections if s in errors},
+    }
@@ -0,0 +1,92 @@
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services import history_service
+from app.services.market_data_service import MarketDataProvider
+from app.services.ticker_cache_service import normalize_symbol
+from app.utils import returns as returns_math
+
+
+async def get_correlation(
+    provider: MarketDataProvider,
+    symbols: Iterable[str],
+    *,
+    period: str,
+    method: str = "simple",
+    window: int = 63,
+    benchmark: Optional[str] = None,
+    include_returns: bool = True,
+    concurrency: int,
+    deadline: float,
+) -> dict:
+    """
+    Daily returns of many symbols aligned on one date axis, with their
+    covariance and correlation matrices and each symbol's rolling correlation
+    with ``benchmark`` (the first symbol by default).
+
+    Histories come from the local store (see ``get_stored_histories``);
+    everything after that is computed on a single (dates x symbols) matrix.
+    """
+    symbols = list(dict.fromkeys(map(normalize_symbol, symbols)))
+    benchmark = normalize_symbol(benchmark) if benchmark else symbols[0]
+    if benchmark not in symbols:
+        symbols.append(benchmark)
+
+    histories, errors = await history_service.get_stored_histories(
+        provider,
+        symbols,
+        interval="1d",
+        concurrency=concurrency,
+        deadline=deadline,
+    )
+
+    found, dates, closes = [], [], []
+    for symbol in symbols:
+        if symbol not in histories:
+            errors.setdefault(symbol, "No price data found.")
+            continue
+        stored = histories[symbol]
+        close = pd.Series(
+            stored.bars["close"],
+            index=history_service.bars_index(stored.bars, stored.tz, "1d"),
+        )
+        close = history_service.slice_history(close, period=period).dropna()
+        if close.empty:
+            errors[symbol] = f"No price data in period '{period}'."
+            continue
+        found.append(symbol)
+        # Daily bars are stamped at local midnight; align on the exchange date
+        dates.append(close.index.tz_localize(None).to_numpy(dtype="M8[D]"))
+        closes.append(close.to_numpy())
+
+    union, close_matrix = returns_math.align_closes(dates, closes)
+    matrix = returns_math.returns_matrix(close_matrix, method)
+    rows = ~np.all(np.isnan(matrix), axis=1)
+    union, matrix = union[rows], matrix[rows]
+
+    result = {
+        "symbols": found,
+        "method": method,
+        "dates": np.datetime_as_string(union, unit="D").tolist(),
+        "covariance": returns_math.covariance(matrix),
+        "correlation": returns_math.correlation(matrix),
+        "rolling_correlation": None,
+        "errors": errors,
+    }
+    if include_returns:
+        result["returns"] = {s: matrix[:, i] for i, s in enumerate(found)}
+    if benchmark in found:
+        rolling = returns_math.rolling_correlation(
+            matrix,
+            matrix[:, found.index(benchmark)],
+            window,
+            min_periods=max(2, window // 2),
+        )
+        result["rolling_correlation"] = {
+            "benchmark": benchmark,
+            "window": window,
+            "values": {s: rolling[:, i] for i, s in enumerate(found)},
+        }
+    return result
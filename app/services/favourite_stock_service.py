@@ -2,6 +2,7 @@ from fastapi import HTTPException, status
 from sqlmodel import Session
 from app.schemas.favourite_stock import FavouriteStockCreate, FavouriteStockUpdate
 from app.crud.favourite_stock import favourite_stock as crud_favourite_stock
+from app.services.symbol_index_service import symbol_index
 
 
 def get_favourite_stock_by_symbol(session: Session, user_id: str, symbol: str):
@@ -27,6 +28,12 @@ def add_favourite_stock(session: Session, user_id: str, payload: FavouriteStockC
         obj_in=payload,
         user_id=user_id,
     )
+    symbol_index.add(
+        payload.symbol,
+        name=payload.company_name,
+        exchange=payload.exchange,
+        weight=1,
+    )
     return new_item
 
 
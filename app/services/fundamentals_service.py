@@ -0,0 +1,363 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.services.market_data_service import MarketDataProvider
+from app.services.ticker_cache_service import normalize_symbol
+from app.utils.freshness import mark_stale
+
+logger = logging.getLogger(__name__)
+
+# Ticker attributes that only change around reporting dates
+FUNDAMENTAL_ATTRS = {
+    "balance_sheet",
+    "cashflow",
+    "financials",
+    "earnings",
+    "earnings_history",
+    "earnings_estimate",
+    "revenue_estimate",
+    "growth_estimates",
+    "dividends",
+    "splits",
+    "calendar",
+}
+
+# Calendar keys whose dates mark a likely change of the statements
+_CALENDAR_EVENT_KEYS = ("Earnings Date", "Ex-Dividend Date", "Dividend Date")
+
+
+@dataclass
+class FundamentalsEntry:
+    value: Any
+    fetched_at: float
+    expires_at: float
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+
+def _event_times(calendar: Any) -> list[float]:
+    """Epoch seconds of every reporting/dividend date in a ticker calendar."""
+    if not isinstance(calendar, dict):
+        return []
+    times = []
+    for key in _CALENDAR_EVENT_KEYS:
+        values = calendar.get(key)
+        for value in values if isinstance(values, (list, tuple)) else [values]:
+            if isinstance(value, (date, datetime, pd.Timestamp)):
+                ts = pd.Timestamp(value)
+                ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts
+                times.append(ts.timestamp())
+    return times
+
+
+def expiry_from_calendar(calendar: Any, now: Optional[float] = None) -> float:
+    """
+    When cached fundamentals should expire given the ticker's calendar.
+
+    - Shortly after a reporting date statements are still being published, so
+      they are refreshed every FUNDAMENTALS_POST_REPORT_TTL_SECONDS.
+    - Otherwise they are kept for FUNDAMENTALS_CACHE_TTL_SECONDS, but never past
+      the next reporting date.
+
+    A random jitter spreads expiries so entries cached together are not all
+    refetched at the same moment.
+    """
+    now = time.time() if now is None else now
+    ttl = settings.FUNDAMENTALS_CACHE_TTL_SECONDS
+    events = _event_times(calendar)
+    window = settings.FUNDAMENTALS_POST_REPORT_WINDOW_SECONDS
+
+    if any(now - window <= event <= now for event in events):
+        ttl = settings.FUNDAMENTALS_POST_REPORT_TTL_SECONDS
+    else:
+        upcoming = [event for event in events if event > now]
+        if upcoming:
+            ttl = min(ttl, min(upcoming) - now)
+    return now + max(ttl, 60) * random.uniform(0.9, 1.0)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# On-disk encoding
+# ---------------------------------------------------------------------------------------------------------------------
+
+# Fundamentals are frames, series and calendar dicts. They are written as JSON
+# with tagged objects for the pandas and date types, so they load back with the
+# same labels, dtypes and timezones and nothing on disk is ever executed.
+
+
+def _encode_index(index: pd.Index) -> dict:
+    if isinstance(index, pd.DatetimeIndex):
+        return {
+            "__datetimeindex__": index.asi8.tolist(),
+            "tz": str(index.tz) if index.tz is not None else None,
+            "name": _encode(index.name),
+        }
+    return {
+        "__index__": [_encode(label) for label in index],
+        "dtype": str(index.dtype),
+        "name": _encode(index.name),
+    }
+
+
+def _decode_index(data: dict) -> pd.Index:
+    name = _decode(data["name"])
+    if "__datetimeindex__" in data:
+        index = pd.DatetimeIndex(np.array(data["__datetimeindex__"], dtype="M8[ns]"))
+        if data["tz"]:
+            index = index.tz_localize("UTC").tz_convert(data["tz"])
+        return index.rename(name)
+    return pd.Index(
+        [_decode(label) for label in data["__index__"]], dtype=data["dtype"], name=name
+    )
+
+
+def _encode_values(series: pd.Series) -> dict:
+    return {
+        "values": [_encode(value) for value in series.tolist()],
+        "dtype": str(series.dtype),
+    }
+
+
+def _decode_values(data: dict, index: pd.Index, name: Any = None) -> pd.Series:
+    series = pd.Series(
+        [_decode(value) for value in data["values"]],
+        index=index,
+        name=name,
+        dtype=object,
+    )
+    return series if data["dtype"] == "object" else series.astype(data["dtype"])
+
+
+def _encode(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return {
+            "__timestamp__": value.value,
+            "tz": str(value.tz) if value.tz is not None else None,
+        }
+    if value is pd.NaT:
+        return {"__nat__": True}
+    if value is pd.NA:
+        return None
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {"__dict__": [[_encode(k), _encode(v)] for k, v in value.items()]}
+    if isinstance(value, pd.Series):
+        return {
+            "__series__": _encode_values(value),
+            "index": _encode_index(value.index),
+            "name": _encode(value.name),
+        }
+    if isinstance(value, pd.DataFrame):
+        return {
+            "__frame__": [
+                _encode_values(value.iloc[:, i]) for i in range(value.shape[1])
+            ],
+            "index": _encode_index(value.index),
+            "columns": _encode_index(value.columns),
+        }
+    raise TypeError(f"Cannot store {type(value).__name__} values")
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "__timestamp__" in value:
+        ts = pd.Timestamp(value["__timestamp__"])
+        return ts.tz_localize("UTC").tz_convert(value["tz"]) if value["tz"] else ts
+    if "__nat__" in value:
+        return pd.NaT
+    if "__datetime__" in value:
+        return datetime.fromisoformat(value["__datetime__"])
+    if "__date__" in value:
+        return date.fromisoformat(value["__date__"])
+    if "__dict__" in value:
+        return {_decode(k): _decode(v) for k, v in value["__dict__"]}
+    if "__series__" in value:
+        index = _decode_index(value["index"])
+        return _decode_values(value["__series__"], index, _decode(value["name"]))
+    if "__frame__" in value:
+        index = _decode_index(value["index"])
+        frame = pd.DataFrame(
+            {
+                i: _decode_values(data, index)
+                for i, data in enumerate(value["__frame__"])
+            },
+            index=index,
+        )
+        frame.columns = _decode_index(value["columns"])
+        return frame
+    raise ValueError(f"Unknown stored value {sorted(value)}")
+
+
+class FundamentalsCache:
+    """
+    Per-(symbol, attribute) cache whose entries each carry their own expiry.
+
+    When ``directory`` is set, entries are also written to disk as JSON and
+    loaded lazily on a memory miss, so a restarted process serves from disk
+    instead of refetching every statement at once.
+    """
+
+    def __init__(self, *, max_entries: int, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: OrderedDict[tuple[str, str], FundamentalsEntry] = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key: tuple[str, str]) -> str:
+        symbol, attr = key
+        safe = "".join(
+            c if c.isalnum() or c in ".-" else f"%{ord(c):02X}" for c in symbol
+        )
+        return os.path.join(self.directory, f"{safe}.{attr}.json")
+
+    def _load(self, key: tuple[str, str]) -> Optional[FundamentalsEntry]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                saved = json.load(f)
+            return FundamentalsEntry(
+                value=_decode(saved["value"]),
+                fetched_at=saved["fetched_at"],
+                expires_at=saved["expires_at"],
+            )
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Could not load cached fundamentals %r: %s", key, e)
+            return None
+
+    def _dump(self, key: tuple[str, str], entry: FundamentalsEntry) -> None:
+        payload = {
+            "value": _encode(entry.value),
+            "fetched_at": entry.fetched_at,
+            "expires_at": entry.expires_at,
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    async def get(self, key: tuple[str, str]) -> Optional[FundamentalsEntry]:
+        entry = self._entries.get(key)
+        if entry is None and self.directory:
+            entry = await asyncio.to_thread(self._load, key)
+            if entry is not None:
+                self.disk_hits += 1
+                self._remember(key, entry)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: tuple[str, str], entry: FundamentalsEntry) -> None:
+        self._remember(key, entry)
+        if self.directory:
+            try:
+                await asyncio.to_thread(self._dump, key, entry)
+            except Exception as e:
+                logger.warning("Could not persist fundamentals %r: %s", key, e)
+
+    def _remember(self, key: tuple[str, str], entry: FundamentalsEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "name": "fundamentals",
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "persistent": bool(self.directory),
+        }
+
+
+fundamentals_cache = FundamentalsCache(
+    max_entries=settings.FUNDAMENTALS_CACHE_MAX_ENTRIES,
+    directory=settings.FUNDAMENTALS_CACHE_DIR,
+)
+
+
+async def get_fundamental(provider: MarketDataProvider, symbol: str, attr: str) -> Any:
+    """
+    Return a fundamentals attribute (statement, estimates, dividends...) for a
+    symbol, cached until the ticker's next reporting event.
+
+    If a refresh fails the expired value is served rather than an error.
+    """
+    if attr not in FUNDAMENTAL_ATTRS:
+        raise ValueError(f"'{attr}' is not a cached fundamentals attribute.")
+    symbol = normalize_symbol(symbol)
+    key = (symbol, attr)
+
+    entry = await fundamentals_cache.get(key)
+    if entry is not None and not entry.expired:
+        fundamentals_cache.hits += 1
+        return entry.value
+
+    fundamentals_cache.misses += 1
+    try:
+        value = await provider.get_ticker_attr(symbol, attr)
+    except Exception as e:
+        if entry is None:
+            raise
+        logger.warning("Serving expired %s for %s: %s", attr, symbol, e)
+        mark_stale(time.time() - entry.fetched_at)
+        return entry.value
+
+    calendar = value
+    if attr != "calendar":
+        try:
+            calendar = await get_fundamental(provider, symbol, "calendar")
+        except Exception as e:
+            # Without a calendar the default TTL applies
+            logger.warning("No calendar for %s: %s", symbol, e)
+            calendar = None
+
+    now = time.time()
+    await fundamentals_cache.set(
+        key,
+        FundamentalsEntry(
+            value=value, fetched_at=now, expires_at=expiry_from_calendar(calendar, now)
+        ),
+    )
+    return value
+
+
+def get_cache_stats() -> dict:
+    return fundamentals_cache.stats()
@@ -0,0 +1,584 @@
+import asyncio
+import fcntl
+import json
+import os
+import re
+import tempfile
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services.market_data_service import MarketDataProvider
+from app.services.ticker_cache_service import symbol_calendar
+from app.utils.cache import UNAVAILABLE_STATUSES, TTLCache
+from app.utils.concurrency import KeyedLock, fan_out
+from app.utils.freshness import mark_stale
+from app.utils.symbol_access import record_access
+from app.utils.stocks import HISTORY_FIELDS
+from app.utils.trading_calendar import ExchangeCalendar, market_hours_ttl
+
+
+BAR_DTYPE = np.dtype(
+    [
+        ("timestamp", "i8"),  # UTC epoch nanoseconds
+        ("open", "f8"),
+        ("high", "f8"),
+        ("low", "f8"),
+        ("close", "f8"),
+        ("volume", "i8"),
+        ("dividends", "f8"),
+        ("stock_splits", "f8"),
+    ]
+)
+
+# How far back the initial download goes per interval (Yahoo's own limits)
+BACKFILL_PERIODS = {
+    "1m": "7d",
+    "2m": "60d",
+    "5m": "60d",
+    "15m": "60d",
+    "30m": "60d",
+    "90m": "60d",
+    "60m": "730d",
+    "1h": "730d",
+    "1d": "max",
+    "5d": "max",
+    "1wk": "max",
+    "1mo": "max",
+    "3mo": "max",
+}
+
+DAILY_INTERVALS = {"1d", "5d", "1wk", "1mo", "3mo"}
+
+# Bars spanning several sessions, whose timestamps say nothing about which
+# sessions they cover
+_MULTI_SESSION_INTERVALS = DAILY_INTERVALS - {"1d"}
+
+_PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+_SESSION_PERIODS = {"1d": 1, "5d": 5}
+
+
+@dataclass
+class StoredHistory:
+    bars: np.ndarray
+    tz: str
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+def frame_to_bars(frame: pd.DataFrame) -> np.ndarray:
+    """Convert a yfinance history DataFrame into a structured bar array."""
+    bars = np.zeros(len(frame), dtype=BAR_DTYPE)
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    bars["timestamp"] = index.tz_convert("UTC").asi8
+    for column, field in HISTORY_FIELDS.items():
+        if column in frame:
+            values = frame[column].to_numpy(dtype="f8", na_value=np.nan)
+            if field == "volume":
+                values = np.nan_to_num(values).round()
+            bars[field] = values
+    return bars
+
+
+def bars_to_frame(bars: np.ndarray, tz: str, interval: str) -> pd.DataFrame:
+    """Rebuild a yfinance-shaped history DataFrame from stored bars."""
+    return pd.DataFrame(
+        {column: bars[field] for column, field in HISTORY_FIELDS.items()},
+        index=bars_index(bars, tz, interval),
+    )
+
+
+def bars_index(bars: np.ndarray, tz: str, interval: str) -> pd.DatetimeIndex:
+    # Cast first: a strided field of a structured array sends pd.to_datetime
+    # down its slow per-object path
+    index = pd.DatetimeIndex(bars["timestamp"].astype("M8[ns]"))
+    index = index.tz_localize("UTC").tz_convert(tz)
+    index.name = "Date" if interval in DAILY_INTERVALS else "Datetime"
+    return index
+
+
+def _merge_bars(stored: np.ndarray, fresh: np.ndarray) -> np.ndarray:
+    """Replace stored bars from the first fresh timestamp onwards."""
+    if len(fresh) == 0:
+        return stored
+    keep = stored[stored["timestamp"] < fresh["timestamp"][0]]
+    return np.concatenate([keep, fresh])
+
+
+def _overlap(bars: np.ndarray) -> int:
+    return bars["timestamp"][-2 if len(bars) > 1 else -1]
+
+
+def _needs_full_refresh(stored: np.ndarray, fresh: np.ndarray) -> bool:
+    """
+    Prices are split/dividend adjusted, so a new corporate action or a changed
+    overlapping bar means every stored bar is stale.
+    """
+    if len(stored) < 2 or len(fresh) == 0:
+        return False
+    anchor = stored[-2]
+    match = fresh[fresh["timestamp"] == anchor["timestamp"]]
+    if len(match) == 0 or not np.isclose(match["close"][0], anchor["close"]):
+        return True
+    new = fresh[fresh["timestamp"] > stored["timestamp"][-1]]
+    return bool(np.any(new["dividends"] != 0) or np.any(new["stock_splits"] != 0))
+
+
+def _window_start(interval: str, now: datetime) -> Optional[int]:
+    """Oldest timestamp Yahoo still serves bars of ``interval`` for, if limited."""
+    period = BACKFILL_PERIODS[interval]
+    if period == "max":
+        return None
+    return (pd.Timestamp(now) - pd.Timedelta(period)).value
+
+
+def _trim(bars: np.ndarray, interval: str, now: datetime) -> np.ndarray:
+    """Drop intraday bars that have fallen out of Yahoo's window."""
+    start = _window_start(interval, now)
+    return bars if start is None else bars[bars["timestamp"] >= start]
+
+
+def _out_of_window(stored: np.ndarray, interval: str, now: datetime) -> bool:
+    """
+    Whether the overlap bar is too old to fetch from: Yahoo returns nothing
+    for an intraday start older than its window, so the store could never
+    catch up incrementally.
+    """
+    start = _window_start(interval, now)
+    return start is not None and _overlap(stored) < start
+
+
+def _missed_session(
+    stored: np.ndarray,
+    fresh: np.ndarray,
+    interval: str,
+    calendar: Optional[ExchangeCalendar],
+    now: datetime,
+) -> bool:
+    """
+    Whether an incremental fetch came back empty although the store does not
+    reach the last completed session.
+    """
+    if len(fresh) or calendar is None or interval in _MULTI_SESSION_INTERVALS:
+        return False
+    previous = calendar.previous_session(now)
+    if previous is None:
+        return False
+    # Daily bars are stamped at local midnight of their session
+    session_start = pd.Timestamp(previous.day).tz_localize(calendar.tz).value
+    return bool(stored["timestamp"][-1] < session_start)
+
+
+class HistoryStore:
+    """
+    On-disk OHLCV store: one ``.npz`` of structured bars per (symbol, interval).
+
+    Writes go to a temporary file followed by an atomic ``os.replace`` so readers
+    never need a lock. Writers serialise across processes with an exclusive
+    ``flock`` on a sidecar lock file.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _base(self, symbol: str, interval: str) -> str:
+        safe = re.sub(
+            r"[^A-Z0-9.\-]", lambda m: f"%{ord(m.group()):02X}", symbol.upper()
+        )
+        return os.path.join(self.root, f"{safe}_{interval}")
+
+    def read(self, symbol: str, interval: str) -> Optional[StoredHistory]:
+        path = self._base(symbol, interval) + ".npz"
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                return StoredHistory(
+                    bars=data["bars"], tz=meta["tz"], fetched_at=meta["fetched_at"]
+                )
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            return None
+
+    def write(self, symbol: str, interval: str, bars: np.ndarray, tz: str) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        path = self._base(symbol, interval) + ".npz"
+        meta = json.dumps({"tz": tz, "fetched_at": time.time()})
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, bars=bars, meta=np.array(meta))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @contextmanager
+    def lock(self, symbol: str, interval: str) -> Iterator[None]:
+        """Exclusive cross-process writer lock (blocking; call from a thread)."""
+        os.makedirs(self.root, exist_ok=True)
+        with open(self._base(symbol, interval) + ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @asynccontextmanager
+    async def locked(self, symbol: str, interval: str) -> AsyncIterator[None]:
+        """
+        ``lock`` held across awaits. The flock is taken on a worker thread; if
+        the caller is cancelled while waiting for it, it is released as soon as
+        that thread gets it instead of being held forever.
+        """
+        lock = self.lock(symbol, interval)
+        acquire = asyncio.ensure_future(asyncio.to_thread(lock.__enter__))
+        try:
+            await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+
+            def release(future: asyncio.Future) -> None:
+                if not future.cancelled() and future.exception() is None:
+                    lock.__exit__(None, None, None)
+
+            acquire.add_done_callback(release)
+            raise
+        try:
+            yield
+        finally:
+            # Runs to completion on the thread even if this await is cancelled
+            await asyncio.to_thread(lock.__exit__, None, None, None)
+
+
+history_store = HistoryStore(settings.HISTORY_STORE_DIR)
+
+# In-process writers per (symbol, interval), in front of the cross-process flock
+_refresh_locks = KeyedLock()
+
+prepost_cache = TTLCache(
+    name="prepost_history",
+    ttl=settings.HISTORY_STORE_REFRESH_SECONDS,
+    stale_ttl=settings.HISTORY_STORE_REFRESH_SECONDS,
+    max_entries=settings.TICKER_CACHE_MAX_ENTRIES,
+    ttl_policy=market_hours_ttl(
+        settings.HISTORY_STORE_REFRESH_SECONDS,
+        settings.CLOSED_MARKET_CACHE_MAX_TTL_SECONDS,
+        lambda key, _: symbol_calendar(key[0]),
+    ),
+)
+
+
+def _needs_refresh(symbol: str, stored: Optional[StoredHistory]) -> bool:
+    """
+    Stored bars are refreshed once older than HISTORY_STORE_REFRESH_SECONDS,
+    unless the symbol's exchange is closed and they were fetched at least one
+    refresh interval (time for late corrections) after its last session ended.
+    """
+    if stored is None:
+        return True
+    refresh = settings.HISTORY_STORE_REFRESH_SECONDS
+    if stored.age < refresh:
+        return False
+    calendar = symbol_calendar(symbol)
+    quiet_since = calendar.quiet_since() if calendar is not None else None
+    return quiet_since is None or stored.fetched_at < quiet_since.timestamp() + refresh
+
+
+def slice_history(
+    frame: pd.DataFrame,
+    *,
+    period: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> pd.DataFrame:
+    """Select the bars yfinance would return for ``period`` or ``start``/``end``."""
+    if frame.empty:
+        return frame
+    index = frame.index
+    tz = index.tz
+
+    if start and end:
+        mask = (index >= pd.Timestamp(start, tz=tz)) & (
+            index < pd.Timestamp(end, tz=tz)
+        )
+        return frame[mask]
+
+    if not period or period == "max":
+        return frame
+    if period in _SESSION_PERIODS:
+        sessions = index.normalize()
+        first = sessions.unique()[-_SESSION_PERIODS[period] :][0]
+        return frame[sessions >= first]
+    now = pd.Timestamp.now(tz=tz)
+    if period == "ytd":
+        return frame[index >= now.normalize().replace(month=1, day=1)]
+    return frame[index >= now - _PERIOD_OFFSETS[period]]
+
+
+async def _refresh(
+    provider: MarketDataProvider, symbol: str, interval: str
+) -> Optional[StoredHistory]:
+    """Fetch only bars newer than the store holds (or backfill) and persist them."""
+    async with history_store.locked(symbol, interval):
+        # Another process may have refreshed while we waited for the lock
+        stored = await asyncio.to_thread(history_store.read, symbol, interval)
+        if not _needs_refresh(symbol, stored):
+            return stored
+
+        now = datetime.now(timezone.utc)
+        if (
+            stored is not None
+            and len(stored.bars)
+            and not _out_of_window(stored.bars, interval, now)
+        ):
+            fresh_frame = await provider.get_history(
+                symbol,
+                interval=interval,
+                start=pd.Timestamp(_overlap(stored.bars), tz="UTC").to_pydatetime(),
+            )
+            fresh = frame_to_bars(fresh_frame)
+            if not (
+                _needs_full_refresh(stored.bars, fresh)
+                or _missed_session(
+                    stored.bars, fresh, interval, symbol_calendar(symbol), now
+                )
+            ):
+                bars = _trim(_merge_bars(stored.bars, fresh), interval, now)
+                await asyncio.to_thread(
+                    history_store.write, symbol, interval, bars, stored.tz
+                )
+                return StoredHistory(bars=bars, tz=stored.tz, fetched_at=time.time())
+
+        return await _backfill(provider, symbol, interval)
+
+
+async def _backfill(
+    provider: MarketDataProvider, symbol: str, interval: str
+) -> Optional[StoredHistory]:
+    """Download the full history and replace the stored bars (caller holds the lock)."""
+    frame = await provider.get_history(
+        symbol, interval=interval, period=BACKFILL_PERIODS[interval]
+    )
+    if frame.empty:
+        return None
+    tz = str(pd.DatetimeIndex(frame.index).tz or "UTC")
+    bars = frame_to_bars(frame)
+    await asyncio.to_thread(history_store.write, symbol, interval, bars, tz)
+    return StoredHistory(bars=bars, tz=tz, fetched_at=time.time())
+
+
+def get_cache_stats() -> dict:
+    return prepost_cache.stats()
+
+
+async def get_history(
+    provider: MarketDataProvider,
+    symbol: str,
+    *,
+    interval: str,
+    period: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    prepost: bool = False,
+) -> pd.DataFrame:
+    """
+    Return OHLCV history for a symbol, served from the local history store.
+
+    The store is refreshed incrementally once it is older than
+    HISTORY_STORE_REFRESH_SECONDS, and not at all while the exchange stays
+    closed. Pre/post-market requests are not stored; they are cached in memory
+    under the same policy instead.
+    """
+    symbol = symbol.strip().upper()
+    record_access(symbol)
+    if prepost or not settings.HISTORY_STORE_ENABLED:
+
+        async def fetch() -> pd.DataFrame:
+            if start and end:
+                return await provider.get_history(
+                    symbol, interval=interval, start=start, end=end, prepost=prepost
+                )
+            return await provider.get_history(
+                symbol, interval=interval, period=period, prepost=prepost
+            )
+
+        if not prepost:
+            return await fetch()
+        return await prepost_cache.get_or_fetch(
+            (symbol, interval, period, start, end), fetch
+        )
+
+    stored = await asyncio.to_thread(history_store.read, symbol, interval)
+    if _needs_refresh(symbol, stored):
+        async with _refresh_locks.hold((symbol, interval)):
+            try:
+                stored = await _refresh(provider, symbol, interval)
+            except HTTPException as e:
+                if stored is None or e.status_code not in UNAVAILABLE_STATUSES:
+                    raise
+                # Upstream is unavailable; serve what the store holds
+                mark_stale(stored.age)
+
+    if stored is None:
+        return pd.DataFrame(columns=list(HISTORY_FIELDS))
+    frame = bars_to_frame(stored.bars, stored.tz, interval)
+    return slice_history(frame, period=period, start=start, end=end)
+
+
+async def _bulk_refresh(
+    provider: MarketDataProvider, stale: dict[str, StoredHistory], interval: str
+) -> tuple[dict[str, StoredHistory], list[str]]:
+    """
+    Bring many stored histories up to date with one multi-symbol download.
+    Returns the refreshed histories and the symbols that need a full backfill.
+
+    The download's index is UTC whatever the exchange, which is why only
+    symbols whose timezone is already stored go through here.
+    """
+    now = datetime.now(timezone.utc)
+    start = min(_overlap(stored.bars) for stored in stale.values())
+    frame = await provider.download(
+        list(stale),
+        interval=interval,
+        start=pd.Timestamp(start, tz="UTC").to_pydatetime(),
+        actions=True,
+        auto_adjust=True,
+        ignore_tz=False,
+    )
+
+    refreshed: dict[str, StoredHistory] = {}
+    backfill: list[str] = []
+    columns = frame.columns.get_level_values(1) if not frame.empty else ()
+    for symbol, stored in stale.items():
+        if symbol not in columns:
+            # Failed upstream; keep serving what is stored
+            refreshed[symbol] = stored
+            continue
+        fresh_frame = frame.xs(symbol, axis=1, level=1).dropna(subset=["Close"])
+        entry = await _merge_locked(symbol, interval, frame_to_bars(fresh_frame), now)
+        if entry is None:
+            backfill.append(symbol)
+        else:
+            refreshed[symbol] = entry
+    return refreshed, backfill
+
+
+async def _merge_locked(
+    symbol: str, interval: str, fresh: np.ndarray, now: datetime
+) -> Optional[StoredHistory]:
+    """
+    Merge downloaded bars into the store under the same locks as ``_refresh``.
+    The store is re-read first: another writer may have refreshed or
+    re-adjusted it since ``get_stored_histories`` read it. Returns None when
+    the symbol needs a full backfill instead.
+    """
+    async with _refresh_locks.hold((symbol, interval)):
+        async with history_store.locked(symbol, interval):
+            stored = await asyncio.to_thread(history_store.read, symbol, interval)
+            if stored is None or len(stored.bars) == 0:
+                return None
+            if not _needs_refresh(symbol, stored):
+                return stored
+            fresh = fresh[fresh["timestamp"] >= _overlap(stored.bars)]
+            calendar = symbol_calendar(symbol)
+            if _missed_session(stored.bars, fresh, interval, calendar, now):
+                return None
+            if len(fresh) == 0:
+                return stored
+            if _needs_full_refresh(stored.bars, fresh):
+                return None
+            bars = _trim(_merge_bars(stored.bars, fresh), interval, now)
+            await asyncio.to_thread(
+                history_store.write, symbol, interval, bars, stored.tz
+            )
+            return StoredHistory(bars=bars, tz=stored.tz, fetched_at=time.time())
+
+
+async def _backfill_locked(
+    provider: MarketDataProvider, symbol: str, interval: str
+) -> Optional[StoredHistory]:
+    async with _refresh_locks.hold((symbol, interval)):
+        async with history_store.locked(symbol, interval):
+            return await _backfill(provider, symbol, interval)
+
+
+async def get_stored_histories(
+    provider: MarketDataProvider,
+    symbols: Iterable[str],
+    *,
+    interval: str,
+    concurrency: int,
+    deadline: float,
+) -> tuple[dict[str, StoredHistory], dict[str, str]]:
+    """
+    Multi-symbol counterpart of ``get_history`` returning the stored bars of
+    every symbol that has any, plus per-symbol errors.
+
+    Fresh symbols are read straight from the store, stale ones are refreshed
+    together in one bulk download and only symbols the store has never seen
+    (or whose prices were re-adjusted) are backfilled one by one.
+    """
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols))
+    stored = await asyncio.to_thread(
+        lambda: {symbol: history_store.read(symbol, interval) for symbol in symbols}
+    )
+
+    now = datetime.now(timezone.utc)
+    histories: dict[str, StoredHistory] = {}
+    stale: dict[str, StoredHistory] = {}
+    backfill: list[str] = []
+    for symbol, entry in stored.items():
+        if entry is None or len(entry.bars) == 0:
+            backfill.append(symbol)
+        elif _needs_refresh(symbol, entry):
+            if _out_of_window(entry.bars, interval, now):
+                backfill.append(symbol)
+            else:
+                stale[symbol] = entry
+        else:
+            histories[symbol] = entry
+
+    errors: dict[str, str] = {}
+    if stale:
+        try:
+            refreshed, needs_backfill = await _bulk_refresh(provider, stale, interval)
+            histories.update(refreshed)
+            backfill.extend(needs_backfill)
+        except Exception:
+            # Serve the stored bars rather than failing the whole request
+            histories.update(stale)
+            mark_stale(max(entry.age for entry in stale.values()))
+
+    async for symbol, entry, error in fan_out(
+        backfill,
+        lambda symbol: _backfill_locked(provider, symbol, interval),
+        limit=concurrency,
+        deadline=deadline,
+    ):
+        if error is not None:
+            errors[symbol] = str(error) or type(error).__name__
+        elif entry is None:
+            errors[symbol] = "No price data found."
+        else:
+            histories[symbol] = entry
+
+    return {s: histories[s] for s in symbols if s in histories}, errors
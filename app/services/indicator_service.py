@@ -0,0 +1,119 @@
+from typing import Any, Iterable, Optional
+
+import pandas as pd
+
+from app.core.config import settings
+from app.services import history_service
+from app.services.market_data_service import MarketDataProvider
+from app.services.ticker_cache_service import normalize_symbol
+from app.utils.cache import TTLCache
+from app.utils.indicators import INDICATORS
+from app.utils.serialization import iso_timestamps
+
+# Entries are keyed on the last bar, so a new bar is a new key; the TTL only
+# bounds how long superseded entries linger
+indicator_cache = TTLCache(
+    name="indicators",
+    ttl=settings.INDICATOR_CACHE_TTL_SECONDS,
+    stale_ttl=0,
+    max_entries=settings.INDICATOR_CACHE_MAX_ENTRIES,
+)
+
+MAX_INDICATOR_PERIOD = 1000
+
+_PRICE_COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close"}
+
+
+def parse_indicator(spec: str) -> tuple[str, tuple]:
+    """
+    Parse ``name[:param[:param...]]`` (e.g. ``"rsi:14"``, ``"macd:12:26:9"``).
+    Omitted parameters take the indicator's defaults.
+    """
+    name, *raw = [part.strip() for part in spec.strip().lower().split(":")]
+    if name not in INDICATORS:
+        raise ValueError(
+            f"Unknown indicator '{name}'. Must be one of {sorted(INDICATORS)}."
+        )
+    defaults = INDICATORS[name][2]
+    if len(raw) > len(defaults):
+        raise ValueError(f"'{name}' takes at most {len(defaults)} parameters.")
+
+    params = []
+    for value, default in zip(raw + [None] * len(defaults), defaults):
+        if value is None or value == "":
+            params.append(default)
+            continue
+        try:
+            parsed = type(default)(value)
+        except ValueError:
+            raise ValueError(f"Invalid parameter '{value}' for '{name}'.")
+        if not 0 < parsed <= MAX_INDICATOR_PERIOD:
+            raise ValueError(
+                f"Parameters of '{name}' must be between 0 and {MAX_INDICATOR_PERIOD}."
+            )
+        params.append(parsed)
+    return name, tuple(params)
+
+
+def indicator_label(name: str, params: tuple) -> str:
+    """Response key, e.g. ``macd_12_26_9`` or ``bbands_20_2``."""
+    return "_".join([name, *(f"{p:g}" for p in params)])
+
+
+def _compute(name: str, params: tuple, history: pd.DataFrame) -> Any:
+    fn, inputs, _ = INDICATORS[name]
+    arrays = [history[_PRICE_COLUMNS[column]].to_numpy(dtype="f8") for column in inputs]
+    return fn(*arrays, *params)
+
+
+async def get_indicators(
+    provider: MarketDataProvider,
+    symbol: str,
+    indicators: Iterable[tuple[str, tuple]],
+    *,
+    interval: str,
+    period: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> dict:
+    """
+    Compute indicators over the symbol's full stored history and return the
+    part covering ``period`` (or ``start``/``end``), so the warm-up of long
+    averages never eats into the requested window.
+
+    Results are memoised per (symbol, interval, indicator, params, last bar).
+    """
+    symbol = normalize_symbol(symbol)
+    history = await history_service.get_history(
+        provider, symbol, interval=interval, period="max"
+    )
+    if history.empty:
+        return {"timestamp": [], "indicators": {}}
+
+    history = history.sort_index()
+    window = history_service.slice_history(history, period=period, start=start, end=end)
+    lo = history.index.searchsorted(window.index[0]) if len(window) else len(history)
+    hi = lo + len(window)
+    last_bar = (len(history), history.index[-1].value)
+
+    results = {}
+    for name, params in dict.fromkeys(indicators):
+
+        async def compute():
+            return _compute(name, params, history)
+
+        values = await indicator_cache.get_or_fetch(
+            (symbol, interval, name, params, last_bar), compute
+        )
+        if isinstance(values, dict):
+            results[indicator_label(name, params)] = {
+                key: series[lo:hi] for key, series in values.items()
+            }
+        else:
+            results[indicator_label(name, params)] = values[lo:hi]
+
+    return {"timestamp": iso_timestamps(window.index), "indicators": results}
+
+
+def get_cache_stats() -> dict:
+    return indicator_cache.stats()
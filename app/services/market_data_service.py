@@ -0,0 +1,689 @@
+import asyncio
+import hashlib
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Any, Callable, Hashable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from curl_cffi.requests.exceptions import RequestException as CurlRequestException
+from yfinance.data import YfData
+from yfinance.exceptions import YFRateLimitError
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.utils.concurrency import (
+    AdaptiveLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    SingleFlight,
+)
+from app.utils.trading_calendar import NYSE
+
+
+YAHOO_HOST = "query2.finance.yahoo.com"
+YAHOO_QUOTE_HOST = "query1.finance.yahoo.com"
+YAHOO_QUOTE_URL = f"https://{YAHOO_QUOTE_HOST}/v7/finance/quote"
+
+_DOMAIN_FACTORIES: dict[str, Callable[[str], Any]] = {
+    "ticker": yf.Ticker,
+    "sector": yf.Sector,
+    "industry": yf.Industry,
+    "market": yf.Market,
+}
+
+
+def _freeze(value: Any) -> Hashable:
+    """Turn call parameters into a hashable, order-independent key."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, Hashable) and not hasattr(value, "__dict__"):
+        return value
+    # Query objects and the like: fall back to their textual form
+    return repr(value)
+
+
+def _resolve_attr(obj: Any, path: str) -> Any:
+    """Resolve a dotted attribute path, e.g. ``"ticker.info"``."""
+    for part in path.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def _circuit_open(breaker: CircuitBreaker) -> HTTPException:
+    retry_after = max(1, math.ceil(breaker.retry_after()))
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(CircuitOpenError(breaker.name, retry_after)),
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+def _admit(breaker: Optional[CircuitBreaker]) -> bool:
+    """Ask the host's breaker for a slot; an open circuit becomes a 503."""
+    if breaker is None:
+        return False
+    try:
+        return breaker.allow()
+    except CircuitOpenError:
+        raise _circuit_open(breaker)
+
+
+def _upstream_failure(error: Exception) -> Optional[HTTPException]:
+    """
+    Map throttling and transport/server errors from upstream to an HTTP error;
+    None for anything else (e.g. an unknown symbol), which is not the
+    upstream's fault and must not trip the breaker.
+    """
+    response = getattr(error, "response", None)
+    status_code = getattr(response, "status_code", None)
+    if isinstance(error, YFRateLimitError) or status_code == 429:
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Upstream market data rate limit reached, try again later.",
+        )
+    if isinstance(error, CurlRequestException) and (
+        status_code is None or status_code >= 500
+    ):
+        return HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Upstream market data request failed: {error}",
+        )
+    return None
+
+
+class MarketDataProvider(ABC):
+    """
+    Awaitable gateway for every upstream market-data call.
+
+    Blocking upstream calls run on a bounded, dedicated thread pool so that one
+    slow round trip never stalls the event loop. Each upstream host gets its own
+    concurrency limit and every call is bounded by a timeout. Subclasses only
+    implement the blocking ``_fetch_*`` methods.
+    """
+
+    host: str = YAHOO_HOST
+
+    def __init__(
+        self,
+        *,
+        max_workers: int,
+        host_concurrency: int,
+        timeout: float,
+        host_limits: Optional[dict[str, int]] = None,
+        min_concurrency: int = 1,
+        breaker: Optional[dict[str, Any]] = None,
+    ):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="market-data"
+        )
+        self._host_concurrency = host_concurrency
+        self._host_limits = host_limits or {}
+        self._min_concurrency = min_concurrency
+        self._limiters: dict[str, AdaptiveLimiter] = {}
+        self._breaker_options = breaker
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._single_flight = SingleFlight()
+        self.timeout = timeout
+
+    def _limiter(self, host: str) -> AdaptiveLimiter:
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limit = self._host_limits.get(host, self._host_concurrency)
+            limiter = AdaptiveLimiter(
+                initial=limit,
+                min_limit=min(self._min_concurrency, limit),
+                max_limit=limit,
+            )
+            self._limiters[host] = limiter
+        return limiter
+
+    def _breaker(self, host: str) -> Optional[CircuitBreaker]:
+        if self._breaker_options is None:
+            return None
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(name=host, **self._breaker_options)
+            self._breakers[host] = breaker
+        return breaker
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        host: Optional[str] = None,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Run a blocking callable on the market-data executor.
+
+        Each host has a circuit breaker and an adaptive (AIMD) concurrency limit:
+        rate limits and timeouts shrink the limit, successes grow it back, and
+        a host that keeps failing or answering slowly is cut off with a 503
+        (plus Retry-After) instead of being called again.
+
+        The slot is released as soon as the timeout fires; the worker thread
+        itself cannot be interrupted and finishes in the background, which is
+        why the executor size is bounded separately.
+        """
+        host = host or self.host
+        limit = timeout or self.timeout
+        breaker = self._breaker(host)
+        probe = _admit(breaker)
+        limiter = self._limiter(host)
+        try:
+            started_at = await limiter.acquire()
+        except BaseException:
+            if breaker is not None:
+                breaker.release(probe=probe)
+            raise
+        if breaker is not None and not probe and breaker.state != breaker.CLOSED:
+            # The circuit opened while this call was queued
+            limiter.release(started_at, success=False)
+            raise _circuit_open(breaker)
+
+        ok, overloaded = None, False
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+            try:
+                result = await asyncio.wait_for(future, timeout=limit)
+            except asyncio.TimeoutError:
+                ok, overloaded = False, True
+                raise HTTPException(
+                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                    detail=f"Upstream market data request timed out after {limit:g}s.",
+                )
+            except Exception as e:
+                failure = _upstream_failure(e)
+                if failure is None:
+                    # Upstream answered; the data itself was unusable
+                    ok = True
+                    raise
+                ok = False
+                overloaded = failure.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+                raise failure from e
+            ok = True
+            return result
+        finally:
+            limiter.release(started_at, success=bool(ok), overloaded=overloaded)
+            if breaker is not None:
+                if ok is None:
+                    breaker.release(probe=probe)
+                else:
+                    breaker.record(
+                        ok=ok, duration=time.monotonic() - started_at, probe=probe
+                    )
+
+    async def _shared(
+        self, kind: str, key: Any, params: Any, fn: Callable[..., Any], *args, **kwargs
+    ) -> Any:
+        """
+        Run ``fn`` through the single-flight layer: concurrent calls with the same
+        (kind, normalised key, params) share one in-flight upstream request.
+        """
+        if isinstance(key, str):
+            key = key.strip().upper()
+        flight_key = (kind, _freeze(key), _freeze(params))
+        return await self._single_flight.do(
+            flight_key, lambda: self.run(fn, *args, **kwargs)
+        )
+
+    def stats(self) -> dict:
+        return {
+            "single_flight": self._single_flight.stats(),
+            "hosts": {
+                host: {
+                    "concurrency": limiter.stats(),
+                    "breaker": (
+                        self._breakers[host].stats() if host in self._breakers else None
+                    ),
+                }
+                for host, limiter in self._limiters.items()
+            },
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # Awaitable API
+    # -----------------------------------------------------------------------------------------------------------------
+
+    async def get_info(self, symbol: str) -> dict:
+        return await self._shared("info", symbol, None, self._fetch_info, symbol)
+
+    async def get_fast_info(self, symbol: str) -> dict:
+        return await self._shared(
+            "fast_info", symbol, None, self._fetch_fast_info, symbol
+        )
+
+    async def get_history(self, symbol: str, **kwargs) -> pd.DataFrame:
+        return await self._shared(
+            "history", symbol, kwargs, self._fetch_history, symbol, **kwargs
+        )
+
+    async def get_attrs(self, kind: str, key: str, attrs: Sequence[str]) -> dict:
+        """
+        Read several (possibly dotted) attributes of one yfinance domain object
+        ("ticker", "sector", "industry" or "market") in a single worker call.
+        """
+        if kind not in _DOMAIN_FACTORIES:
+            raise ValueError(f"Unknown market data kind '{kind}'")
+        attrs = tuple(attrs)
+        return await self._shared(kind, key, attrs, self._fetch_attrs, kind, key, attrs)
+
+    async def get_ticker_attr(self, symbol: str, attr: str) -> Any:
+        data = await self.get_attrs("ticker", symbol, [attr])
+        return data[attr]
+
+    async def download(self, symbols: Sequence[str], **kwargs) -> pd.DataFrame:
+        symbols = list(symbols)
+        return await self._shared(
+            "download", tuple(symbols), kwargs, self._fetch_download, symbols, **kwargs
+        )
+
+    async def get_quotes(self, symbols: Sequence[str]) -> pd.DataFrame:
+        """
+        Fetch quotes for many symbols in one bulk upstream call.
+        Returns one row per symbol found (Yahoo quote field names as columns).
+        """
+        symbols = list(symbols)
+        return await self.run(self._fetch_quotes, symbols, host=YAHOO_QUOTE_HOST)
+
+    async def screen(self, query: Any, **kwargs) -> dict:
+        return await self._shared(
+            "screen", query, kwargs, self._fetch_screen, query, **kwargs
+        )
+
+    async def lookup(self, query: str, kind: str = "all", count: int = 10):
+        return await self._shared(
+            "lookup", query, (kind, count), self._fetch_lookup, query, kind, count
+        )
+
+    async def search(self, query: str, **kwargs) -> dict:
+        return await self._shared(
+            "search", query, kwargs, self._fetch_search, query, **kwargs
+        )
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # Blocking fetchers (run on the executor)
+    # -----------------------------------------------------------------------------------------------------------------
+
+    @abstractmethod
+    def _fetch_info(self, symbol: str) -> dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _fetch_fast_info(self, symbol: str) -> dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _fetch_history(self, symbol: str, **kwargs) -> pd.DataFrame:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _fetch_attrs(self, kind: str, key: str, attrs: tuple[str, ...]) -> dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _fetch_download(self, symbols: list[str], **kwargs) -> pd.DataFrame:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _fetch_quotes(self, symbols: list[str]) -> pd.DataFrame:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _fetch_screen(self, query: Any, **kwargs) -> dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _fetch_lookup(self, query: str, kind: str, count: int) -> pd.DataFrame:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _fetch_search(self, query: str, **kwargs) -> dict:
+        raise NotImplementedError
+
+
+class YahooMarketDataProvider(MarketDataProvider):
+    """Market data provider backed by Yahoo Finance (yfinance)."""
+
+    def __init__(self, *, ticker_ttl: float = 60.0, max_tickers: int = 256, **kwargs):
+        super().__init__(**kwargs)
+        self.ticker_ttl = ticker_ttl
+        self.max_tickers = max_tickers
+        self._tickers: OrderedDict[str, tuple[float, yf.Ticker]] = OrderedDict()
+        self._tickers_lock = threading.Lock()
+
+    def _ticker(self, symbol: str) -> yf.Ticker:
+        """
+        yf.Ticker shared by the calls made for ``symbol`` within ``ticker_ttl``
+        seconds, so related requests (e.g. the sections of one bundle) reuse the
+        modules it already downloaded instead of each building a new Ticker.
+        """
+        key = symbol.strip().upper()
+        now = time.monotonic()
+        with self._tickers_lock:
+            entry = self._tickers.get(key)
+            if entry is None or now - entry[0] > self.ticker_ttl:
+                entry = (now, yf.Ticker(key))
+                self._tickers[key] = entry
+            self._tickers.move_to_end(key)
+            while len(self._tickers) > self.max_tickers:
+                self._tickers.popitem(last=False)
+        return entry[1]
+
+    def _fetch_info(self, symbol: str) -> dict:
+        return self._ticker(symbol).get_info()
+
+    def _fetch_fast_info(self, symbol: str) -> dict:
+        # FastInfo is lazy; materialise it here so no HTTP happens on the loop.
+        fast_info = self._ticker(symbol).fast_info
+        return {key: fast_info[key] for key in fast_info.keys()}
+
+    def _fetch_history(self, symbol: str, **kwargs) -> pd.DataFrame:
+        return self._ticker(symbol).history(**kwargs)
+
+    def _fetch_attrs(self, kind: str, key: str, attrs: tuple[str, ...]) -> dict:
+        if kind == "ticker":
+            obj = self._ticker(key)
+        else:
+            obj = _DOMAIN_FACTORIES[kind](key)
+        return {attr: _resolve_attr(obj, attr) for attr in attrs}
+
+    def _fetch_download(self, symbols: list[str], **kwargs) -> pd.DataFrame:
+        kwargs.setdefault("progress", False)
+        return yf.download(symbols, **kwargs)
+
+    def _fetch_quotes(self, symbols: list[str]) -> pd.DataFrame:
+        # yfinance has no public batch quote API; reuse its crumb-aware session
+        # against the multi-symbol quote endpoint it uses internally.
+        data = YfData().get_raw_json(
+            YAHOO_QUOTE_URL,
+            params={"symbols": ",".join(symbols), "formatted": "false"},
+        )
+        results = (data.get("quoteResponse") or {}).get("result") or []
+        return pd.DataFrame.from_records(results)
+
+    def _fetch_screen(self, query: Any, **kwargs) -> dict:
+        return yf.screen(query, **kwargs)
+
+    def _fetch_lookup(self, query: str, kind: str, count: int) -> pd.DataFrame:
+        return getattr(yf.Lookup(query=query), f"get_{kind}")(count=count)
+
+    def _fetch_search(self, query: str, **kwargs) -> dict:
+        return yf.Search(query=query, **kwargs).search().all
+
+
+_PERIOD_DAYS = {
+    "1d": 1,
+    "5d": 5,
+    "1mo": 30,
+    "3mo": 91,
+    "6mo": 182,
+    "1y": 365,
+    "2y": 730,
+    "5y": 1826,
+    "10y": 3652,
+    "ytd": 180,
+    "max": 7300,
+}
+
+_INTERVAL_MINUTES = {
+    "1m": 1,
+    "2m": 2,
+    "5m": 5,
+    "15m": 15,
+    "30m": 30,
+    "60m": 60,
+    "90m": 90,
+    "1h": 60,
+    "1d": 1440,
+    "5d": 7200,
+    "1wk": 10080,
+    "1mo": 43200,
+    "3mo": 129600,
+}
+
+
+def _utc(value: Any) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def _us_market_state(now: Optional[datetime] = None) -> str:
+    """Yahoo's marketState for US equities, from the NYSE trading calendar."""
+    phase = NYSE.state(now).phase
+    return {"pre": "PRE", "regular": "REGULAR", "post": "POST"}.get(phase, "CLOSED")
+
+
+def _symbol_seed(symbol: str) -> int:
+    return int.from_bytes(hashlib.sha1(symbol.upper().encode()).digest()[:4], "big")
+
+
+class FakeMarketDataProvider(MarketDataProvider):
+    """
+    Deterministic offline provider used to measure throughput without Yahoo.
+
+    Every fetch sleeps for ``latency`` seconds on the worker thread to mimic an
+    upstream round trip, then returns synthetic data derived from the symbol.
+    """
+
+    def __init__(self, *, latency: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+
+    def _wait(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _price(self, symbol: str) -> float:
+        return 10 + _symbol_seed(symbol) % 490
+
+    def _fetch_info(self, symbol: str) -> dict:
+        self._wait()
+        price = self._price(symbol)
+        return {
+            "symbol": symbol.upper(),
+            "shortName": f"{symbol.upper()} Inc.",
+            "longName": f"{symbol.upper()} Incorporated",
+            "currency": "USD",
+            "exchange": "NMS",
+            "quoteType": "EQUITY",
+            "exchangeTimezoneName": "America/New_York",
+            "hasPrePostMarketData": True,
+            "regularMarketPrice": price,
+            "currentPrice": price,
+            "previousClose": price * 0.99,
+            "marketCap": price * 1_000_000_000,
+        }
+
+    def _fetch_fast_info(self, symbol: str) -> dict:
+        self._wait()
+        price = self._price(symbol)
+        return {
+            "currency": "USD",
+            "exchange": "NMS",
+            "quoteType": "EQUITY",
+            "timezone": "America/New_York",
+            "lastPrice": price,
+            "open": price * 0.995,
+            "dayHigh": price * 1.01,
+            "dayLow": price * 0.98,
+            "previousClose": price * 0.99,
+            "regularMarketPreviousClose": price * 0.99,
+            "lastVolume": 1_000_000,
+            "tenDayAverageVolume": 1_100_000,
+            "threeMonthAverageVolume": 1_200_000,
+            "marketCap": price * 1_000_000_000,
+            "shares": 1_000_000_000,
+            "fiftyDayAverage": price * 0.97,
+            "twoHundredDayAverage": price * 0.93,
+            "yearChange": 0.12,
+            "yearHigh": price * 1.2,
+            "yearLow": price * 0.7,
+        }
+
+    def _fetch_history(self, symbol: str, **kwargs) -> pd.DataFrame:
+        self._wait()
+        interval = kwargs.get("interval", "1d")
+        step = timedelta(minutes=_INTERVAL_MINUTES.get(interval, 1440))
+        end = _utc(kwargs["end"]) if kwargs.get("end") else None
+        end = end or pd.Timestamp(datetime.now(timezone.utc)).floor("min")
+        if kwargs.get("start"):
+            start = _utc(kwargs["start"])
+        else:
+            period = kwargs.get("period", "1mo")
+            days = _PERIOD_DAYS.get(period)
+            if days is None and period.endswith("d") and period[:-1].isdigit():
+                days = int(period[:-1])
+            start = end - timedelta(days=days or 30)
+        index = pd.date_range(start=start, end=end, freq=step, tz="UTC")
+
+        rng = np.random.default_rng(_symbol_seed(symbol))
+        close = self._price(symbol) * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+        spread = np.abs(rng.normal(0, 0.005, len(index))) * close
+        frame = pd.DataFrame(
+            {
+                "Open": close - spread / 2,
+                "High": close + spread,
+                "Low": close - spread,
+                "Close": close,
+                "Volume": rng.integers(1_000, 1_000_000, len(index)),
+                "Dividends": 0.0,
+                "Stock Splits": 0.0,
+            },
+            index=index,
+        )
+        frame.index.name = "Date" if step >= timedelta(days=1) else "Datetime"
+        return frame
+
+    def _fetch_attrs(self, kind: str, key: str, attrs: tuple[str, ...]) -> dict:
+        self._wait()
+        result = {}
+        for attr in attrs:
+            if attr in ("name", "symbol", "key"):
+                result[attr] = key
+            elif attr.endswith("info"):
+                result[attr] = self._fetch_info(key)
+            elif attr in ("calendar", "overview", "summary", "status"):
+                result[attr] = {}
+            elif attr in ("news", "research_reports"):
+                result[attr] = []
+            else:
+                result[attr] = pd.DataFrame()
+        return result
+
+    def _fetch_download(self, symbols: list[str], **kwargs) -> pd.DataFrame:
+        frames = {symbol: self._fetch_history(symbol, **kwargs) for symbol in symbols}
+        return pd.concat(frames, axis=1).swaplevel(axis=1).sort_index(axis=1)
+
+    def _fetch_quotes(self, symbols: list[str]) -> pd.DataFrame:
+        self._wait()
+        rows = []
+        market_state = _us_market_state()
+        for symbol in symbols:
+            price = self._price(symbol)
+            rows.append(
+                {
+                    "symbol": symbol.upper(),
+                    "marketState": market_state,
+                    "hasPrePostMarketData": True,
+                    "currency": "USD",
+                    "exchange": "NMS",
+                    "quoteType": "EQUITY",
+                    "exchangeTimezoneName": "America/New_York",
+                    "regularMarketPrice": price,
+                    "regularMarketOpen": price * 0.995,
+                    "regularMarketDayHigh": price * 1.01,
+                    "regularMarketDayLow": price * 0.98,
+                    "regularMarketPreviousClose": price * 0.99,
+                    "regularMarketVolume": 1_000_000,
+                    "averageDailyVolume10Day": 1_100_000,
+                    "averageDailyVolume3Month": 1_200_000,
+                    "marketCap": price * 1_000_000_000,
+                    "sharesOutstanding": 1_000_000_000,
+                    "fiftyDayAverage": price * 0.97,
+                    "twoHundredDayAverage": price * 0.93,
+                    "fiftyTwoWeekChangePercent": 12.0,
+                    "fiftyTwoWeekHigh": price * 1.2,
+                    "fiftyTwoWeekLow": price * 0.7,
+                }
+            )
+        return pd.DataFrame.from_records(rows)
+
+    def _fetch_screen(self, query: Any, **kwargs) -> dict:
+        self._wait()
+        return {"quotes": [], "count": 0}
+
+    def _fetch_lookup(self, query: str, kind: str, count: int) -> pd.DataFrame:
+        self._wait()
+        return pd.DataFrame()
+
+    def _fetch_search(self, query: str, **kwargs) -> dict:
+        self._wait()
+        return {"quotes": [], "news": [], "lists": [], "research": [], "nav": []}
+
+
+def _build_provider() -> MarketDataProvider:
+    options = dict(
+        max_workers=settings.MARKET_DATA_MAX_WORKERS,
+        host_concurrency=settings.MARKET_DATA_HOST_CONCURRENCY,
+        timeout=settings.MARKET_DATA_TIMEOUT_SECONDS,
+        min_concurrency=settings.MARKET_DATA_MIN_CONCURRENCY,
+        breaker=(
+            dict(
+                window=settings.MARKET_DATA_BREAKER_WINDOW_SECONDS,
+                min_calls=settings.MARKET_DATA_BREAKER_MIN_CALLS,
+                failure_rate=settings.MARKET_DATA_BREAKER_FAILURE_RATE,
+                slow_call=settings.MARKET_DATA_BREAKER_SLOW_CALL_SECONDS,
+                slow_call_rate=settings.MARKET_DATA_BREAKER_SLOW_CALL_RATE,
+                open_for=settings.MARKET_DATA_BREAKER_OPEN_SECONDS,
+                max_open_for=settings.MARKET_DATA_BREAKER_MAX_OPEN_SECONDS,
+                probes=settings.MARKET_DATA_BREAKER_HALF_OPEN_PROBES,
+            )
+            if settings.MARKET_DATA_BREAKER_ENABLED
+            else None
+        ),
+    )
+    if settings.MARKET_DATA_PROVIDER == "fake":
+        return FakeMarketDataProvider(
+            latency=settings.MARKET_DATA_FAKE_LATENCY_SECONDS, **options
+        )
+    return YahooMarketDataProvider(
+        ticker_ttl=settings.MARKET_DATA_TICKER_REUSE_SECONDS, **options
+    )
+
+
+_provider: Optional[MarketDataProvider] = None
+
+
+def get_market_data_provider() -> MarketDataProvider:
+    """
+    Return the process-wide market data provider.
+    Usable directly by background jobs and as a FastAPI dependency by routes.
+    """
+    global _provider
+    if _provider is None:
+        _provider = _build_provider()
+    return _provider
+
+
+def set_market_data_provider(provider: Optional[MarketDataProvider]) -> None:
+    """Swap the process-wide provider (e.g. for a FakeMarketDataProvider)."""
+    global _provider
+    if _provider is not None and _provider is not provider:
+        _provider.shutdown()
+    _provider = provider
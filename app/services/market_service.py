@@ -0,0 +1,90 @@
+import logging
+from functools import partial
+from typing import Any, Hashable, Optional
+
+from app.core.config import settings
+from app.services.market_data_service import MarketDataProvider
+from app.utils.cache import TTLCache
+from app.utils.global_variables import MARKETS
+from app.utils.trading_calendar import (
+    MARKET_CALENDARS,
+    ExchangeCalendar,
+    get_calendar,
+    market_status,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _status_ttl(market: Hashable, value: Any) -> Optional[float]:
+    """Yahoo's status only changes at session boundaries of the market's exchanges."""
+    return min(
+        calendar.cache_ttl(
+            settings.MARKET_STATUS_CACHE_TTL_SECONDS,
+            settings.CLOSED_MARKET_CACHE_MAX_TTL_SECONDS,
+        )
+        for calendar in MARKET_CALENDARS[market]
+    )
+
+
+market_status_cache = TTLCache(
+    name="market_status",
+    ttl=settings.MARKET_STATUS_CACHE_TTL_SECONDS,
+    stale_ttl=settings.MARKET_STATUS_CACHE_STALE_SECONDS,
+    max_entries=64,
+    ttl_policy=_status_ttl,
+)
+
+
+def market_calendars(market: str) -> Optional[tuple[ExchangeCalendar, ...]]:
+    """Calendars behind a MARKETS entry or a single Yahoo exchange code."""
+    market = market.strip().upper()
+    if market in MARKET_CALENDARS:
+        return MARKET_CALENDARS[market]
+    calendar = get_calendar(market)
+    return (calendar,) if calendar is not None else None
+
+
+async def _fetch_yahoo_status(provider: MarketDataProvider, market: str) -> dict:
+    """Yahoo's status payload for a MARKETS entry (open, close, message...)."""
+    data = await provider.get_attrs("market", market, ["status"])
+    return data["status"] or {}
+
+
+async def warm_market_status(provider: MarketDataProvider, market: str) -> None:
+    """Fetch Yahoo's status payload for a MARKETS entry into the cache."""
+    market_status_cache.set(market, await _fetch_yahoo_status(provider, market))
+
+
+async def get_market_status(provider: MarketDataProvider, market: str) -> dict:
+    """
+    Open/closed state, current session and next open/close of a market, from
+    the local trading calendar, without waiting on Yahoo.
+
+    For MARKETS entries, Yahoo's status payload (open, close, message,
+    timezone...) is merged in when it is cached, and fetched in the background
+    when it is not (the prefetch scheduler keeps it warm). Its open/closed
+    status is used where the calendar's is "unknown" (a possible lunar or
+    religious holiday).
+    """
+    market = market.strip().upper()
+    calendars = market_calendars(market)
+    if calendars is None:
+        raise KeyError(market)
+    local = market_status(calendars)
+    if market not in MARKETS:
+        return local
+
+    yahoo = market_status_cache.get_nowait(
+        market, partial(_fetch_yahoo_status, provider, market)
+    )
+    if not yahoo:
+        return local
+    status = local["status"]
+    if status == "unknown" and yahoo.get("status") in ("open", "closed"):
+        status = yahoo["status"]
+    return {**yahoo, **local, "status": status}
+
+
+def get_cache_stats() -> dict:
+    return market_status_cache.stats()
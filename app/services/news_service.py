@@ -0,0 +1,208 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+from typing import Any, Iterable, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from app.core.config import settings
+from app.services.market_data_service import MarketDataProvider
+from app.services.ticker_cache_service import normalize_symbol
+from app.utils.cache import TTLCache
+from app.utils.concurrency import fan_out
+
+news_cache = TTLCache(
+    name="ticker_news",
+    ttl=settings.NEWS_CACHE_TTL_SECONDS,
+    stale_ttl=settings.NEWS_CACHE_STALE_SECONDS,
+    max_entries=settings.TICKER_CACHE_MAX_ENTRIES,
+)
+
+
+async def get_ticker_news(provider: MarketDataProvider, symbol: str) -> list[dict]:
+    """Raw yfinance news articles for a symbol, served from a short-lived cache."""
+    symbol = normalize_symbol(symbol)
+    return await news_cache.get_or_fetch(
+        symbol, lambda: provider.get_ticker_attr(symbol, "news")
+    )
+
+
+def _url(value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        value = value.get("url")
+    return value or None
+
+
+def _canonical_url(url: Optional[str]) -> Optional[str]:
+    """Scheme/host-insensitive URL without query string or fragment."""
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/")
+    return urlunsplit(("", parts.netloc.lower().removeprefix("www."), path, "", ""))
+
+
+def _timestamp(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def normalize_article(article: dict) -> Optional[dict]:
+    """
+    Flatten a yfinance news item into the feed shape. Handles both the current
+    ``{"id", "content": {...}}`` layout and the older flat one.
+    """
+    content = article.get("content") or article
+    article_id = article.get("id") or article.get("uuid") or content.get("id")
+    url = (
+        _url(content.get("canonicalUrl"))
+        or _url(content.get("clickThroughUrl"))
+        or content.get("link")
+    )
+    if not article_id and not url:
+        return None
+
+    published = _timestamp(content.get("pubDate")) or _timestamp(
+        content.get("providerPublishTime")
+    )
+    provider = content.get("provider")
+    thumbnail = content.get("thumbnail") or {}
+    resolutions = thumbnail.get("resolutions") or []
+    tickers = (content.get("finance") or {}).get("stockTickers") or []
+    related = [t.get("symbol") for t in tickers if t.get("symbol")] or (
+        content.get("relatedTickers") or []
+    )
+
+    return {
+        "id": article_id or url,
+        "title": content.get("title"),
+        "summary": content.get("summary"),
+        "url": url,
+        "publisher": (
+            provider.get("displayName") if isinstance(provider, dict) else None
+        )
+        or content.get("publisher"),
+        "published_at": published or 0.0,
+        "thumbnail": thumbnail.get("originalUrl")
+        or (resolutions[0].get("url") if resolutions else None),
+        "content_type": content.get("contentType") or content.get("type"),
+        "related_symbols": related,
+        "symbols": [],
+    }
+
+
+def merge_articles(news_by_symbol: dict[str, list[dict]]) -> list[dict]:
+    """
+    Merge per-symbol news into one feed, newest first. An article returned for
+    several symbols (same id or same canonical URL) appears once, listing every
+    symbol it was found under.
+    """
+    by_key: dict[str, dict] = {}
+    feed: list[dict] = []
+    for symbol, articles in news_by_symbol.items():
+        for raw in articles or ():
+            article = normalize_article(raw)
+            if article is None:
+                continue
+            keys = [k for k in (article["id"], _canonical_url(article["url"])) if k]
+            existing = next((by_key[k] for k in keys if k in by_key), None)
+            if existing is None:
+                existing = article
+                feed.append(article)
+            for key in keys:
+                by_key.setdefault(key, existing)
+            if symbol not in existing["symbols"]:
+                existing["symbols"].append(symbol)
+
+    feed.sort(key=lambda a: (-a["published_at"], a["id"]))
+    for article in feed:
+        article["published_at"] = (
+            datetime.fromtimestamp(article["published_at"], timezone.utc).isoformat()
+            if article["published_at"]
+            else None
+        )
+    return feed
+
+
+def encode_cursor(article: dict) -> str:
+    payload = json.dumps([article["published_at"], article["id"]]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Optional[str], str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        published_at, article_id = json.loads(base64.urlsafe_b64decode(padded))
+        return published_at, str(article_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise ValueError("Invalid news cursor.") from e
+
+
+def paginate(
+    feed: list[dict], *, limit: int, cursor: Optional[str] = None
+) -> tuple[list[dict], Optional[str]]:
+    """
+    Page through a feed sorted newest first. The cursor encodes the last
+    article's (published_at, id) rather than an offset, so newly published
+    articles do not shift later pages.
+    """
+    start = 0
+    if cursor:
+        published_at, article_id = decode_cursor(cursor)
+        position = (_sort_time(published_at), article_id)
+        start = next(
+            (
+                i
+                for i, a in enumerate(feed)
+                if (_sort_time(a["published_at"]), a["id"]) > position
+            ),
+            len(feed),
+        )
+    page = feed[start : start + limit]
+    has_more = start + limit < len(feed)
+    return page, encode_cursor(page[-1]) if page and has_more else None
+
+
+def _sort_time(published_at: Optional[str]) -> float:
+    """Sort key matching the feed order: newest first, undated last."""
+    return -(_timestamp(published_at) or 0.0)
+
+
+async def get_news_feed(
+    provider: MarketDataProvider,
+    symbols: Iterable[str],
+    *,
+    concurrency: int,
+    deadline: float,
+) -> tuple[list[dict], dict[str, str]]:
+    """
+    Fetch news for many symbols concurrently and merge it into one
+    deduplicated, time-sorted feed. Returns the feed and per-symbol errors.
+    """
+    news_by_symbol: dict[str, list[dict]] = {}
+    errors: dict[str, str] = {}
+    symbols = list(dict.fromkeys(map(normalize_symbol, symbols)))
+
+    async for symbol, articles, error in fan_out(
+        symbols,
+        lambda symbol: get_ticker_news(provider, symbol),
+        limit=concurrency,
+        deadline=deadline,
+    ):
+        if error is None:
+            news_by_symbol[symbol] = articles
+        else:
+            errors[symbol] = str(error) or type(error).__name__
+
+    ordered = {s: news_by_symbol[s] for s in symbols if s in news_by_symbol}
+    return merge_articles(ordered), errors
+
+
+def get_cache_stats() -> dict:
+    return news_cache.stats()
@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Optional
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.crud.favourite_stock import favourite_stock as crud_favourite_stock
+from app.crud.watchlist_item import watchlist_item as crud_watchlist_item
+from app.services import history_service, market_service, quote_service
+from app.services.market_data_service import get_market_data_provider
+from app.services.ticker_cache_service import (
+    fast_info_cache,
+    metadata_cache,
+    normalize_symbol,
+    symbol_calendar,
+)
+from app.utils.cache import TTLCache
+from app.utils.concurrency import TokenBucket
+from app.utils.global_variables import MARKETS
+from app.utils.symbol_access import background, symbol_access
+
+logger = logging.getLogger(__name__)
+
+
+def load_user_counts() -> dict[str, int]:
+    """Users holding each symbol as a favourite or on a watchlist."""
+    counts: dict[str, int] = {}
+    with Session(engine) as session:
+        for symbol, _, _, users in crud_favourite_stock.count_by_symbol(session):
+            symbol = normalize_symbol(symbol)
+            counts[symbol] = counts.get(symbol, 0) + users
+        for symbol, users in crud_watchlist_item.count_users_by_symbol(session):
+            symbol = normalize_symbol(symbol)
+            counts[symbol] = counts.get(symbol, 0) + users
+    return counts
+
+
+def rank_hot_symbols(
+    user_counts: dict[str, int],
+    access_scores: dict[str, float],
+    *,
+    access_weight: float,
+    limit: int,
+) -> list[str]:
+    """Top ``limit`` symbols by users holding them plus weighted recent requests."""
+    scores = {symbol: float(users) for symbol, users in user_counts.items()}
+    for symbol, score in access_scores.items():
+        scores[symbol] = scores.get(symbol, 0.0) + access_weight * score
+    ranked = sorted(scores, key=lambda s: (-scores[s], s))
+    return [symbol for symbol in ranked if scores[symbol] > 0][:limit]
+
+
+def _expired(cache: TTLCache, key: str) -> bool:
+    # Peek without counting a cache hit or miss
+    entry = cache.get_entry(key)
+    return entry is None or entry.expired
+
+
+def _trading(symbol: str) -> bool:
+    """Whether the symbol's exchange is in a session (unknown counts as yes)."""
+    calendar = symbol_calendar(symbol)
+    return calendar is None or calendar.is_active()
+
+
+class PrefetchScheduler:
+    """
+    Keeps the caches behind the busiest endpoints warm for the symbols users
+    actually look at, so their requests are answered without waiting on Yahoo.
+
+    The hot set (favourites and watchlists weighted by number of users, plus
+    recently requested symbols) is recomputed every ``hot_set_refresh``
+    seconds. Each cycle then refreshes expired market status, fast_info and,
+    for symbols whose exchange is trading, today's intraday bars, hottest
+    symbols first, until the cycle's share of the upstream request budget is
+    spent. Cycles run every ``open_interval`` seconds while any hot symbol's
+    exchange is trading and every ``closed_interval`` otherwise; closed-market
+    entries stay cached until their exchange reopens, so quiet cycles cost no
+    upstream calls.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_symbols: int,
+        open_interval: float,
+        closed_interval: float,
+        hot_set_refresh: float,
+        requests_per_minute: float,
+        access_weight: float,
+        intraday_interval: str,
+    ):
+        self.max_symbols = max_symbols
+        self.open_interval = open_interval
+        self.closed_interval = closed_interval
+        self.hot_set_refresh = hot_set_refresh
+        self.access_weight = access_weight
+        self.intraday_interval = intraday_interval
+        self.budget = TokenBucket(
+            rate=requests_per_minute / 60,
+            capacity=max(1.0, requests_per_minute * open_interval / 60),
+        )
+        self.hot_symbols: list[str] = []
+        self._user_counts: dict[str, int] = {}
+        self._hot_set_at = 0.0
+        self._history_warmed: dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.cycles = 0
+        self.requests = 0
+        self.skipped = 0
+        self.errors = 0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        with background():
+            while True:
+                markets_open = True
+                try:
+                    await self._refresh_hot_set()
+                    markets_open = await self.run_cycle()
+                    self.cycles += 1
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.errors += 1
+                    logger.warning("Prefetch cycle failed: %s", e)
+                await asyncio.sleep(
+                    self.open_interval if markets_open else self.closed_interval
+                )
+
+    async def _refresh_hot_set(self) -> None:
+        if time.monotonic() - self._hot_set_at >= self.hot_set_refresh:
+            try:
+                self._user_counts = await asyncio.to_thread(load_user_counts)
+            except Exception as e:
+                logger.warning("Could not load hot symbols from the database: %s", e)
+            self._hot_set_at = time.monotonic()
+        self.hot_symbols = rank_hot_symbols(
+            self._user_counts,
+            symbol_access.scores(),
+            access_weight=self.access_weight,
+            limit=self.max_symbols,
+        )
+
+    def _spend(self, requests: int = 1) -> bool:
+        """Take ``requests`` tokens from the budget without waiting."""
+        if not self.budget.try_acquire(requests):
+            self.skipped += 1
+            return False
+        self.requests += requests
+        return True
+
+    async def run_cycle(self) -> bool:
+        """One prefetch pass; returns whether any hot symbol is trading."""
+        provider = get_market_data_provider()
+        await self._warm_market_status(provider)
+
+        stale = [s for s in self.hot_symbols if _expired(fast_info_cache, s)]
+        chunk = settings.BATCH_QUOTE_CHUNK_SIZE
+        affordable = min(len(stale), int(self.budget.tokens) * chunk)
+        if affordable and self._spend(math.ceil(affordable / chunk)):
+            await quote_service.get_batch_fast_info(provider, stale[:affordable])
+
+        trading = [symbol for symbol in self.hot_symbols if _trading(symbol)]
+        await self._warm_intraday(provider, trading)
+        return bool(trading)
+
+    async def _warm_market_status(self, provider) -> None:
+        for market in sorted(MARKETS):
+            if not _expired(market_service.market_status_cache, market):
+                continue
+            if not self._spend():
+                return
+            try:
+                await market_service.warm_market_status(provider, market)
+            except Exception as e:
+                logger.debug("Prefetch of %s market status failed: %s", market, e)
+
+    async def _warm_intraday(self, provider, symbols: list[str]) -> None:
+        now = time.monotonic()
+        for symbol in symbols:
+            warmed_at = self._history_warmed.get(symbol, 0.0)
+            if now - warmed_at < settings.HISTORY_STORE_REFRESH_SECONDS:
+                continue
+            # Metadata decides prepost exactly like the history route does
+            if not self._spend(1 if symbol in metadata_cache else 2):
+                return
+            try:
+                metadata = await quote_service.get_ticker_metadata(provider, symbol)
+                await history_service.get_history(
+                    provider,
+                    symbol,
+                    interval=self.intraday_interval,
+                    period="1d",
+                    prepost=bool(metadata.get("hasPrePostMarketData")),
+                )
+                self._history_warmed[symbol] = time.monotonic()
+            except Exception as e:
+                logger.debug("Prefetch of %s history failed: %s", symbol, e)
+        for symbol in set(self._history_warmed) - set(self.hot_symbols):
+            del self._history_warmed[symbol]
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "hot_symbols": len(self.hot_symbols),
+            "top": self.hot_symbols[:10],
+            "cycles": self.cycles,
+            "upstream_requests": self.requests,
+            "budget_exhausted": self.skipped,
+            "errors": self.errors,
+            "budget": self.budget.stats(),
+        }
+
+
+def _build_scheduler() -> PrefetchScheduler:
+    return PrefetchScheduler(
+        max_symbols=settings.PREFETCH_MAX_SYMBOLS,
+        open_interval=settings.PREFETCH_OPEN_INTERVAL_SECONDS,
+        closed_interval=settings.PREFETCH_CLOSED_INTERVAL_SECONDS,
+        hot_set_refresh=settings.PREFETCH_HOT_SET_REFRESH_SECONDS,
+        requests_per_minute=settings.PREFETCH_REQUESTS_PER_MINUTE,
+        access_weight=settings.PREFETCH_ACCESS_WEIGHT,
+        intraday_interval=settings.PREFETCH_INTRADAY_INTERVAL,
+    )
+
+
+_scheduler: Optional[PrefetchScheduler] = None
+
+
+def get_prefetch_scheduler() -> PrefetchScheduler:
+    """Process-wide prefetch scheduler, created on first use."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = _build_scheduler()
+    return _scheduler
+
+
+def set_prefetch_scheduler(scheduler: Optional[PrefetchScheduler]) -> None:
+    """Swap the scheduler; the previous one is stopped."""
+    global _scheduler
+    if _scheduler is not None and _scheduler is not scheduler:
+        _scheduler.close()
+    _scheduler = scheduler
@@ -0,0 +1,232 @@
+import asyncio
+from typing import Iterable, Optional, Union
+
+import pandas as pd
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.schemas.stocks import TickerFastInfoResponse, TickerMetadata
+from app.services.market_data_service import MarketDataProvider
+from app.services.ticker_cache_service import (
+    fast_info_cache,
+    info_cache,
+    metadata_cache,
+    normalize_symbol,
+)
+from app.utils.cache import UNAVAILABLE_STATUSES
+from app.utils.freshness import mark_stale
+from app.utils.symbol_access import record_access
+
+
+# Yahoo quote field -> fast_info field
+QUOTE_TO_FAST_INFO = {
+    "currency": "currency",
+    "exchange": "exchange",
+    "quoteType": "quoteType",
+    "exchangeTimezoneName": "timezone",
+    "regularMarketPrice": "lastPrice",
+    "regularMarketOpen": "open",
+    "regularMarketDayHigh": "dayHigh",
+    "regularMarketDayLow": "dayLow",
+    "regularMarketPreviousClose": "regularMarketPreviousClose",
+    "regularMarketVolume": "lastVolume",
+    "averageDailyVolume10Day": "tenDayAverageVolume",
+    "averageDailyVolume3Month": "threeMonthAverageVolume",
+    "marketCap": "marketCap",
+    "sharesOutstanding": "shares",
+    "fiftyDayAverage": "fiftyDayAverage",
+    "twoHundredDayAverage": "twoHundredDayAverage",
+    "fiftyTwoWeekChangePercent": "yearChange",
+    "fiftyTwoWeekHigh": "yearHigh",
+    "fiftyTwoWeekLow": "yearLow",
+}
+
+# Yahoo quote/info field -> metadata field
+QUOTE_TO_METADATA = {
+    "quoteType": "quoteType",
+    "exchange": "exchange",
+    "currency": "currency",
+    "exchangeTimezoneName": "timezone",
+    "hasPrePostMarketData": "hasPrePostMarketData",
+}
+
+_INT_FIELDS = ["lastVolume", "tenDayAverageVolume", "threeMonthAverageVolume", "shares"]
+
+
+def quotes_to_fast_info(quotes: pd.DataFrame) -> dict[str, dict]:
+    """
+    Convert a columnar batch of Yahoo quotes into fast_info dicts keyed by symbol.
+    Renames and casts whole columns at once instead of per symbol.
+    """
+    if quotes.empty or "symbol" not in quotes:
+        return {}
+
+    frame = quotes.reindex(columns=["symbol", *QUOTE_TO_FAST_INFO]).rename(
+        columns=QUOTE_TO_FAST_INFO
+    )
+    frame["symbol"] = frame["symbol"].str.upper()
+    frame["previousClose"] = frame["regularMarketPreviousClose"]
+    # Yahoo reports the 52 week change in percent, fast_info as a fraction
+    frame["yearChange"] = pd.to_numeric(frame["yearChange"], errors="coerce") / 100
+    for column in _INT_FIELDS:
+        frame[column] = (
+            pd.to_numeric(frame[column], errors="coerce").round().astype("Int64")
+        )
+
+    frame = frame.drop_duplicates("symbol").set_index("symbol")
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict(orient="index")
+
+
+def _chunks(symbols: list[str], size: int) -> Iterable[list[str]]:
+    for i in range(0, len(symbols), size):
+        yield symbols[i : i + size]
+
+
+async def get_batch_fast_info(
+    provider: MarketDataProvider, symbols: list[str]
+) -> dict[str, Union[TickerFastInfoResponse, dict]]:
+    """
+    Price many symbols with as few upstream calls as possible.
+
+    Fresh fast_info cache entries are reused; the remaining symbols are fetched
+    in bulk quote chunks that run concurrently. Each requested symbol maps to a
+    TickerFastInfoResponse or to {"error": ...}; one bad symbol never fails the batch.
+    """
+    normalized = {symbol: normalize_symbol(symbol) for symbol in symbols}
+    fields: dict[str, dict] = {}
+    missing: list[str] = []
+    for symbol in dict.fromkeys(normalized.values()):
+        record_access(symbol)
+        cached = fast_info_cache.get_fresh(symbol)
+        if cached is not None:
+            fields[symbol] = cached
+        else:
+            missing.append(symbol)
+
+    errors: dict[str, str] = {}
+    if missing:
+        chunks = list(_chunks(missing, settings.BATCH_QUOTE_CHUNK_SIZE))
+        responses = await asyncio.gather(
+            *(provider.get_quotes(chunk) for chunk in chunks),
+            return_exceptions=True,
+        )
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, BaseException):
+                errors.update({symbol: str(response) for symbol in chunk})
+                if (
+                    isinstance(response, HTTPException)
+                    and response.status_code in UNAVAILABLE_STATUSES
+                ):
+                    _use_expired(chunk, fields)
+                continue
+            fields.update(quotes_to_fast_info(response))
+
+    results: dict[str, Union[TickerFastInfoResponse, dict]] = {}
+    for requested, symbol in normalized.items():
+        if symbol not in fields:
+            results[requested] = {
+                "error": errors.get(symbol, f"No quote data found for '{symbol}'.")
+            }
+            continue
+        try:
+            results[requested] = TickerFastInfoResponse(symbol=symbol, **fields[symbol])
+        except ValidationError as e:
+            results[requested] = {"error": str(e)}
+            continue
+        if symbol in missing and symbol not in errors:
+            fast_info_cache.set(symbol, fields[symbol])
+    return results
+
+
+def _use_expired(symbols: list[str], fields: dict[str, dict]) -> None:
+    """Fill in expired fast_info entries for symbols upstream could not price."""
+    for symbol in symbols:
+        entry = fast_info_cache.get_entry(symbol)
+        if entry is not None:
+            fast_info_cache.fallback_hits += 1
+            mark_stale(entry.age)
+            fields[symbol] = entry.value
+
+
+async def _fetch_quote(
+    provider: MarketDataProvider, symbol: str
+) -> tuple[dict, Optional[dict]]:
+    """
+    One quote call that refreshes both the metadata and the fast_info cache.
+    Returns ``(metadata, fast_info_fields)``; the latter is None if incomplete.
+    """
+    quotes = await provider.get_quotes([symbol])
+    row = (
+        quotes[quotes["symbol"].str.upper() == symbol] if "symbol" in quotes else quotes
+    )
+    if row.empty:
+        raise LookupError(f"No quote data found for '{symbol}'.")
+
+    record = row.iloc[0]
+    metadata = TickerMetadata(
+        symbol=symbol,
+        **{
+            field: (
+                record[column].item()
+                if hasattr(record[column], "item")
+                else record[column]
+            )
+            for column, field in QUOTE_TO_METADATA.items()
+            if column in record and pd.notna(record[column])
+        },
+    ).model_dump()
+    metadata_cache.set(symbol, metadata)
+
+    fields = quotes_to_fast_info(row).get(symbol)
+    try:
+        TickerFastInfoResponse(symbol=symbol, **(fields or {}))
+    except ValidationError:
+        return metadata, None
+    fast_info_cache.set(symbol, fields)
+    return metadata, fields
+
+
+async def get_quote_fast_info(provider: MarketDataProvider, symbol: str) -> dict:
+    """
+    fast_info fields for one symbol: cached (stale-while-revalidate), otherwise a
+    single bulk-quote call rather than yfinance's multi-request fast_info.
+    """
+    symbol = normalize_symbol(symbol)
+    record_access(symbol)
+
+    async def fetch() -> dict:
+        _, fields = await _fetch_quote(provider, symbol)
+        if fields is None:
+            raise LookupError(f"Incomplete quote data for '{symbol}'.")
+        return fields
+
+    return await fast_info_cache.get_or_fetch(symbol, fetch)
+
+
+async def get_ticker_metadata(provider: MarketDataProvider, symbol: str) -> dict:
+    """
+    Long-lived per-symbol metadata (quoteType, exchange, currency, timezone,
+    prepost support), cached apart from prices.
+
+    Derived from a cached info payload when one exists; otherwise one quote call,
+    which also warms the fast_info cache for the caller.
+    """
+    symbol = normalize_symbol(symbol)
+
+    async def fetch() -> dict:
+        entry = info_cache.get_entry(symbol)
+        if entry is None:
+            metadata, _ = await _fetch_quote(provider, symbol)
+            return metadata
+        return TickerMetadata(
+            symbol=symbol,
+            **{
+                field: entry.value[column]
+                for column, field in QUOTE_TO_METADATA.items()
+                if entry.value.get(column) is not None
+            },
+        ).model_dump()
+
+    return await metadata_cache.get_or_fetch(symbol, fetch)
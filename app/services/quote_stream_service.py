@@ -0,0 +1,268 @@
+import asyncio
+import logging
+import random
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, Optional
+
+from app.core.config import settings
+from app.schemas.stocks import TickerFastInfoResponse
+from app.services.market_data_service import get_market_data_provider
+from app.services.quote_service import quotes_to_fast_info
+from app.services.ticker_cache_service import fast_info_cache, normalize_symbol
+
+logger = logging.getLogger(__name__)
+
+EXTENDED_MARKET_STATES = {"PRE", "PREPRE", "POST", "POSTPOST"}
+
+
+class QuoteFeed(ABC):
+    """Source of quote snapshots polled by the QuoteHub."""
+
+    @abstractmethod
+    async def fetch(self, symbol: str) -> dict[str, Any]:
+        """Return the current quote fields for ``symbol``, including ``marketState``."""
+
+
+class ProviderQuoteFeed(QuoteFeed):
+    """Polls the market data provider's bulk quote endpoint, one symbol per call."""
+
+    async def fetch(self, symbol: str) -> dict[str, Any]:
+        quotes = await get_market_data_provider().get_quotes([symbol])
+        fields = quotes_to_fast_info(quotes).get(symbol)
+        if fields is None:
+            raise LookupError(f"No quote data found for '{symbol}'.")
+        quote = TickerFastInfoResponse(symbol=symbol, **fields).model_dump()
+        # Every poll doubles as a fresh fast_info entry for the REST endpoints
+        fast_info_cache.set(symbol, fields)
+
+        market_state = None
+        if "marketState" in quotes:
+            market_state = quotes["marketState"].iloc[0]
+        quote["marketState"] = market_state or "REGULAR"
+        return quote
+
+
+class FakeQuoteFeed(QuoteFeed):
+    """
+    Offline random-walk feed for tests and local development. Prices move on
+    every fetch so subscribers see a steady stream of changed fields.
+    """
+
+    def __init__(self, *, market_state: str = "REGULAR", volatility: float = 0.002):
+        self.market_state = market_state
+        self.volatility = volatility
+        self._quotes: dict[str, dict[str, Any]] = {}
+
+    async def fetch(self, symbol: str) -> dict[str, Any]:
+        quote = self._quotes.get(symbol)
+        if quote is None:
+            price = 10 + random.Random(symbol).random() * 490
+            quote = {
+                "symbol": symbol,
+                "currency": "USD",
+                "lastPrice": price,
+                "previousClose": price,
+                "dayHigh": price,
+                "dayLow": price,
+                "lastVolume": 0,
+            }
+            self._quotes[symbol] = quote
+        price = quote["lastPrice"] * (1 + random.gauss(0, self.volatility))
+        quote.update(
+            lastPrice=price,
+            dayHigh=max(quote["dayHigh"], price),
+            dayLow=min(quote["dayLow"], price),
+            lastVolume=quote["lastVolume"] + random.randint(0, 1_000),
+        )
+        return {**quote, "marketState": self.market_state}
+
+
+class Subscriber:
+    """One connected client: a bounded queue of messages and its symbols."""
+
+    def __init__(self, hub: "QuoteHub", maxsize: int):
+        self.hub = hub
+        self.symbols: set[str] = set()
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=maxsize)
+
+    def push(self, message: dict) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A slow client missed updates; replace its backlog with full snapshots
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            for symbol in self.symbols:
+                snapshot = self.hub.snapshot(symbol)
+                if snapshot is not None and not self.queue.full():
+                    self.queue.put_nowait(snapshot)
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+
+class QuoteHub:
+    """
+    In-process fan-out of live quotes.
+
+    Exactly one poll loop runs per subscribed symbol no matter how many clients
+    follow it. Each poll is diffed against the previous quote and only the
+    changed fields are pushed to subscribers; new subscribers first receive the
+    full snapshot. The poll interval follows the symbol's market state.
+    """
+
+    def __init__(
+        self,
+        feed: QuoteFeed,
+        *,
+        regular_interval: float,
+        extended_interval: float,
+        closed_interval: float,
+        queue_size: int = 100,
+    ):
+        self.feed = feed
+        self.regular_interval = regular_interval
+        self.extended_interval = extended_interval
+        self.closed_interval = closed_interval
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[Subscriber]] = {}
+        self._quotes: dict[str, dict[str, Any]] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self.polls = 0
+        self.errors = 0
+
+    def interval_for(self, market_state: Optional[str]) -> float:
+        if market_state == "CLOSED":
+            return self.closed_interval
+        if market_state in EXTENDED_MARKET_STATES:
+            return self.extended_interval
+        return self.regular_interval
+
+    def snapshot(self, symbol: str) -> Optional[dict]:
+        quote = self._quotes.get(symbol)
+        if quote is None:
+            return None
+        return {"type": "snapshot", "symbol": symbol, "data": dict(quote)}
+
+    def connect(self) -> Subscriber:
+        return Subscriber(self, self.queue_size)
+
+    def subscribe(self, subscriber: Subscriber, symbols: Iterable[str]) -> list[str]:
+        added = []
+        for symbol in map(normalize_symbol, symbols):
+            if not symbol or symbol in subscriber.symbols:
+                continue
+            subscriber.symbols.add(symbol)
+            self._subscribers.setdefault(symbol, set()).add(subscriber)
+            added.append(symbol)
+
+            snapshot = self.snapshot(symbol)
+            if snapshot is not None:
+                subscriber.push(snapshot)
+            if symbol not in self._tasks:
+                self._tasks[symbol] = asyncio.create_task(self._poll(symbol))
+        return added
+
+    def unsubscribe(self, subscriber: Subscriber, symbols: Iterable[str]) -> None:
+        for symbol in map(normalize_symbol, symbols):
+            subscriber.symbols.discard(symbol)
+            followers = self._subscribers.get(symbol)
+            if followers is None:
+                continue
+            followers.discard(subscriber)
+            if not followers:
+                # Last follower gone: stop polling and forget the symbol
+                del self._subscribers[symbol]
+                self._quotes.pop(symbol, None)
+                task = self._tasks.pop(symbol, None)
+                if task is not None:
+                    task.cancel()
+
+    def disconnect(self, subscriber: Subscriber) -> None:
+        self.unsubscribe(subscriber, list(subscriber.symbols))
+
+    def _publish(self, symbol: str, message: dict) -> None:
+        for subscriber in self._subscribers.get(symbol, ()):
+            subscriber.push(message)
+
+    async def _poll(self, symbol: str) -> None:
+        while True:
+            market_state = None
+            try:
+                quote = await self.feed.fetch(symbol)
+                self.polls += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning("Quote poll failed for %s: %s", symbol, e)
+                self._publish(
+                    symbol, {"type": "error", "symbol": symbol, "error": str(e)}
+                )
+                market_state = "CLOSED"  # back off until the feed recovers
+            else:
+                market_state = quote.get("marketState")
+                previous = self._quotes.get(symbol)
+                self._quotes[symbol] = quote
+                if previous is None:
+                    self._publish(symbol, self.snapshot(symbol))
+                else:
+                    changed = {
+                        key: value
+                        for key, value in quote.items()
+                        if previous.get(key) != value
+                    }
+                    if changed:
+                        self._publish(
+                            symbol,
+                            {"type": "update", "symbol": symbol, "data": changed},
+                        )
+            await asyncio.sleep(self.interval_for(market_state))
+
+    def stats(self) -> dict:
+        return {
+            "symbols": len(self._tasks),
+            "subscriptions": sum(len(s) for s in self._subscribers.values()),
+            "polls": self.polls,
+            "errors": self.errors,
+        }
+
+    def close(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._subscribers.clear()
+        self._quotes.clear()
+
+
+def _build_hub() -> QuoteHub:
+    if settings.QUOTE_STREAM_FEED == "fake":
+        feed: QuoteFeed = FakeQuoteFeed()
+    else:
+        feed = ProviderQuoteFeed()
+    return QuoteHub(
+        feed,
+        regular_interval=settings.QUOTE_STREAM_REGULAR_INTERVAL_SECONDS,
+        extended_interval=settings.QUOTE_STREAM_EXTENDED_INTERVAL_SECONDS,
+        closed_interval=settings.QUOTE_STREAM_CLOSED_INTERVAL_SECONDS,
+        queue_size=settings.QUOTE_STREAM_QUEUE_SIZE,
+    )
+
+
+_hub: Optional[QuoteHub] = None
+
+
+def get_quote_hub() -> QuoteHub:
+    """Process-wide quote hub, created on first use."""
+    global _hub
+    if _hub is None:
+        _hub = _build_hub()
+    return _hub
+
+
+def set_quote_hub(hub: Optional[QuoteHub]) -> None:
+    """Swap the quote hub (e.g. a FakeQuoteFeed-backed one in tests)."""
+    global _hub
+    if _hub is not None and _hub is not hub:
+        _hub.close()
+    _hub = hub
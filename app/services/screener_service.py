@@ -0,0 +1,351 @@
+import asyncio
+import logging
+import time
+from typing import Any, Optional
+
+import yfinance as yf
+
+from app.core.config import settings
+from app.schemas.screener import ScreenerRequest
+from app.services.market_data_service import (
+    MarketDataProvider,
+    get_market_data_provider,
+)
+from app.utils.cache import TTLCache
+from app.utils.concurrency import fan_out
+from app.utils.screener import (
+    build_equity_query,
+    build_fund_query,
+    canonical_conditions,
+    load_valid_equity_attributes,
+    screener_fingerprint,
+)
+from app.utils.screener_engine import EquityUniverse, UnsupportedScreen
+from app.utils.symbol_access import background
+
+logger = logging.getLogger(__name__)
+
+# Most rows Yahoo returns for one screener call
+YAHOO_MAX_SCREEN_SIZE = 250
+
+screen_cache = TTLCache(
+    name="screener",
+    ttl=settings.SCREENER_CACHE_TTL_SECONDS,
+    stale_ttl=settings.SCREENER_CACHE_STALE_SECONDS,
+    max_entries=settings.SCREENER_CACHE_MAX_ENTRIES,
+)
+
+_QUERY_BUILDERS = {"equity": build_equity_query, "fund": build_fund_query}
+
+
+def _blocks(offset: int, limit: int) -> list[tuple[int, int]]:
+    """
+    The (offset, size) upstream calls covering rows [offset, offset + limit),
+    widened to whole SCREENER_PAGE_SIZE blocks so nearby pages share them and
+    split where the widened range is more than Yahoo returns per call.
+    """
+    page = settings.SCREENER_PAGE_SIZE
+    start = offset // page * page
+    end = -(-(offset + limit) // page) * page
+    step = YAHOO_MAX_SCREEN_SIZE // page * page or YAHOO_MAX_SCREEN_SIZE
+    return [
+        (block, min(step, end - block))
+        for block in range(start, end, step)
+        if block < offset + limit and block + step > offset
+    ]
+
+
+async def _screen_rows(
+    provider: MarketDataProvider,
+    key: tuple,
+    query: Any,
+    *,
+    offset: int,
+    limit: int,
+    size_param: str = "size",
+    **kwargs,
+) -> dict:
+    blocks = _blocks(offset, limit)
+
+    async def fetch_block(start: int, size: int) -> dict:
+        async def fetch():
+            params = {size_param: size, **kwargs}
+            if start:
+                params["offset"] = start
+            return await provider.screen(query, **params)
+
+        return await screen_cache.get_or_fetch((*key, start, size), fetch)
+
+    results = await asyncio.gather(*(fetch_block(*block) for block in blocks))
+    quotes = [quote for data in results for quote in data.get("quotes", [])]
+    skip = offset - blocks[0][0]
+    return {**results[0], "quotes": quotes[skip : skip + limit]}
+
+
+async def run_custom_screen(
+    provider: MarketDataProvider, asset_type: str, request: ScreenerRequest
+) -> dict:
+    """
+    Run a user-built equity or fund screen. Screens are canonicalised and
+    planned first: contradictory ones are answered empty without a call, and
+    logically identical ones (condition order, operator case, overlapping
+    ranges...) share one cached upstream result. Equity screens the local
+    universe snapshot can answer never leave the process.
+    """
+    conditions, logical_operator = canonical_conditions(
+        request.conditions, request.logical_operator
+    )
+    query = _QUERY_BUILDERS[asset_type](conditions, logical_operator)
+    if query is None:
+        return {"quotes": [], "count": 0, "total": 0}
+
+    if asset_type == "equity":
+        local = get_equity_universe_store().screen(
+            conditions, logical_operator, request
+        )
+        if local is not None:
+            return local
+
+    return await _screen_rows(
+        provider,
+        ("custom", asset_type, screener_fingerprint(query), request.sort_field),
+        query,
+        offset=request.offset,
+        limit=request.limit,
+        sortField=request.sort_field,
+        sortAsc=True,
+    )
+
+
+async def run_named_screen(
+    provider: MarketDataProvider,
+    name: str,
+    query: Any,
+    *,
+    limit: int,
+    sort_field: Optional[str] = None,
+    sort_asc: Optional[bool] = None,
+) -> dict:
+    """Run a curated screen (``name`` identifies ``query``)."""
+    return await _screen_rows(
+        provider,
+        ("named", name, sort_field, sort_asc),
+        query,
+        offset=0,
+        limit=limit,
+        sortField=sort_field,
+        sortAsc=sort_asc,
+    )
+
+
+async def run_predefined_screen(
+    provider: MarketDataProvider, category: str, *, limit: int
+) -> dict:
+    """Run one of yfinance's predefined screens by name."""
+    return await _screen_rows(
+        provider,
+        ("predefined", category),
+        category,
+        offset=0,
+        limit=limit,
+        size_param="count",
+    )
+
+
+async def _load_partition(
+    provider: MarketDataProvider, region: str, sector: str, max_rows: int
+) -> tuple[list[dict], bool]:
+    """
+    Page through the equities of one region and sector, largest first.
+    Returns the rows and whether they are all of them.
+    """
+    query = yf.EquityQuery(
+        "and",
+        [
+            yf.EquityQuery("eq", ["region", region]),
+            yf.EquityQuery("eq", ["sector", sector]),
+        ],
+    )
+    rows: list[dict] = []
+    while len(rows) < max_rows:
+        size = min(YAHOO_MAX_SCREEN_SIZE, max_rows - len(rows))
+        data = await provider.screen(
+            query,
+            offset=len(rows),
+            size=size,
+            sortField="intradaymarketcap",
+            sortAsc=False,
+        )
+        quotes = data.get("quotes", [])
+        # Screener quotes carry the region but not the sector
+        rows.extend({"region": region, **quote, "sector": sector} for quote in quotes)
+        if len(quotes) < size or len(rows) >= data.get("total", len(rows)):
+            return rows, True
+    return rows, False
+
+
+class EquityUniverseStore:
+    """
+    Columnar snapshot of every equity in ``regions`` (see
+    app/utils/screener_engine.py), rebuilt by a background job every
+    ``refresh_interval`` seconds from Yahoo's screener, one region and sector
+    at a time.
+
+    A region counts as loaded only if all its sectors were fetched in full;
+    equities Yahoo lists without a sector are not in the snapshot. Screens the
+    snapshot cannot answer like Yahoo, screens on intraday fields once it is
+    older than ``intraday_max_age`` (the screener cache TTL, so they are no
+    staler than a cached upstream result), and everything once it is more
+    than two intervals old, fall back to Yahoo.
+    """
+
+    def __init__(
+        self,
+        *,
+        regions: list[str],
+        refresh_interval: float,
+        max_rows: int,
+        concurrency: int,
+        intraday_max_age: float,
+    ):
+        self.regions = [region.lower() for region in regions]
+        self.refresh_interval = refresh_interval
+        self.intraday_max_age = intraday_max_age
+        self.max_rows = max_rows
+        self.concurrency = concurrency
+        self.universe: Optional[EquityUniverse] = None
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.failures = 0
+        self.local = 0
+        self.fallbacks = 0
+        self.last_build_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        with background():
+            while True:
+                try:
+                    await self.refresh(get_market_data_provider())
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning("Equity universe refresh failed: %s", e)
+                await asyncio.sleep(self.refresh_interval)
+
+    async def refresh(self, provider: MarketDataProvider) -> None:
+        sectors = load_valid_equity_attributes()[1]["sector"]
+        partitions = [(region, sector) for region in self.regions for sector in sectors]
+        rows: list[dict] = []
+        incomplete: set[str] = set()
+        async for (region, sector), result, error in fan_out(
+            partitions,
+            lambda key: _load_partition(provider, *key, self.max_rows),
+            limit=self.concurrency,
+            deadline=self.refresh_interval,
+        ):
+            if error is not None:
+                self.failures += 1
+                incomplete.add(region)
+                logger.warning(
+                    "Could not load %s %s equities: %s", region, sector, error
+                )
+                continue
+            partition, complete = result
+            rows.extend(partition)
+            if not complete:
+                incomplete.add(region)
+        if not rows:
+            return
+
+        started = time.perf_counter()
+        self.universe = await asyncio.to_thread(
+            EquityUniverse.from_rows,
+            rows,
+            [region for region in self.regions if region not in incomplete],
+        )
+        self.last_build_ms = (time.perf_counter() - started) * 1000
+        self.refreshes += 1
+
+    def screen(
+        self, conditions, logical_operator: str, request: ScreenerRequest
+    ) -> Optional[dict]:
+        """A page of the screen from the snapshot, or None to ask Yahoo."""
+        universe = self.universe
+        if universe is None or universe.age > 2 * self.refresh_interval:
+            self.fallbacks += 1
+            return None
+        try:
+            result = universe.screen(
+                conditions,
+                logical_operator,
+                sort_field=request.sort_field,
+                offset=request.offset,
+                limit=request.limit,
+                intraday_max_age=self.intraday_max_age,
+            )
+        except UnsupportedScreen as e:
+            logger.debug("Screen sent upstream: %s", e)
+            self.fallbacks += 1
+            return None
+        self.local += 1
+        return result
+
+    def stats(self) -> dict:
+        universe = self.universe
+        return {
+            "running": self.running,
+            "rows": len(universe) if universe is not None else 0,
+            "regions": sorted(universe.regions) if universe is not None else [],
+            "age_seconds": round(universe.age, 1) if universe is not None else None,
+            "build_ms": round(self.last_build_ms, 1),
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "local": self.local,
+            "fallbacks": self.fallbacks,
+        }
+
+
+def _build_universe_store() -> EquityUniverseStore:
+    return EquityUniverseStore(
+        regions=settings.SCREENER_UNIVERSE_REGIONS,
+        refresh_interval=settings.SCREENER_UNIVERSE_REFRESH_SECONDS,
+        max_rows=settings.SCREENER_UNIVERSE_MAX_ROWS,
+        concurrency=settings.SCREENER_UNIVERSE_CONCURRENCY,
+        intraday_max_age=settings.SCREENER_CACHE_TTL_SECONDS,
+    )
+
+
+_universe_store: Optional[EquityUniverseStore] = None
+
+
+def get_equity_universe_store() -> EquityUniverseStore:
+    """Process-wide equity universe store, created on first use."""
+    global _universe_store
+    if _universe_store is None:
+        _universe_store = _build_universe_store()
+    return _universe_store
+
+
+def set_equity_universe_store(store: Optional[EquityUniverseStore]) -> None:
+    """Swap the store; the previous one's refresh job is stopped."""
+    global _universe_store
+    if _universe_store is not None and _universe_store is not store:
+        _universe_store.close()
+    _universe_store = store
+
+
+def get_cache_stats() -> dict:
+    return screen_cache.stats()
@@ -0,0 +1,314 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+import pandas as pd
+
+from app.core.config import settings
+from app.schemas.stocks import TickerInfoResponse
+from app.services.market_data_service import (
+    MarketDataProvider,
+    get_market_data_provider,
+)
+from app.utils.concurrency import fan_out
+from app.utils.freshness import mark_stale
+from app.utils.global_variables import SECTOR_INDUSTRY_MAP
+from app.utils.serialization import dumps, frame_to_records
+from app.utils.symbol_access import background
+
+logger = logging.getLogger(__name__)
+
+# Limit the routes use when the client does not pass one; rendered up front
+DEFAULT_LIMIT = 25
+
+# Encoded bodies kept per snapshot for non-default limits
+_MAX_ENCODED = 32
+
+# Everything a sector or industry page needs, fetched in one worker call.
+# ``ticker.info`` is a separate Yahoo request and is fetched on its own so a
+# failure there does not take the top lists down with it.
+_PAGE_ATTRS = {
+    "sector": (
+        "name",
+        "symbol",
+        "overview",
+        "research_reports",
+        "top_companies",
+        "top_etfs",
+        "top_mutual_funds",
+    ),
+    "industry": (
+        "name",
+        "symbol",
+        "overview",
+        "research_reports",
+        "top_companies",
+        "top_growth_companies",
+        "top_performing_companies",
+    ),
+}
+
+View = Callable[[Optional[int]], Any]
+
+
+def _top_funds(data: dict, attr: str, label: str, limit: Optional[int]) -> dict:
+    funds = data[attr]
+    if len(funds) == 0:
+        return {"error": f"No {label} data available for sector '{data['key']}'."}
+    return {
+        "sector": data["name"],
+        "symbol": data["symbol"],
+        attr: [
+            {"symbol": symbol, "name": name}
+            for symbol, name in list(funds.items())[:limit]
+        ],
+    }
+
+
+def _info_view(kind: str, data: dict) -> View:
+    def view(limit: Optional[int]) -> dict:
+        return {
+            # Industry pages have always reported their name under "sector"
+            "sector": data["name"],
+            "symbol": data["symbol"],
+            "overview": data["overview"],
+            "research_reports": data["research_reports"],
+            f"{kind}_info": TickerInfoResponse(**data["ticker.info"]).model_dump(),
+        }
+
+    return view
+
+
+def _records(frame: pd.DataFrame, limit: Optional[int]) -> list[dict]:
+    return frame_to_records(frame[:limit])
+
+
+def _sector_views(data: dict) -> dict[str, View]:
+    return {
+        "info": _info_view("sector", data),
+        "top_companies": lambda limit: {
+            "sector": data["name"],
+            "symbol": data["symbol"],
+            "top_companies": _records(data["top_companies"], limit),
+        },
+        "top_etfs": lambda limit: _top_funds(data, "top_etfs", "ETF", limit),
+        "top_mutual_funds": lambda limit: _top_funds(
+            data, "top_mutual_funds", "mutual fund", limit
+        ),
+    }
+
+
+def _industry_views(data: dict) -> dict[str, View]:
+    return {
+        "info": _info_view("industry", data),
+        "top_companies": lambda limit: {
+            "industry": data["name"],
+            "symbol": data["symbol"],
+            "top_companies": _records(data["top_companies"], limit),
+            "top_growth_companies": _records(data["top_growth_companies"], limit),
+            "top_performing_companies": _records(
+                data["top_performing_companies"], limit
+            ),
+        },
+    }
+
+
+_VIEWS = {"sector": _sector_views, "industry": _industry_views}
+
+# Views that do not take a limit
+_UNLIMITED_VIEWS = {"info"}
+
+
+@dataclass
+class Snapshot:
+    """
+    One sector's or industry's page data plus its JSON bodies, encoded once
+    per (view, limit) and reused by every request until the next refresh.
+    """
+
+    views: dict[str, View]
+    fetched_at: float
+    errors: dict[str, Exception] = field(default_factory=dict)
+    encoded: dict[tuple[str, Optional[int]], bytes] = field(default_factory=dict)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def render(self, view: str, limit: Optional[int] = None) -> bytes:
+        if view in _UNLIMITED_VIEWS:
+            limit = None
+        key = (view, limit)
+        body = self.encoded.get(key)
+        if body is None:
+            if view in self.errors:
+                raise self.errors[view]
+            body = dumps(self.views[view](limit))
+            if len(self.encoded) < _MAX_ENCODED:
+                self.encoded[key] = body
+        return body
+
+    def prerender(self) -> None:
+        for view in self.views:
+            try:
+                self.render(view, DEFAULT_LIMIT)
+            except Exception as e:
+                self.errors.setdefault(view, e)
+
+
+def snapshot_keys() -> list[tuple[str, str]]:
+    """Every sector and industry in SECTOR_INDUSTRY_MAP."""
+    return [("sector", sector) for sector in SECTOR_INDUSTRY_MAP] + [
+        ("industry", industry)
+        for industries in SECTOR_INDUSTRY_MAP.values()
+        for industry in industries
+    ]
+
+
+async def fetch_snapshot(provider: MarketDataProvider, kind: str, key: str) -> Snapshot:
+    page, info = await asyncio.gather(
+        provider.get_attrs(kind, key, _PAGE_ATTRS[kind]),
+        provider.get_attrs(kind, key, ["ticker.info"]),
+        return_exceptions=True,
+    )
+    if isinstance(page, BaseException):
+        raise page
+    data = {"key": key, **page}
+    errors = {}
+    if isinstance(info, BaseException):
+        errors["info"] = info
+    else:
+        data.update(info)
+    snapshot = Snapshot(views=_VIEWS[kind](data), fetched_at=time.time(), errors=errors)
+    await asyncio.to_thread(snapshot.prerender)
+    return snapshot
+
+
+class SectorSnapshotStore:
+    """
+    Sector and industry pages for every entry of SECTOR_INDUSTRY_MAP, kept in
+    memory and refreshed by a background job every ``refresh_interval``
+    seconds, so the sector/industry routes are a dictionary lookup returning
+    pre-encoded JSON.
+
+    Keys missing from the store (before the first refresh completes) are
+    fetched on demand. If the background job falls a full interval behind, a
+    request refreshes its snapshot inline, serving the old one if that fails.
+    """
+
+    def __init__(self, *, refresh_interval: float, concurrency: int):
+        self.refresh_interval = refresh_interval
+        self.concurrency = concurrency
+        self._snapshots: dict[tuple[str, str], Snapshot] = {}
+        self._known = set(snapshot_keys())
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.failures = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        with background():
+            while True:
+                try:
+                    await self.refresh_all(get_market_data_provider())
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning("Sector snapshot refresh failed: %s", e)
+                await asyncio.sleep(self.refresh_interval)
+
+    async def refresh_all(self, provider: MarketDataProvider) -> None:
+        async for key, snapshot, error in fan_out(
+            snapshot_keys(),
+            lambda key: fetch_snapshot(provider, *key),
+            limit=self.concurrency,
+            deadline=self.refresh_interval,
+        ):
+            if error is not None:
+                self.failures += 1
+                logger.warning("Could not refresh %s '%s': %s", *key, error)
+            else:
+                self.refreshes += 1
+                self._snapshots[key] = snapshot
+
+    def _expired(self, snapshot: Snapshot) -> bool:
+        # The background job refreshes on schedule; step in only once it has
+        # fallen a whole interval behind
+        grace = self.refresh_interval if self.running else 0.0
+        return snapshot.age >= self.refresh_interval + grace
+
+    async def get(self, provider: MarketDataProvider, kind: str, key: str) -> Snapshot:
+        snapshot = self._snapshots.get((kind, key))
+        if snapshot is not None and not self._expired(snapshot):
+            self.hits += 1
+            return snapshot
+
+        self.misses += 1
+        try:
+            fresh = await fetch_snapshot(provider, kind, key)
+        except Exception as e:
+            if snapshot is None:
+                raise
+            logger.warning("Serving expired %s '%s': %s", kind, key, e)
+            mark_stale(snapshot.age)
+            return snapshot
+        # Only the static map's keys are kept; anything else is fetched per call
+        if (kind, key) in self._known:
+            self._snapshots[(kind, key)] = fresh
+        return fresh
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "snapshots": len(self._snapshots),
+            "known": len(self._known),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "oldest_seconds": round(
+                max((s.age for s in self._snapshots.values()), default=0.0), 1
+            ),
+        }
+
+
+def _build_store() -> SectorSnapshotStore:
+    return SectorSnapshotStore(
+        refresh_interval=settings.SECTOR_SNAPSHOT_REFRESH_SECONDS,
+        concurrency=settings.SECTOR_SNAPSHOT_CONCURRENCY,
+    )
+
+
+_store: Optional[SectorSnapshotStore] = None
+
+
+def get_sector_snapshot_store() -> SectorSnapshotStore:
+    """Process-wide sector/industry snapshot store, created on first use."""
+    global _store
+    if _store is None:
+        _store = _build_store()
+    return _store
+
+
+def set_sector_snapshot_store(store: Optional[SectorSnapshotStore]) -> None:
+    """Swap the store; the previous one's refresh job is stopped."""
+    global _store
+    if _store is not None and _store is not store:
+        _store.close()
+    _store = store
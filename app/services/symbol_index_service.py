@@ -0,0 +1,423 @@
+import asyncio
+import csv
+import heapq
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+import pandas as pd
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.crud.favourite_stock import favourite_stock as crud_favourite_stock
+from app.crud.watchlist_item import watchlist_item as crud_watchlist_item
+from app.schemas.stocks import SearchResponse
+from app.services.market_data_service import MarketDataProvider
+from app.utils.serialization import frame_to_records
+
+logger = logging.getLogger(__name__)
+
+# yf.Lookup kinds -> quoteType of the instruments they return
+LOOKUP_QUOTE_TYPES = {
+    "all": None,
+    "stock": {"EQUITY"},
+    "mutualfund": {"MUTUALFUND"},
+    "etf": {"ETF"},
+    "index": {"INDEX"},
+    "future": {"FUTURE"},
+    "currency": {"CURRENCY"},
+    "cryptocurrency": {"CRYPTOCURRENCY"},
+}
+
+# Keys of every lookup row, however it was answered; missing values are ""
+LOOKUP_FIELDS = (
+    "symbol",
+    "shortName",
+    "exchange",
+    "quoteType",
+    "rank",
+    "regularMarketPrice",
+    "regularMarketChange",
+    "regularMarketPercentChange",
+)
+# Keys of every search quote, however it was answered
+SEARCH_FIELDS = tuple(SearchResponse.model_fields)
+
+# Longest name-word prefix indexed; longer query words are matched by trigrams
+_MAX_WORD_PREFIX = 12
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+@dataclass
+class SymbolEntry:
+    symbol: str
+    name: Optional[str] = None
+    exchange: Optional[str] = None
+    quote_type: Optional[str] = None
+    # Popularity (favourites, watchlist items, upstream rank); breaks ranking ties
+    weight: float = 0.0
+
+    def to_lookup(self) -> dict:
+        """Row shaped like a yf.Lookup result (see LOOKUP_FIELDS)."""
+        return _project(
+            {
+                "symbol": self.symbol,
+                "shortName": self.name,
+                "exchange": self.exchange,
+                "quoteType": self.quote_type,
+            },
+            LOOKUP_FIELDS,
+            "",
+        )
+
+    def to_quote(self, score: float) -> dict:
+        """Quote shaped like a yf.Search result (see SEARCH_FIELDS)."""
+        return _project(
+            {
+                "symbol": self.symbol,
+                "score": score,
+                "shortname": self.name,
+                "longname": self.name,
+                "exchange": self.exchange,
+                "quoteType": self.quote_type,
+            },
+            SEARCH_FIELDS,
+        )
+
+
+def _project(row: dict, fields: tuple[str, ...], missing: Any = None) -> dict:
+    """``row`` with exactly ``fields`` as keys."""
+    return {key: missing if row.get(key) is None else row[key] for key in fields}
+
+
+def _normalize_name(name: str) -> str:
+    return " ".join(_WORD_RE.findall(name.lower()))
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class SymbolIndex:
+    """
+    In-memory autocomplete index over symbols and company names.
+
+    Three inverted indexes map to symbols: every symbol prefix, every prefix of
+    every name word, and the character trigrams of the whole name (for matches
+    inside a word, e.g. "soft" -> Microsoft). Results are ranked by match tier
+    (exact symbol, symbol prefix, name-word prefix, name substring), then by
+    weight, then by symbol length.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, SymbolEntry] = {}
+        self._symbol_prefixes: dict[str, set[str]] = {}
+        self._word_prefixes: dict[str, set[str]] = {}
+        self._trigrams: dict[str, set[str]] = {}
+        self._names: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.strip().upper() in self._entries
+
+    def get(self, symbol: str) -> Optional[SymbolEntry]:
+        return self._entries.get(symbol.strip().upper())
+
+    def add(
+        self,
+        symbol: str,
+        name: Optional[str] = None,
+        exchange: Optional[str] = None,
+        quote_type: Optional[str] = None,
+        weight: float = 0.0,
+    ) -> Optional[SymbolEntry]:
+        """
+        Insert a symbol or fill in what is missing on an existing one. Weights
+        accumulate, so a symbol seen in many places ranks higher.
+        """
+        symbol = (symbol or "").strip().upper()
+        if not symbol:
+            return None
+        entry = self._entries.get(symbol)
+        if entry is None:
+            entry = SymbolEntry(symbol=symbol)
+            self._entries[symbol] = entry
+            for i in range(1, len(symbol) + 1):
+                self._symbol_prefixes.setdefault(symbol[:i], set()).add(symbol)
+
+        entry.exchange = entry.exchange or exchange or None
+        entry.quote_type = entry.quote_type or quote_type or None
+        entry.weight += weight
+        if name and not entry.name:
+            entry.name = name
+            self._index_name(symbol, name)
+        return entry
+
+    def _index_name(self, symbol: str, name: str) -> None:
+        normalized = _normalize_name(name)
+        self._names[symbol] = normalized
+        for word in normalized.split():
+            for i in range(1, min(len(word), _MAX_WORD_PREFIX) + 1):
+                self._word_prefixes.setdefault(word[:i], set()).add(symbol)
+        for gram in _trigrams(normalized):
+            self._trigrams.setdefault(gram, set()).add(symbol)
+
+    def _word_matches(self, words: list[str]) -> set[str]:
+        """Symbols with a name word starting with each query word."""
+        matches: Optional[set[str]] = None
+        for word in sorted(words, key=len, reverse=True):
+            hits = self._word_prefixes.get(word[:_MAX_WORD_PREFIX], set())
+            if len(word) > _MAX_WORD_PREFIX:
+                hits = {
+                    s
+                    for s in hits
+                    if any(w.startswith(word) for w in self._names[s].split())
+                }
+            matches = hits if matches is None else matches & hits
+            if not matches:
+                break
+        return matches or set()
+
+    def _substring_matches(self, phrase: str) -> set[str]:
+        """Symbols whose normalised name contains ``phrase``."""
+        grams = _trigrams(phrase)
+        if not grams:
+            return set()
+        postings = sorted((self._trigrams.get(g, set()) for g in grams), key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        return {s for s in candidates if phrase in self._names[s]}
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        quote_types: Optional[set[str]] = None,
+    ) -> list[tuple[SymbolEntry, float]]:
+        """
+        Best ``limit`` matches for ``query`` with a relevance score (1.0 for an
+        exact symbol, down to 0.25 for a name substring).
+        """
+        symbol_query = query.strip().upper()
+        words = _WORD_RE.findall(query.lower())
+        entries = self._entries
+
+        def accept(symbols):
+            if quote_types is None:
+                return symbols
+            return {s for s in symbols if entries[s].quote_type in quote_types}
+
+        # Lower tiers are only computed while the higher ones leave room
+        tiers: dict[str, int] = {}
+        for s in accept(self._symbol_prefixes.get(symbol_query, ())):
+            tiers[s] = 0 if s == symbol_query else 1
+        if words and len(tiers) < limit:
+            for s in accept(self._word_matches(words)):
+                tiers.setdefault(s, 2)
+        if words and len(tiers) < limit:
+            for s in accept(self._substring_matches(" ".join(words))):
+                tiers.setdefault(s, 3)
+
+        candidates = ((t, -entries[s].weight, len(s), s) for s, t in tiers.items())
+        return [
+            (entries[s], 1 - tier / 4)
+            for tier, _, _, s in heapq.nsmallest(limit, candidates)
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "symbols": len(self._entries),
+            "named": len(self._names),
+            "symbol_prefixes": len(self._symbol_prefixes),
+            "word_prefixes": len(self._word_prefixes),
+            "trigrams": len(self._trigrams),
+        }
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Seeding
+# ---------------------------------------------------------------------------------------------------------------------
+
+
+def load_listing(index: SymbolIndex, path: str) -> int:
+    """
+    Add a CSV listing with ``symbol,name,exchange,quote_type`` columns (e.g. an
+    exchange's full symbol directory) to the index. The bundled
+    app/data/symbol_listing.csv only seeds the most looked-up symbols; see
+    SYMBOL_LISTING_FILE.
+    """
+    count = 0
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if index.add(
+                row.get("symbol", ""),
+                name=row.get("name"),
+                exchange=row.get("exchange"),
+                quote_type=row.get("quote_type") or "EQUITY",
+            ):
+                count += 1
+    return count
+
+
+def load_user_symbols(index: SymbolIndex, session: Session) -> int:
+    """Add every favourite and watchlist symbol, weighted by how often it is held."""
+    count = 0
+    for symbol, exchange, name, users in crud_favourite_stock.count_by_symbol(session):
+        count += (
+            index.add(symbol, name=name, exchange=exchange, weight=users) is not None
+        )
+    for symbol, exchange, items in crud_watchlist_item.count_by_symbol(session):
+        count += index.add(symbol, exchange=exchange, weight=items) is not None
+    return count
+
+
+def add_lookup_results(index: SymbolIndex, results: pd.DataFrame) -> None:
+    """Merge a yf.Lookup frame (indexed by symbol) into the index."""
+    if results is None or results.empty:
+        return
+    frame = results.reset_index() if "symbol" not in results.columns else results
+    for row in frame.to_dict(orient="records"):
+        index.add(
+            str(row.get("symbol") or ""),
+            name=row.get("shortName") or row.get("longName"),
+            exchange=row.get("exchange"),
+            quote_type=(row.get("quoteType") or "").upper() or None,
+        )
+
+
+def add_search_quotes(index: SymbolIndex, quotes: Iterable[dict]) -> None:
+    """Merge the ``quotes`` of a yf.Search result into the index."""
+    for quote in quotes or ():
+        index.add(
+            quote.get("symbol") or "",
+            name=quote.get("longname") or quote.get("shortname"),
+            exchange=quote.get("exchange"),
+            quote_type=quote.get("quoteType"),
+        )
+
+
+symbol_index = SymbolIndex()
+
+# (kind, query) pairs recently answered by Yahoo; their results are in the index
+_upstream_queries: OrderedDict[tuple[str, str], float] = OrderedDict()
+_listing_loaded = False
+
+
+def _ensure_listing() -> None:
+    global _listing_loaded
+    if _listing_loaded:
+        return
+    _listing_loaded = True
+    if not settings.SYMBOL_LISTING_FILE:
+        return
+    try:
+        count = load_listing(symbol_index, settings.SYMBOL_LISTING_FILE)
+        logger.info("Symbol index seeded with %d listed symbols.", count)
+    except Exception as e:
+        logger.warning("Could not load symbol listing: %s", e)
+
+
+async def warm_symbol_index() -> None:
+    """Seed the index from the listing file and from users' favourites/watchlists."""
+    _ensure_listing()
+
+    def load() -> int:
+        with Session(engine) as session:
+            return load_user_symbols(symbol_index, session)
+
+    try:
+        count = await asyncio.to_thread(load)
+        logger.info("Symbol index seeded with %d user symbols.", count)
+    except Exception as e:
+        logger.warning("Could not seed symbol index from the database: %s", e)
+
+
+def _recently_fetched(kind: str, query: str) -> bool:
+    fetched_at = _upstream_queries.get((kind, query))
+    if fetched_at is None:
+        return False
+    if time.time() - fetched_at > settings.SYMBOL_INDEX_UPSTREAM_TTL_SECONDS:
+        del _upstream_queries[(kind, query)]
+        return False
+    return True
+
+
+def _remember_query(kind: str, query: str) -> None:
+    _upstream_queries[(kind, query)] = time.time()
+    _upstream_queries.move_to_end((kind, query))
+    while len(_upstream_queries) > settings.SYMBOL_INDEX_MAX_UPSTREAM_QUERIES:
+        _upstream_queries.popitem(last=False)
+
+
+def _merge(upstream: list[dict], local: list[dict], limit: int) -> list[dict]:
+    """Upstream results first, then local matches Yahoo did not return."""
+    seen = {row.get("symbol") for row in upstream}
+    extra = [row for row in local if row["symbol"] not in seen]
+    return (upstream + extra)[: max(limit, len(upstream))]
+
+
+def _is_local_hit(kind: str, query: str, hits: list, wanted: int) -> bool:
+    """
+    The index answers when it fills the request, or when Yahoo was asked the
+    same query recently (its results were added, so it would add nothing).
+    """
+    return len(hits) >= wanted or _recently_fetched(kind, query)
+
+
+async def lookup(
+    provider: MarketDataProvider, query: str, *, kind: str, count: int
+) -> list[dict]:
+    """
+    Lookup-style results for ``query``, answered from the local index when it has
+    ``count`` matches; otherwise from Yahoo, whose results are added to the
+    index. Rows have the LOOKUP_FIELDS keys either way.
+    """
+    _ensure_listing()
+    key = query.strip().lower()
+    quote_types = LOOKUP_QUOTE_TYPES.get(kind)
+    hits = symbol_index.search(query, count, quote_types)
+    if _is_local_hit(f"lookup:{kind}", key, hits, count):
+        return [entry.to_lookup() for entry, _ in hits]
+
+    df = await provider.lookup(query, kind=kind, count=count)
+    add_lookup_results(symbol_index, df)
+    _remember_query(f"lookup:{kind}", key)
+    results = [
+        _project(row, LOOKUP_FIELDS, "")
+        for row in ([] if df.empty else frame_to_records(df, fill_nan=""))
+    ]
+    return _merge(results, [entry.to_lookup() for entry, _ in hits], count)
+
+
+async def search_quotes(
+    provider: MarketDataProvider, query: str, *, max_results: int, **kwargs: Any
+) -> list[dict]:
+    """
+    Search-style quotes for ``query``, answered from the local index when it has
+    ``max_results`` matches; otherwise from Yahoo, whose quotes are added to the
+    index. Quotes have the SEARCH_FIELDS keys either way.
+    """
+    _ensure_listing()
+    key = query.strip().lower()
+    hits = symbol_index.search(query, max_results)
+    if _is_local_hit("search", key, hits, max_results):
+        return [entry.to_quote(score) for entry, score in hits]
+
+    search = await provider.search(query, max_results=max_results, **kwargs)
+    quotes = search.get("quotes") or []
+    add_search_quotes(symbol_index, quotes)
+    _remember_query("search", key)
+    quotes = [_project(quote, SEARCH_FIELDS) for quote in quotes]
+    return _merge(quotes, [entry.to_quote(score) for entry, score in hits], max_results)
+
+
+def get_stats() -> dict:
+    return {
+        **symbol_index.stats(),
+        "upstream_queries": len(_upstream_queries),
+    }
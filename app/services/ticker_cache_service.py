@@ -0,0 +1,110 @@
+from typing import AsyncIterator, Iterable, Optional
+
+from app.core.config import settings
+from app.schemas.stocks import TickerInfoResponse
+from app.services.market_data_service import MarketDataProvider
+from app.utils.cache import TTLCache
+from app.utils.concurrency import fan_out
+from app.utils.symbol_access import record_access
+from app.utils.trading_calendar import (
+    ExchangeCalendar,
+    calendar_for_symbol,
+    market_hours_ttl,
+)
+
+
+info_cache = TTLCache(
+    name="ticker_info",
+    ttl=settings.INFO_CACHE_TTL_SECONDS,
+    stale_ttl=settings.INFO_CACHE_STALE_SECONDS,
+    max_entries=settings.TICKER_CACHE_MAX_ENTRIES,
+)
+
+fast_info_cache = TTLCache(
+    name="ticker_fast_info",
+    ttl=settings.FAST_INFO_CACHE_TTL_SECONDS,
+    stale_ttl=settings.FAST_INFO_CACHE_STALE_SECONDS,
+    max_entries=settings.TICKER_CACHE_MAX_ENTRIES,
+    ttl_policy=market_hours_ttl(
+        settings.FAST_INFO_CACHE_TTL_SECONDS,
+        settings.CLOSED_MARKET_CACHE_MAX_TTL_SECONDS,
+        lambda symbol, fast_info: symbol_calendar(symbol, fast_info),
+    ),
+)
+
+metadata_cache = TTLCache(
+    name="ticker_metadata",
+    ttl=settings.METADATA_CACHE_TTL_SECONDS,
+    stale_ttl=settings.METADATA_CACHE_STALE_SECONDS,
+    max_entries=settings.TICKER_CACHE_MAX_ENTRIES,
+)
+
+
+def normalize_symbol(symbol: str) -> str:
+    return symbol.strip().upper()
+
+
+def symbol_calendar(
+    symbol: str, fields: Optional[dict] = None
+) -> Optional[ExchangeCalendar]:
+    """
+    Trading calendar of a symbol, from the exchange in ``fields`` (a quote or
+    fast_info payload) or in its cached metadata, else from the symbol itself.
+    """
+    if fields is None:
+        entry = metadata_cache.get_entry(symbol)
+        fields = entry.value if entry is not None else {}
+    return calendar_for_symbol(
+        symbol, exchange=fields.get("exchange"), quote_type=fields.get("quoteType")
+    )
+
+
+async def get_ticker_info(provider: MarketDataProvider, symbol: str) -> dict:
+    """
+    Return the full Yahoo info payload for a symbol, served from cache when possible.
+    """
+    symbol = normalize_symbol(symbol)
+    record_access(symbol)
+    return await info_cache.get_or_fetch(symbol, lambda: provider.get_info(symbol))
+
+
+async def get_ticker_fast_info(provider: MarketDataProvider, symbol: str) -> dict:
+    """
+    Return the fast_info fields for a symbol, served from cache when possible.
+    """
+    symbol = normalize_symbol(symbol)
+    record_access(symbol)
+    return await fast_info_cache.get_or_fetch(
+        symbol, lambda: provider.get_fast_info(symbol)
+    )
+
+
+async def iter_ticker_infos(
+    provider: MarketDataProvider,
+    symbols: Iterable[str],
+    *,
+    concurrency: int,
+    deadline: float,
+) -> AsyncIterator[tuple[str, Optional[TickerInfoResponse], Optional[str]]]:
+    """
+    Fetch info for many symbols concurrently (at most ``concurrency`` at a time)
+    and yield ``(symbol, info, error)`` as each one finishes. Symbols still pending
+    after ``deadline`` seconds are reported as errors.
+    """
+
+    async def fetch(symbol: str) -> TickerInfoResponse:
+        info = TickerInfoResponse(**await get_ticker_info(provider, symbol))
+        if info.symbol is None:
+            raise LookupError(f"Ticker '{symbol}' not found or has no info.")
+        return info
+
+    async for symbol, info, error in fan_out(
+        dict.fromkeys(symbols), fetch, limit=concurrency, deadline=deadline
+    ):
+        yield symbol, info, (
+            None if error is None else (str(error) or type(error).__name__)
+        )
+
+
+def get_cache_stats() -> list[dict]:
+    return [info_cache.stats(), fast_info_cache.stats(), metadata_cache.stats()]
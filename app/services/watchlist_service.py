@@ -27,6 +27,7 @@ from app.schemas.watchlist_item import (
     WatchlistItemUpdate,
 )
 from app.schemas.watchlist_share import WatchlistShareCreate
+from app.services.symbol_index_service import symbol_index
 
 
 def search_public_watchlists_by_name(
@@ -337,11 +338,13 @@ def add_item_to_watchlist(
         watchlist_id=item.watchlist_id,
     )
 
-    return watchlist_item_crud.create(
+    db_item = watchlist_item_crud.create(
         session=session,
         watchlist_id=item.watchlist_id,
         obj_in=item_in,
     )
+    symbol_index.add(item.symbol, exchange=item.exchange, weight=1)
+    return db_item
 
 
 def add_many_items_to_watchlist(
@@ -374,6 +377,7 @@ def add_many_items_to_watchlist(
     session.commit()
     for db_item in db_items:
         session.refresh(db_item)
+        symbol_index.add(db_item.symbol, exchange=db_item.exchange, weight=1)
 
     return [
         WatchlistItemBase.model_validate(db_item, from_attributes=True)
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from fastapi import HTTPException
+
+from app.utils.freshness import mark_stale
+
+# Upstream errors that mean "try again later" rather than "no such data"
+UNAVAILABLE_STATUSES = frozenset({429, 502, 503, 504})
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    stored_at: float
+    ttl: float
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+    @property
+    def expired(self) -> bool:
+        return self.age >= self.ttl
+
+
+class TTLCache:
+    """
+    In-process async cache with a time-to-live, stale-while-revalidate and an
+    LRU bound on the number of entries.
+
+    - Entries younger than ``ttl`` are served as-is.
+    - Entries older than ``ttl`` but younger than ``ttl + stale_ttl`` are served
+      immediately while a single background refresh replaces them.
+    - Older entries are treated as misses and fetched inline. If upstream is
+      unavailable (rate limited, circuit open, timing out) the expired value is
+      served instead of the error.
+
+    Anything served past its TTL is reported through ``mark_stale``.
+
+    ``ttl_policy(key, value)`` may pick a TTL per entry when it is stored (e.g.
+    longer while the symbol's market is closed); returning None keeps ``ttl``.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        ttl: float,
+        stale_ttl: float,
+        max_entries: int,
+        ttl_policy: Optional[Callable[[Hashable, Any], Optional[float]]] = None,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.ttl_policy = ttl_policy
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._refreshing: dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.fallback_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def get_fresh(self, key: Hashable) -> Optional[Any]:
+        """Return the value only if it is still within its TTL."""
+        entry = self.get_entry(key)
+        if entry is not None and not entry.expired:
+            self.hits += 1
+            return entry.value
+        return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        ttl = self.ttl_policy(key, value) if self.ttl_policy else None
+        self._entries[key] = CacheEntry(
+            value=value,
+            stored_at=time.monotonic(),
+            ttl=self.ttl if ttl is None else ttl,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def get_or_fetch(
+        self, key: Hashable, fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        entry = self.get_entry(key)
+        if entry is not None:
+            age = entry.age
+            if age < entry.ttl:
+                self.hits += 1
+                return entry.value
+            if age < entry.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                mark_stale(age)
+                self._schedule_refresh(key, fetch)
+                return entry.value
+
+        self.misses += 1
+        try:
+            value = await fetch()
+        except HTTPException as e:
+            if entry is None or e.status_code not in UNAVAILABLE_STATUSES:
+                raise
+            self.fallback_hits += 1
+            mark_stale(entry.age)
+            logger.warning("%s serving expired %r: %s", self.name, key, e.detail)
+            return entry.value
+        self.set(key, value)
+        return value
+
+    def get_nowait(
+        self, key: Hashable, fetch: Callable[[], Awaitable[Any]]
+    ) -> Optional[Any]:
+        """
+        Like ``get_or_fetch`` but never waits on ``fetch``: a missing or
+        expired entry is refreshed in the background and None (or the value,
+        while within ``stale_ttl``) is returned meanwhile.
+        """
+        entry = self.get_entry(key)
+        if entry is not None and not entry.expired:
+            self.hits += 1
+            return entry.value
+        self._schedule_refresh(key, fetch)
+        if entry is None or entry.age >= entry.ttl + self.stale_ttl:
+            self.misses += 1
+            return None
+        self.stale_hits += 1
+        mark_stale(entry.age)
+        return entry.value
+
+    def _schedule_refresh(
+        self, key: Hashable, fetch: Callable[[], Awaitable[Any]]
+    ) -> None:
+        if key in self._refreshing:
+            return
+        task = asyncio.create_task(self._refresh(key, fetch))
+        self._refreshing[key] = task
+
+    async def _refresh(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]):
+        try:
+            self.set(key, await fetch())
+        except Exception as e:
+            # Keep serving the stale value; the next stale hit retries.
+            logger.warning("%s cache refresh failed for %r: %s", self.name, key, e)
+        finally:
+            self._refreshing.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "fallback_hits": self.fallback_hits,
+            "misses": self.misses,
+        }
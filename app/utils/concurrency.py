@@ -0,0 +1,452 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    Optional,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical async calls into one in-flight future.
+
+    The first caller for a key starts the call; callers arriving while it is
+    still running await the same result instead of issuing their own. Each
+    waiter is shielded, so one caller being cancelled (e.g. a client
+    disconnect) does not cancel the shared call for everyone else.
+    """
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.deduplicated = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is None:
+            self.calls += 1
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._discard(key, f))
+        else:
+            self.deduplicated += 1
+        return await asyncio.shield(future)
+
+    def _discard(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            # Mark the exception as retrieved in case every waiter went away
+            future.exception()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "deduplicated": self.deduplicated,
+            "inflight": len(self._inflight),
+        }
+
+
+class KeyedLock:
+    """
+    One asyncio.Lock per key, created on first use and dropped once nobody
+    holds or waits for it, so the table stays as small as the set of keys
+    currently in use.
+    """
+
+    def __init__(self):
+        self._locks: dict[Hashable, tuple[asyncio.Lock, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable) -> AsyncIterator[None]:
+        lock, users = self._locks.get(key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._locks[key]
+            if users == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+
+class RateLimitExceeded(Exception):
+    """No token would be available within the caller's maximum wait."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit exceeded, retry in {retry_after:.0f}s.")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Async token bucket holding at most ``capacity`` tokens, refilled continuously
+    at ``rate`` tokens per second.
+
+    Callers reserve a token up front and sleep until it is due, so concurrent
+    callers queue in arrival order. A caller whose token would only be due after
+    ``max_wait`` seconds gets RateLimitExceeded instead of queueing.
+    """
+
+    def __init__(self, *, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def wait_time(self) -> float:
+        """Seconds until the next token would be available."""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. after upstream reported the limit as reached."""
+        self._refill()
+        self._tokens = min(self._tokens, 0)
+
+    def try_acquire(self, tokens: int = 1) -> bool:
+        """Take ``tokens`` now if the bucket holds them; never waits."""
+        if self.tokens < tokens:
+            return False
+        self._tokens -= tokens
+        return True
+
+    async def acquire(self, max_wait: Optional[float] = None) -> None:
+        wait = self.wait_time()
+        if max_wait is not None and wait > max_wait:
+            raise RateLimitExceeded(wait)
+        self._tokens -= 1
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self._tokens += 1  # give the reservation back
+                raise
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_second": self.rate,
+            "capacity": self.capacity,
+            "tokens": round(self.tokens, 3),
+        }
+
+
+class CircuitOpenError(Exception):
+    """The circuit is open; the call was rejected without reaching upstream."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(
+            f"{name} is unavailable (circuit open), retry in {retry_after:.0f}s."
+        )
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Stop calling an upstream that is failing or too slow.
+
+    - closed: calls pass. Outcomes over the last ``window`` seconds are kept and
+      once there are at least ``min_calls`` the circuit opens if the failure rate
+      reaches ``failure_rate`` or the share of calls slower than ``slow_call``
+      seconds reaches ``slow_call_rate``.
+    - open: calls are rejected with CircuitOpenError for ``open_for`` seconds.
+    - half-open: up to ``probes`` trial calls go through. If all of them succeed
+      the circuit closes; any failure reopens it for twice as long (capped at
+      ``max_open_for``), so a struggling upstream is probed less and less often.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        window: float,
+        min_calls: int,
+        failure_rate: float,
+        slow_call: float,
+        slow_call_rate: float,
+        open_for: float,
+        max_open_for: float,
+        probes: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call = slow_call
+        self.slow_call_rate = slow_call_rate
+        self.base_open_for = open_for
+        self.max_open_for = max_open_for
+        self.probes = probes
+        self.clock = clock
+
+        self._state = self.CLOSED
+        self._open_for = open_for
+        self._opened_at = 0.0
+        self._outcomes: deque[tuple[float, bool, bool]] = deque()
+        self._failures = 0
+        self._slow = 0
+        self._probes_inflight = 0
+        self._probe_successes = 0
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if (
+            self._state == self.OPEN
+            and self.clock() >= self._opened_at + self._open_for
+        ):
+            self._state = self.HALF_OPEN
+            self._probes_inflight = 0
+            self._probe_successes = 0
+        return self._state
+
+    def retry_after(self) -> float:
+        if self.state == self.OPEN:
+            return max(0.0, self._opened_at + self._open_for - self.clock())
+        return 0.0
+
+    def allow(self) -> bool:
+        """
+        Admit a call or raise CircuitOpenError. Returns True when the call is a
+        half-open probe; pass that flag back to ``record``/``release``.
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return False
+        if state == self.HALF_OPEN and self._probes_inflight < self.probes:
+            self._probes_inflight += 1
+            return True
+        self.rejected += 1
+        raise CircuitOpenError(self.name, self.retry_after() or 1.0)
+
+    def record(self, *, ok: bool, duration: float, probe: bool) -> None:
+        slow = duration >= self.slow_call
+        if probe:
+            self._probes_inflight -= 1
+            if self._state != self.HALF_OPEN:
+                return
+            if not ok or slow:
+                self._trip(self._open_for * 2)
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self.probes:
+                    self._close()
+            return
+        if self._state != self.CLOSED:
+            # Started before the circuit opened; the probes decide now
+            return
+
+        now = self.clock()
+        self._outcomes.append((now, not ok, slow))
+        self._failures += not ok
+        self._slow += slow
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            _, failed, was_slow = self._outcomes.popleft()
+            self._failures -= failed
+            self._slow -= was_slow
+
+        calls = len(self._outcomes)
+        if calls >= self.min_calls and (
+            self._failures >= self.failure_rate * calls
+            or self._slow >= self.slow_call_rate * calls
+        ):
+            self._trip(self.base_open_for)
+
+    def release(self, *, probe: bool) -> None:
+        """Give back an admitted call that ended without an outcome (cancelled)."""
+        if probe:
+            self._probes_inflight -= 1
+
+    def _trip(self, open_for: float) -> None:
+        self._state = self.OPEN
+        self._open_for = min(open_for, self.max_open_for)
+        self._opened_at = self.clock()
+        self.trips += 1
+
+    def _close(self) -> None:
+        self._state = self.CLOSED
+        self._open_for = self.base_open_for
+        self._outcomes.clear()
+        self._failures = self._slow = 0
+
+    def stats(self) -> dict:
+        calls = len(self._outcomes)
+        return {
+            "name": self.name,
+            "state": self.state,
+            "retry_after": round(self.retry_after(), 1),
+            "calls_in_window": calls,
+            "failure_rate": round(self._failures / calls, 3) if calls else 0.0,
+            "slow_call_rate": round(self._slow / calls, 3) if calls else 0.0,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit that finds the upstream's capacity by itself (AIMD).
+
+    Every successful call made while the limit was in use raises it by
+    ``1 / limit``, i.e. about one slot per round of calls. An overload signal
+    (rate limit, timeout) multiplies it by ``backoff``. Only calls started after
+    the previous decrease can trigger the next one, so a burst of failures from
+    calls that were already in flight counts as a single signal; this keeps the
+    limit settling just below the upstream's threshold instead of collapsing
+    and oscillating.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        backoff: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.clock = clock
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.inflight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        self.increases = 0
+        self.decreases = 0
+
+    async def acquire(self) -> float:
+        """Wait for a slot; returns the start time to pass to ``release``."""
+        while self.inflight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    self._wake()  # pass the wake-up on
+                raise
+        self.inflight += 1
+        return self.clock()
+
+    def release(
+        self, started_at: float, *, success: bool = True, overloaded: bool = False
+    ) -> None:
+        saturated = self.inflight >= int(self.limit)
+        self.inflight -= 1
+        if overloaded:
+            if started_at >= self._last_decrease:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = self.clock()
+                self.decreases += 1
+        elif success and saturated and self.limit < self.max_limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.increases += 1
+        self._wake()
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.inflight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "inflight": self.inflight,
+            "waiting": len(self._waiters),
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
+
+
+async def fan_out(
+    items: Iterable[T],
+    fn: Callable[[T], Awaitable[Any]],
+    *,
+    limit: int,
+    deadline: float,
+) -> AsyncIterator[tuple[T, Any, Optional[BaseException]]]:
+    """
+    Run ``fn`` over ``items`` with at most ``limit`` calls in flight and yield
+    ``(item, result, error)`` tuples as soon as each call finishes.
+
+    Calls still running when the overall ``deadline`` (seconds) passes are
+    cancelled and reported with a TimeoutError, so a partial result is always
+    returned instead of one slow item holding up the whole batch.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(item: T) -> Any:
+        async with semaphore:
+            return await fn(item)
+
+    tasks = {asyncio.ensure_future(run(item)): item for item in items}
+    loop = asyncio.get_running_loop()
+    expires_at = loop.time() + deadline
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = expires_at - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                error = task.exception()
+                yield tasks[task], None if error else task.result(), error
+
+        for task in pending:
+            task.cancel()
+            yield tasks[task], None, asyncio.TimeoutError(
+                f"Deadline of {deadline:g}s exceeded."
+            )
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,54 @@
+"""
+Tell clients when a response was built from cached data past its TTL.
+
+Services call ``mark_stale(age)`` whenever they serve an expired value (for
+instance because the upstream circuit is open). FreshnessMiddleware then adds
+
+    X-Data-Freshness: stale
+    Age: <seconds of the oldest value used>
+
+to that request's response. The per-request state is a mutable holder in a
+context variable, so marks made in child tasks and worker threads (which run on
+copies of the context) still reach the middleware.
+"""
+
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_request_staleness: ContextVar[Optional[dict]] = ContextVar(
+    "request_staleness", default=None
+)
+
+
+def mark_stale(age: float) -> None:
+    state = _request_staleness.get()
+    if state is not None:
+        state["age"] = max(state.get("age", 0.0), age)
+
+
+class FreshnessMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state: dict = {}
+        token = _request_staleness.set(state)
+
+        async def send_with_freshness(message: Message) -> None:
+            if message["type"] == "http.response.start" and "age" in state:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-data-freshness", b"stale"))
+                headers.append((b"age", str(int(state["age"])).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_freshness)
+        finally:
+            _request_staleness.reset(token)
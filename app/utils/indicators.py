@@ -0,0 +1,128 @@
+"""
+Technical indicators computed with NumPy over whole price arrays.
+
+Every function takes float arrays and returns arrays of the same length, with
+NaN where the indicator is not yet defined (the warm-up bars). Exponential
+averages follow the TA-Lib convention of seeding with the simple average of
+the first ``period`` values.
+"""
+
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _ewm(values: np.ndarray, alpha: float, start: int, seed: float) -> np.ndarray:
+    """
+    Exponential average ``y[t] = alpha * x[t] + (1 - alpha) * y[t-1]`` for
+    ``t > start`` with ``y[start] = seed``, NaN before ``start``.
+
+    The recurrence is solved in closed form, one block at a time:
+    within a block ``y[j] = d^j * (d * y_prev + alpha * cumsum(x[i] / d^i))``
+    with ``d = 1 - alpha``. Blocks are sized so ``d^-j`` cannot overflow, which
+    keeps the Python-level loop to a handful of iterations.
+    """
+    out = np.full(len(values), np.nan)
+    if start >= len(values):
+        return out
+    out[start] = seed
+    decay = 1.0 - alpha
+    if decay <= 0:
+        out[start + 1 :] = values[start + 1 :]
+        return out
+
+    block = max(1, int(200 * math.log(10) / -math.log(decay)))
+    powers = decay ** np.arange(1, block + 1)
+    prev = seed
+    for lo in range(start + 1, len(values), block):
+        chunk = values[lo : lo + block]
+        p = powers[: len(chunk)]
+        out[lo : lo + len(chunk)] = p * (prev + alpha * np.cumsum(chunk / p))
+        prev = out[lo + len(chunk) - 1]
+    return out
+
+
+def sma(close: np.ndarray, period: int = 20) -> np.ndarray:
+    out = np.full(len(close), np.nan)
+    if period > len(close):
+        return out
+    totals = np.cumsum(np.concatenate(([0.0], close)))
+    out[period - 1 :] = (totals[period:] - totals[:-period]) / period
+    return out
+
+
+def ema(close: np.ndarray, period: int = 20) -> np.ndarray:
+    if period > len(close):
+        return np.full(len(close), np.nan)
+    return _ewm(close, 2 / (period + 1), period - 1, close[:period].mean())
+
+
+def wilder(values: np.ndarray, period: int, offset: int = 0) -> np.ndarray:
+    """Wilder's smoothing (alpha = 1/period), defined from ``offset + period - 1``."""
+    start = offset + period - 1
+    if start >= len(values):
+        return np.full(len(values), np.nan)
+    return _ewm(values, 1 / period, start, values[offset : start + 1].mean())
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    delta = np.diff(close, prepend=np.nan)
+    gains = wilder(np.clip(delta, 0, None), period, offset=1)
+    losses = wilder(np.clip(-delta, 0, None), period, offset=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100 - 100 / (1 + gains / losses)
+    # Only gains in the window: 100; no movement at all: neutral 50
+    out[(losses == 0) & (gains > 0)] = 100.0
+    out[(losses == 0) & (gains == 0)] = 50.0
+    return out
+
+
+def macd(
+    close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9
+) -> dict[str, np.ndarray]:
+    line = ema(close, fast) - ema(close, slow)
+    first = slow - 1
+    signal_line = np.full(len(close), np.nan)
+    if first + signal <= len(close):
+        valid = line[first:]
+        signal_line[first:] = _ewm(
+            valid, 2 / (signal + 1), signal - 1, valid[:signal].mean()
+        )
+    return {"macd": line, "signal": signal_line, "histogram": line - signal_line}
+
+
+def bollinger(
+    close: np.ndarray, period: int = 20, stddev: float = 2.0
+) -> dict[str, np.ndarray]:
+    middle = sma(close, period)
+    width = np.full(len(close), np.nan)
+    if period <= len(close):
+        # Population standard deviation, as Bollinger defined the bands
+        width[period - 1 :] = stddev * sliding_window_view(close, period).std(axis=1)
+    return {"upper": middle + width, "middle": middle, "lower": middle - width}
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    ranges = np.stack([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    return np.nanmax(ranges, axis=0)
+
+
+def atr(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14
+) -> np.ndarray:
+    # The first bar has no previous close, so its range is high - low only and
+    # it is left out of the seed like TA-Lib does
+    return wilder(true_range(high, low, close), period, offset=1)
+
+
+# name -> (function, price inputs, default parameters)
+INDICATORS = {
+    "sma": (sma, ("close",), (20,)),
+    "ema": (ema, ("close",), (20,)),
+    "rsi": (rsi, ("close",), (14,)),
+    "macd": (macd, ("close",), (12, 26, 9)),
+    "bbands": (bollinger, ("close",), (20, 2.0)),
+    "atr": (atr, ("high", "low", "close"), (14,)),
+}
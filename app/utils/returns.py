@@ -0,0 +1,115 @@
+"""
+Returns, covariance and correlation over an aligned (dates x symbols) matrix.
+
+Missing values are NaN: a symbol that did not trade on a date (holiday, later
+listing, suspension) has no return there. Pairwise statistics use every date on
+which both symbols have a return, computed for all pairs at once with matrix
+products instead of a loop over pairs.
+"""
+
+import numpy as np
+
+
+def align_closes(
+    dates: list[np.ndarray], closes: list[np.ndarray]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Place per-symbol close series on the union of their dates.
+
+    Returns the sorted union of dates and a (dates x symbols) matrix with NaN
+    where a symbol has no bar.
+    """
+    union = np.unique(np.concatenate(dates)) if dates else np.array([], "M8[D]")
+    matrix = np.full((len(union), len(closes)), np.nan)
+    for column, (days, values) in enumerate(zip(dates, closes)):
+        matrix[np.searchsorted(union, days), column] = values
+    return union, matrix
+
+
+def returns_matrix(closes: np.ndarray, method: str = "simple") -> np.ndarray:
+    """
+    Period returns per column, each measured from the symbol's previous close
+    rather than the previous row, so a holiday does not drop the next return.
+    """
+    out = np.full(closes.shape, np.nan)
+    for column in range(closes.shape[1]):
+        rows = np.flatnonzero(~np.isnan(closes[:, column]))
+        values = closes[rows, column]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if method == "log":
+                out[rows[1:], column] = np.diff(np.log(values))
+            else:
+                out[rows[1:], column] = values[1:] / values[:-1] - 1
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+
+def pairwise_moments(
+    returns: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sums over the dates where both symbols of each pair have a return.
+
+    Returns ``(n, sx, sxx, sxy)``: ``n[i, j]`` observations, ``sx[i, j]`` and
+    ``sxx[i, j]`` the sum and sum of squares of symbol ``i`` on those dates,
+    ``sxy[i, j]`` the sum of products.
+    """
+    valid = ~np.isnan(returns)
+    mask = valid.astype("f8")
+    x = np.where(valid, returns, 0.0)
+    n = mask.T @ mask
+    sx = x.T @ mask
+    sxx = (x * x).T @ mask
+    sxy = x.T @ x
+    return n, sx, sxx, sxy
+
+
+def covariance(returns: np.ndarray, min_periods: int = 2) -> np.ndarray:
+    """Pairwise-complete sample covariance (ddof=1)."""
+    n, sx, _, sxy = pairwise_moments(returns)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = (sxy - sx * sx.T / n) / (n - 1)
+    cov[n < max(min_periods, 2)] = np.nan
+    return cov
+
+
+def correlation(returns: np.ndarray, min_periods: int = 2) -> np.ndarray:
+    """Pairwise-complete Pearson correlation."""
+    n, sx, sxx, sxy = pairwise_moments(returns)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sx.T / n
+        var = sxx - sx * sx / n
+        corr = cov / np.sqrt(var * var.T)
+    corr[n < max(min_periods, 2)] = np.nan
+    np.clip(corr, -1.0, 1.0, out=corr)
+    return corr
+
+
+def rolling_correlation(
+    returns: np.ndarray, benchmark: np.ndarray, window: int, min_periods: int
+) -> np.ndarray:
+    """
+    Correlation of every column with ``benchmark`` over trailing ``window``
+    rows, using the rows in the window where both have a return. Windowed sums
+    come from differences of cumulative sums, so the cost does not grow with
+    the window.
+    """
+    valid = ~np.isnan(returns) & ~np.isnan(benchmark)[:, None]
+    x = np.where(valid, returns, 0.0)
+    y = np.where(valid, benchmark[:, None], 0.0)
+
+    def windowed(values: np.ndarray) -> np.ndarray:
+        totals = np.cumsum(values, axis=0)
+        totals[window:] = totals[window:] - totals[:-window]
+        return totals
+
+    n = windowed(valid.astype("f8"))
+    sx, sy = windowed(x), windowed(y)
+    sxx, syy, sxy = windowed(x * x), windowed(y * y), windowed(x * y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = n * sxy - sx * sy
+        corr = cov / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+    corr[n < max(min_periods, 2)] = np.nan
+    corr[~np.isfinite(corr)] = np.nan
+    np.clip(corr, -1.0, 1.0, out=corr)
+    return corr
@@ -1,5 +1,13 @@
+import hashlib
+import math
+import numbers
+from dataclasses import dataclass
+from typing import Optional
+
 import yfinance as yf
+from app.schemas.screener import ScreenerCondition
 from app.utils.global_variables import REGIONS
+from app.utils.serialization import dumps
 
 
 def load_valid_equity_attributes():
@@ -18,65 +26,354 @@ def load_valid_fund_attributes():
     return fields, values
 
 
-def build_equity_query(conditions, logical_operator):
+def _number(op, value):
+    if isinstance(value, bool):
+        raise ValueError(f"{op} operator expects a number")
+    if isinstance(value, numbers.Real):
+        return value
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{op} operator expects a number")
+    return int(value) if value.is_integer() else value
+
+
+def _build_query(query_cls, conditions, logical_operator):
     subqueries = []
 
     for cond in conditions:
         op = cond.operator.lower()
 
         if op == "is-in":
-            if not isinstance(cond.value, list):
+            if not isinstance(cond.value, list) or not cond.value:
                 raise ValueError("is-in operator expects a list value")
-            isin_queries = [yf.EquityQuery(op, [cond.field, v]) for v in cond.value]
-            if len(isin_queries) == 1:
-                subqueries.append(isin_queries[0])
-            else:
-                subqueries.append(yf.EquityQuery("or", isin_queries))
+            subqueries.append(query_cls(op, [cond.field, *cond.value]))
         elif op == "btwm":
             if not isinstance(cond.value, list) or len(cond.value) != 2:
                 raise ValueError("btwm operator expects [min, max]")
-            subqueries.append(
-                yf.EquityQuery(op, [cond.field, cond.value[0], cond.value[1]])
-            )
+            low, high = (_number(op, v) for v in cond.value)
+            # yfinance spells it "btwn"
+            subqueries.append(query_cls("btwn", [cond.field, low, high]))
+        elif op in _RANGE_OPERATORS:
+            subqueries.append(query_cls(op, [cond.field, _number(op, cond.value)]))
         else:
-            subqueries.append(yf.EquityQuery(op, [cond.field, cond.value]))
+            subqueries.append(query_cls(op, [cond.field, cond.value]))
 
     if len(subqueries) == 1:
-        return subqueries[0]
+        return plan_query(subqueries[0])
 
     if logical_operator.lower() not in ("and", "or"):
         raise ValueError("logical_operator must be 'and' or 'or'")
 
-    return yf.EquityQuery(logical_operator.lower(), subqueries)
+    return plan_query(query_cls(logical_operator.lower(), subqueries))
+
+
+def build_equity_query(conditions, logical_operator):
+    """EquityQuery for the conditions, planned; None if nothing can match."""
+    return _build_query(yf.EquityQuery, conditions, logical_operator)
 
 
 def build_fund_query(conditions, logical_operator):
-    subqueries = []
+    """FundQuery for the conditions, planned; None if nothing can match."""
+    return _build_query(yf.FundQuery, conditions, logical_operator)
 
-    for cond in conditions:
-        op = cond.operator.lower()
 
-        if op == "is-in":
-            if not isinstance(cond.value, list):
-                raise ValueError("is-in operator expects a list value")
-            isin_queries = [yf.FundQuery(op, [cond.field, v]) for v in cond.value]
-            if len(isin_queries) == 1:
-                subqueries.append(isin_queries[0])
-            else:
-                subqueries.append(yf.FundQuery("or", isin_queries))
-        elif op == "btwm":
-            if not isinstance(cond.value, list) or len(cond.value) != 2:
-                raise ValueError("btwm operator expects [min, max]")
-            subqueries.append(
-                yf.FundQuery(op, [cond.field, cond.value[0], cond.value[1]])
+# ---------------------------------------------------------------------------------------------------------------------
+# Query planning
+# ---------------------------------------------------------------------------------------------------------------------
+
+# Range operators -> (bounds the low end, inclusive)
+_RANGE_OPERATORS = {
+    "gt": (True, False),
+    "gte": (True, True),
+    "lt": (False, False),
+    "lte": (False, True),
+}
+
+
+@dataclass(frozen=True)
+class _Range:
+    """Interval of a numeric field; the ends are open unless marked closed."""
+
+    low: float = -math.inf
+    low_closed: bool = False
+    high: float = math.inf
+    high_closed: bool = False
+
+    @property
+    def empty(self) -> bool:
+        return self.low > self.high or (
+            self.low == self.high and not (self.low_closed and self.high_closed)
+        )
+
+    @property
+    def unbounded(self) -> bool:
+        return self.low == -math.inf and self.high == math.inf
+
+    def __contains__(self, value) -> bool:
+        above = value > self.low or (self.low_closed and value == self.low)
+        below = value < self.high or (self.high_closed and value == self.high)
+        return above and below
+
+    def intersect(self, other: "_Range") -> "_Range":
+        low, low_closed = max(
+            (self.low, not self.low_closed), (other.low, not other.low_closed)
+        )
+        high, high_closed = min(
+            (self.high, self.high_closed), (other.high, other.high_closed)
+        )
+        return _Range(low, not low_closed, high, high_closed)
+
+    def union(self, other: "_Range") -> Optional["_Range"]:
+        """The union if it is one interval, else None."""
+        first, second = sorted((self, other), key=lambda r: (r.low, not r.low_closed))
+        if second.low > first.high or (
+            second.low == first.high and not (first.high_closed or second.low_closed)
+        ):
+            return None
+        high, high_closed = max(
+            (first.high, first.high_closed), (second.high, second.high_closed)
+        )
+        return _Range(first.low, first.low_closed, high, high_closed)
+
+
+# Planner nodes: ("and" | "or", [nodes]), ("in", field, frozenset of values)
+# or ("range", field, _Range)
+
+
+def _parse(query):
+    op = query.operator.lower()
+    operands = query.operands
+    if op in ("and", "or"):
+        return (op, [_parse(operand) for operand in operands])
+
+    field = operands[0]
+    if op == "is-in":
+        return ("in", field, frozenset(operands[1:]))
+    if op == "eq":
+        value = operands[1]
+        if isinstance(value, numbers.Real) and not isinstance(value, bool):
+            return ("range", field, _Range(value, True, value, True))
+        return ("in", field, frozenset([value]))
+    if op == "btwn":
+        return ("range", field, _Range(operands[1], True, operands[2], True))
+    if op in _RANGE_OPERATORS:
+        is_low, closed = _RANGE_OPERATORS[op]
+        value = operands[1]
+        if is_low:
+            return ("range", field, _Range(low=value, low_closed=closed))
+        return ("range", field, _Range(high=value, high_closed=closed))
+    raise ValueError(f"Cannot plan operator '{op}'")
+
+
+def _numeric(values) -> bool:
+    return all(isinstance(v, numbers.Real) and not isinstance(v, bool) for v in values)
+
+
+def _merge_and(children):
+    """Intersect the conditions on each field; None if any field is left empty."""
+    ranges, sets, rest = {}, {}, []
+    for child in children:
+        if child[0] == "range":
+            field = child[1]
+            ranges[field] = (
+                ranges[field].intersect(child[2]) if field in ranges else child[2]
             )
+        elif child[0] == "in":
+            field = child[1]
+            sets[field] = sets[field] & child[2] if field in sets else child[2]
         else:
-            subqueries.append(yf.FundQuery(op, [cond.field, cond.value]))
+            rest.append(child)
 
-    if len(subqueries) == 1:
-        return subqueries[0]
+    merged = []
+    for field, values in sets.items():
+        if field in ranges and _numeric(values):
+            interval = ranges.pop(field)
+            values = frozenset(v for v in values if v in interval)
+        if not values:
+            return None
+        merged.append(("in", field, values))
+    for field, interval in ranges.items():
+        if interval.empty:
+            return None
+        merged.append(("range", field, interval))
+    return merged + rest
+
+
+def _merge_or(children):
+    """Union is-in values per field and overlapping ranges into one interval."""
+    ranges, sets, rest = {}, {}, []
+    for child in children:
+        if child[0] == "range":
+            ranges.setdefault(child[1], []).append(child[2])
+        elif child[0] == "in":
+            sets[child[1]] = sets.get(child[1], frozenset()) | child[2]
+        else:
+            rest.append(child)
+
+    merged = [("in", field, values) for field, values in sets.items()]
+    for field, intervals in ranges.items():
+        intervals.sort(key=lambda r: (r.low, not r.low_closed))
+        current = intervals[0]
+        for interval in intervals[1:]:
+            union = current.union(interval)
+            # "x > 5 or x < 10" is "x is not null", which Yahoo cannot express
+            if union is None or union.unbounded:
+                merged.append(("range", field, current))
+                current = interval
+            else:
+                current = union
+        merged.append(("range", field, current))
+    return merged + rest
+
+
+def _node_key(node):
+    if node[0] in ("and", "or"):
+        return dumps([node[0], [_node_key(child) for child in node[1]]])
+    if node[0] == "in":
+        return dumps([node[1], "in", _sorted_values(node[2])])
+    interval = node[2]
+    return dumps(
+        [
+            node[1],
+            "range",
+            [interval.low, interval.low_closed, interval.high, interval.high_closed],
+        ]
+    )
+
+
+def _sorted_values(values):
+    return sorted(values, key=lambda v: (isinstance(v, str), v))
+
+
+def _simplify(node):
+    """Simplified node, or None if it matches nothing."""
+    kind = node[0]
+    if kind == "in":
+        return node if node[2] else None
+    if kind == "range":
+        return None if node[2].empty else node
+
+    children = []
+    for child in node[1]:
+        child = _simplify(child)
+        if child is None:
+            if kind == "and":
+                return None
+            continue
+        if child[0] == kind:
+            children.extend(child[1])
+        else:
+            children.append(child)
+
+    children = _merge_and(children) if kind == "and" else _merge_or(children)
+    if not children:
+        return None
+    if len(children) == 1:
+        return children[0]
+    return (kind, sorted(children, key=_node_key))
+
+
+def _plain(value):
+    return int(value) if isinstance(value, float) and value.is_integer() else value
+
+
+def _emit(query_cls, node):
+    kind = node[0]
+    if kind in ("and", "or"):
+        operands = []
+        for child in node[1]:
+            query = _emit(query_cls, child)
+            # A two-sided open range comes back as an AND of its ends
+            if kind == "and" and child[0] == "range" and query.operator == "AND":
+                operands.extend(query.operands)
+            # is-in is sent as an OR of eq, which can join this OR directly
+            elif kind == "or" and query.operator == "IS-IN":
+                operands.extend(
+                    query_cls("eq", [child[1], v]) for v in query.operands[1:]
+                )
+            else:
+                operands.append(query)
+        return query_cls(kind, operands)
+
+    field = node[1]
+    if kind == "in":
+        values = _sorted_values(node[2])
+        if len(values) == 1:
+            return query_cls("eq", [field, values[0]])
+        return query_cls("is-in", [field, *values])
+
+    interval = node[2]
+    low, high = _plain(interval.low), _plain(interval.high)
+    if low == high:
+        return query_cls("eq", [field, low])
+    if interval.low_closed and interval.high_closed:
+        return query_cls("btwn", [field, low, high])
+    ends = []
+    if low != -math.inf:
+        ends.append(query_cls("gte" if interval.low_closed else "gt", [field, low]))
+    if high != math.inf:
+        ends.append(query_cls("lte" if interval.high_closed else "lt", [field, high]))
+    return ends[0] if len(ends) == 1 else query_cls("and", ends)
+
+
+def plan_query(query):
+    """
+    Simplify an EquityQuery/FundQuery tree before it is sent:
+
+    - nested AND/OR are flattened and single-operand groups unwrapped;
+    - under AND, the range conditions on a field are intersected into one
+      interval and is-in/eq values intersected;
+    - under OR, is-in/eq values on a field are collapsed into one is-in and
+      overlapping ranges merged;
+    - operands are put in a canonical order, so equivalent screens produce
+      the same query.
+
+    Returns None when the query can match nothing (e.g. price > 10 and
+    price < 5), so the caller can answer without asking Yahoo.
+    """
+    node = _simplify(_parse(query))
+    return None if node is None else _emit(type(query), node)
+
+
+def _canonical_value(op, value):
+    if op == "is-in":
+        if not isinstance(value, list):
+            raise ValueError("is-in operator expects a list value")
+        return sorted(set(value))
+    if isinstance(value, list):
+        return [_canonical_value(None, v) for v in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def canonical_conditions(conditions, logical_operator):
+    """
+    Normalise a screen so logically identical ones compare equal: operators
+    lower-cased, is-in values deduplicated and sorted, whole numbers as ints,
+    duplicate conditions dropped and the rest sorted.
+
+    Returns ``(conditions, logical_operator)``, ready for build_*_query.
+    """
+    logical_operator = logical_operator.lower()
+    canonical = {}
+    for cond in conditions:
+        op = cond.operator.lower()
+        cond = ScreenerCondition(
+            field=cond.field.strip(),
+            operator=op,
+            value=_canonical_value(op, cond.value),
+        )
+        canonical[dumps(cond.model_dump())] = cond
+    conditions = [canonical[key] for key in sorted(canonical)]
+
+    if len(conditions) == 1:
+        # A lone condition is sent as-is whatever the operator
+        logical_operator = "and"
+    return conditions, logical_operator
 
-    if logical_operator.lower() not in ("and", "or"):
-        raise ValueError("logical_operator must be 'and' or 'or'")
 
-    return yf.FundQuery(logical_operator.lower(), subqueries)
+def screener_fingerprint(query):
+    """Stable hash of a planned query (see plan_query), as sent upstream."""
+    return hashlib.sha256(dumps(query.to_dict())).hexdigest()
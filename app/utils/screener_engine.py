@@ -0,0 +1,221 @@
+"""
+Equity screens evaluated locally over a columnar snapshot of the universe.
+
+Rows are Yahoo screener quotes. Numeric fields live in float64 arrays (NaN
+where Yahoo has no value, which matches no condition, as upstream) and
+categorical fields in int32 code arrays, so a screen is a handful of
+vectorised comparisons combined into one boolean mask. Rows are stored in
+ticker order, so a stable sort on any field breaks ties by ticker.
+
+Only fields whose quote value is the one Yahoo screens on are held. Screens
+on anything else, or on intraday fields once the snapshot is older than the
+caller allows, raise UnsupportedScreen and the caller asks Yahoo instead.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+# EquityQuery field -> Yahoo quote key holding the same measure. Near misses
+# are left out on purpose: dividendYield is trailing (forward_dividend_yield
+# is not), fiftyTwoWeekHigh/Low are intraday extremes (the screener's are last
+# closes) and bookValue is per the latest quarter, not the last twelve months.
+NUMERIC_FIELDS = {
+    "intradayprice": "regularMarketPrice",
+    "intradaypricechange": "regularMarketChange",
+    "percentchange": "regularMarketChangePercent",
+    "intradaymarketcap": "marketCap",
+    "fiftytwowkpercentchange": "fiftyTwoWeekChangePercent",
+    "dayvolume": "regularMarketVolume",
+    "avgdailyvol3m": "averageDailyVolume3Month",
+    "peratio.lasttwelvemonths": "trailingPE",
+    "pricebookratio.quarterly": "priceToBook",
+    "forward_dividend_per_share": "dividendRate",
+    "totalsharesoutstanding": "sharesOutstanding",
+}
+
+# Fields that move with every trade
+INTRADAY_FIELDS = {
+    "intradayprice",
+    "intradaypricechange",
+    "percentchange",
+    "intradaymarketcap",
+    "fiftytwowkpercentchange",
+    "dayvolume",
+}
+
+# Matched case-insensitively, like Yahoo does
+CATEGORY_FIELDS = {
+    "region": "region",
+    "sector": "sector",
+    "exchange": "exchange",
+}
+
+# Sort fields that mean "by symbol"
+_TICKER_SORT = {None, "ticker", "symbol"}
+
+
+class UnsupportedScreen(Exception):
+    """The snapshot cannot answer this screen the way Yahoo would."""
+
+
+def _number(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    return float(value)
+
+
+def _category(value: Any) -> Optional[str]:
+    return value.strip().lower() if isinstance(value, str) and value else None
+
+
+@dataclass
+class EquityUniverse:
+    """
+    Columnar snapshot of every equity in ``regions``. Build with
+    ``from_rows``; screens over it never touch the rows until the page of
+    results is picked.
+    """
+
+    rows: list[dict]
+    numeric: dict[str, np.ndarray]
+    codes: dict[str, np.ndarray]
+    vocab: dict[str, dict[str, int]]
+    regions: frozenset[str]
+    built_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[dict], regions: Iterable[str]
+    ) -> "EquityUniverse":
+        unique = {row["symbol"]: row for row in rows if row.get("symbol")}
+        rows = [unique[symbol] for symbol in sorted(unique)]
+
+        numeric = {
+            name: np.fromiter((_number(row.get(key)) for row in rows), "f8", len(rows))
+            for name, key in NUMERIC_FIELDS.items()
+        }
+        codes, vocab = {}, {}
+        for name, key in CATEGORY_FIELDS.items():
+            values = [_category(row.get(key)) for row in rows]
+            vocab[name] = {
+                value: code
+                for code, value in enumerate(sorted({v for v in values if v}))
+            }
+            codes[name] = np.fromiter(
+                (vocab[name].get(v, -1) for v in values), "i4", len(rows)
+            )
+
+        return cls(
+            rows=rows,
+            numeric=numeric,
+            codes=codes,
+            vocab=vocab,
+            regions=frozenset(region.lower() for region in regions),
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.built_at
+
+    def _covers(self, conditions, logical_operator: str) -> None:
+        """
+        Rows exist only for the loaded regions, so a screen must be limited to
+        them by a top-level region condition to be answered in full.
+        """
+        if logical_operator == "or" and len(conditions) > 1:
+            raise UnsupportedScreen("'or' screens may reach unloaded regions")
+        for cond in conditions:
+            if cond.field == "region" and cond.operator in ("eq", "is-in"):
+                values = cond.value if isinstance(cond.value, list) else [cond.value]
+                if {_category(v) for v in values} <= self.regions:
+                    return
+        raise UnsupportedScreen("screen is not limited to the loaded regions")
+
+    def _condition_mask(self, cond) -> np.ndarray:
+        op, value = cond.operator, cond.value
+
+        if cond.field in CATEGORY_FIELDS:
+            if op not in ("eq", "is-in"):
+                raise UnsupportedScreen(f"'{op}' on '{cond.field}'")
+            values = value if isinstance(value, list) else [value]
+            vocab = self.vocab[cond.field]
+            wanted = [vocab[v] for v in map(_category, values) if v in vocab]
+            return np.isin(self.codes[cond.field], wanted)
+
+        column = self.numeric.get(cond.field)
+        if column is None:
+            raise UnsupportedScreen(f"field '{cond.field}'")
+        try:
+            if op == "btwm":
+                low, high = (float(v) for v in value)
+                return (column >= low) & (column <= high)
+            if op == "is-in":
+                return np.isin(column, [float(v) for v in value])
+            value = float(value)
+        except (TypeError, ValueError):
+            raise UnsupportedScreen(f"value {value!r} for '{cond.field}'")
+
+        if op == "eq":
+            return column == value
+        if op == "gt":
+            return column > value
+        if op == "gte":
+            return column >= value
+        if op == "lt":
+            return column < value
+        if op == "lte":
+            return column <= value
+        raise UnsupportedScreen(f"operator '{op}'")
+
+    def mask(self, conditions, logical_operator: str) -> np.ndarray:
+        """Rows matching the (canonical) conditions."""
+        self._covers(conditions, logical_operator)
+        combine = np.logical_or if logical_operator == "or" else np.logical_and
+        result = None
+        for cond in conditions:
+            matched = self._condition_mask(cond)
+            result = matched if result is None else combine(result, matched)
+        return result if result is not None else np.ones(len(self.rows), bool)
+
+    def screen(
+        self,
+        conditions,
+        logical_operator: str,
+        *,
+        sort_field: Optional[str] = None,
+        sort_asc: bool = True,
+        offset: int = 0,
+        limit: int = 25,
+        intraday_max_age: float = float("inf"),
+    ) -> dict:
+        """
+        Run a screen and return one page of it, shaped like a yf.screen result
+        (``quotes``, ``count`` on the page and ``total`` matches).
+
+        Screens filtering or sorting on INTRADAY_FIELDS are refused once the
+        snapshot is older than ``intraday_max_age`` seconds.
+        """
+        if sort_field not in _TICKER_SORT and sort_field not in self.numeric:
+            raise UnsupportedScreen(f"sort field '{sort_field}'")
+        used = {cond.field for cond in conditions} | {sort_field}
+        if used & INTRADAY_FIELDS and self.age > intraday_max_age:
+            raise UnsupportedScreen("intraday fields are out of date")
+
+        matched = np.flatnonzero(self.mask(conditions, logical_operator))
+        if sort_field in self.numeric:
+            values = self.numeric[sort_field][matched]
+            # NaN sorts last either way
+            order = np.argsort(values if sort_asc else -values, kind="stable")
+            matched = matched[order]
+        elif not sort_asc:
+            matched = matched[::-1]
+
+        page = matched[offset : offset + limit]
+        quotes = [self.rows[i] for i in page]
+        return {"quotes": quotes, "count": len(quotes), "total": len(matched)}
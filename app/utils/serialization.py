@@ -0,0 +1,184 @@
+from datetime import date, datetime, time, tzinfo
+from decimal import Decimal
+from typing import Any, Union
+
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def iso_timestamps(index: Union[pd.DatetimeIndex, pd.Series]) -> np.ndarray:
+    """
+    ISO 8601 strings for a whole datetime index/column at once, matching
+    ``datetime.isoformat()`` (UTC offset when tz-aware). NaT becomes None.
+    """
+    index = pd.DatetimeIndex(index)
+    missing = index.isna()
+    local = index.tz_localize(None) if index.tz is not None else index
+    values = local.values
+    unit = "s" if (local[~missing].microsecond == 0).all() else "us"
+    text = np.datetime_as_string(values, unit=unit)
+    if index.tz is not None:
+        offsets = (values - index.tz_convert(None).values) // np.timedelta64(1, "m")
+        offsets = np.where(missing, 0, offsets)
+        # Only a handful of distinct offsets (DST), so format each one once
+        unique, inverse = np.unique(offsets, return_inverse=True)
+        suffixes = np.array(
+            [
+                f"{'-' if m < 0 else '+'}{abs(m) // 60:02d}:{abs(m) % 60:02d}"
+                for m in unique
+            ]
+        )
+        text = np.char.add(text, suffixes[inverse])
+    if missing.any():
+        text = np.where(missing, None, text)
+    return text
+
+
+def _key(label: Any) -> Any:
+    """Dict key as jsonable_encoder would render it."""
+    if isinstance(label, (datetime, date)):
+        return label.isoformat()
+    if isinstance(label, np.generic):
+        return label.item()
+    if isinstance(label, tuple):
+        return str(label)
+    return label
+
+
+def column_values(column: pd.Series, fill_nan: Any = None) -> list:
+    """Convert one column to a plain list in a single vectorised step."""
+    dtype = column.dtype
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        values = iso_timestamps(column)
+        if fill_nan is not None and column.isna().any():
+            values = np.where(column.isna(), fill_nan, values)
+        return values.tolist()
+    if pd.api.types.is_bool_dtype(dtype) and not pd.api.types.is_object_dtype(dtype):
+        if not column.isna().any():
+            return column.to_numpy(dtype=bool).tolist()
+    elif pd.api.types.is_integer_dtype(dtype) and not column.isna().any():
+        return column.to_numpy(dtype=np.int64).tolist()
+    elif pd.api.types.is_float_dtype(dtype):
+        values = column.to_numpy(dtype="f8", na_value=np.nan)
+        nan = np.isnan(values)
+        if not nan.any():
+            return values.tolist()
+        return np.where(nan, fill_nan, values.astype(object)).tolist()
+    values = column.to_numpy(dtype=object)
+    missing = pd.isna(values)
+    if missing.any():
+        values = np.where(missing, fill_nan, values)
+    return values.tolist()
+
+
+def frame_to_records(
+    frame: Union[pd.DataFrame, pd.Series],
+    *,
+    fill_nan: Any = None,
+    index: bool = True,
+) -> list[dict]:
+    """
+    Replacement for ``frame.fillna(x).reset_index().to_dict(orient="records")``.
+    Columns are converted once each instead of value by value.
+    """
+    if isinstance(frame, pd.Series):
+        frame = frame.to_frame()
+    if index:
+        frame = frame.reset_index()
+    keys = [_key(label) for label in frame.columns]
+    columns = [column_values(frame.iloc[:, i], fill_nan) for i in range(len(keys))]
+    return [dict(zip(keys, row)) for row in zip(*columns)]
+
+
+def frame_to_dict(frame: Union[pd.DataFrame, pd.Series]) -> dict:
+    """
+    ``{column: {index: value}}`` (``{index: value}`` for a Series), the shape
+    FastAPI produced when a DataFrame was returned directly.
+    """
+    index = (
+        iso_timestamps(frame.index).tolist()
+        if isinstance(frame.index, pd.DatetimeIndex)
+        else [_key(label) for label in frame.index]
+    )
+    if isinstance(frame, pd.Series):
+        return dict(zip(index, column_values(frame)))
+    return {
+        _key(label): dict(zip(index, column_values(frame.iloc[:, i])))
+        for i, label in enumerate(frame.columns)
+    }
+
+
+def _default(obj: Any) -> Any:
+    """Types orjson does not encode natively."""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return frame_to_dict(obj)
+    if isinstance(obj, pd.Timestamp):
+        return None if pd.isna(obj) else obj.isoformat()
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json", by_alias=True)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, tzinfo):
+        return str(obj)
+    if hasattr(obj, "__dict__"):
+        return vars(obj)
+    return str(obj)
+
+
+def _normalize_keys(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {
+            k if isinstance(k, str) else str(_key(k)): _normalize_keys(v)
+            for k, v in obj.items()
+        }
+    if isinstance(obj, (list, tuple)):
+        return [_normalize_keys(v) for v in obj]
+    return obj
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Encode ``obj`` to JSON bytes in one pass. Handles DataFrames, Series,
+    Timestamps, numpy scalars/arrays, tzinfo and arbitrary objects; NaN becomes
+    null.
+    """
+    try:
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+    except TypeError:
+        # Dict keys orjson rejects (e.g. pd.Timestamp): stringify and retry
+        return orjson.dumps(
+            _normalize_keys(obj), default=_default, option=ORJSON_OPTIONS
+        )
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response encoded by :func:`dumps`. Routes return it directly so
+    FastAPI skips jsonable_encoder on large payloads.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(Response):
+    """Response for a body that is already JSON bytes (e.g. a cached snapshot)."""
+
+    media_type = "application/json"
@@ -1,5 +1,10 @@
 from typing import Optional
 
+import numpy as np
+import pandas as pd
+
+from app.utils.serialization import iso_timestamps
+
 
 def get_regular_market_change(
     last_price: float,
@@ -18,3 +23,132 @@ def get_regular_market_change(
     percent = (change / prev_close * 100) if prev_close != 0 else 0
 
     return change, percent
+
+
+# yfinance history column -> response field
+HISTORY_FIELDS = {
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Volume": "volume",
+    "Dividends": "dividends",
+    "Stock Splits": "stock_splits",
+}
+
+
+def _float_list(values: np.ndarray) -> list:
+    nan = np.isnan(values)
+    if nan.any():
+        return np.where(nan, None, values).tolist()
+    return values.tolist()
+
+
+def history_to_columns(history: pd.DataFrame) -> dict[str, list]:
+    """
+    Serialize a yfinance history DataFrame column-wise, e.g.
+    ``{"timestamp": [...], "open": [...], ...}``. Each column is renamed and
+    cast once and converted straight from its NumPy array.
+    """
+    if not history.index.is_monotonic_increasing:
+        history = history.sort_index()
+    columns: dict[str, list] = {
+        "timestamp": iso_timestamps(pd.DatetimeIndex(history.index)).tolist()
+    }
+    for column, field in HISTORY_FIELDS.items():
+        if column in history:
+            values = history[column].to_numpy(dtype="f8", na_value=np.nan)
+        else:
+            values = np.zeros(len(history))
+        if field == "volume":
+            columns[field] = np.nan_to_num(values).astype(np.int64).tolist()
+        else:
+            columns[field] = _float_list(values)
+    return columns
+
+
+def history_to_records(history: pd.DataFrame) -> list[dict]:
+    """Serialize a yfinance history DataFrame as one dict per bar."""
+    columns = history_to_columns(history)
+    fields = list(columns)
+    return [dict(zip(fields, row)) for row in zip(*columns.values())]
+
+
+def _bucket_starts(n: int, buckets: int) -> np.ndarray:
+    """Start offsets of ``buckets`` near-equal, contiguous slices of ``n`` rows."""
+    return (np.arange(buckets) * n) // buckets
+
+
+def downsample_ohlc(history: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """
+    Aggregate consecutive bars into ``max_points`` buckets, keeping candle
+    semantics: first open, max high, min low, last close, summed volume. Each
+    bucket is stamped with its first bar's timestamp.
+    """
+    n = len(history)
+    if n <= max_points:
+        return history
+    starts = _bucket_starts(n, max_points)
+    ends = np.append(starts[1:], n) - 1
+
+    def column(name: str) -> np.ndarray:
+        if name in history:
+            return history[name].to_numpy(dtype="f8", na_value=np.nan)
+        return np.zeros(n)
+
+    data = {
+        "Open": column("Open")[starts],
+        "High": np.fmax.reduceat(column("High"), starts),
+        "Low": np.fmin.reduceat(column("Low"), starts),
+        "Close": column("Close")[ends],
+        "Volume": np.add.reduceat(np.nan_to_num(column("Volume")), starts),
+        "Dividends": np.add.reduceat(np.nan_to_num(column("Dividends")), starts),
+        "Stock Splits": np.fmax.reduceat(column("Stock Splits"), starts),
+    }
+    return pd.DataFrame(data, index=history.index[starts])
+
+
+def downsample_lttb(history: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """
+    Largest-Triangle-Three-Buckets on the close price: keeps the bars that best
+    preserve the visual shape of the line and returns them unmodified.
+    """
+    n = len(history)
+    if n <= max_points or max_points < 3:
+        return history
+    x = pd.DatetimeIndex(history.index).asi8.astype("f8")
+    y = history["Close"].to_numpy(dtype="f8", na_value=np.nan)
+    y = pd.Series(y).ffill().bfill().to_numpy()
+
+    # First and last bars are always kept; the rest is split into buckets
+    edges = 1 + _bucket_starts(n - 2, max_points - 2)
+    edges = np.append(edges, n - 1)
+    # Means of each bucket serve as the third triangle vertex for the previous one
+    sums_x = np.add.reduceat(x[1 : n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1 : n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_x = np.append(sums_x / counts, x[-1])
+    mean_y = np.append(sums_y / counts, y[-1])
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[anchor], y[anchor]
+        areas = np.abs(
+            (ax - mean_x[i + 1]) * (y[lo:hi] - ay)
+            - (ax - x[lo:hi]) * (mean_y[i + 1] - ay)
+        )
+        anchor = lo + int(np.argmax(areas))
+        selected[i + 1] = anchor
+    return history.iloc[selected]
+
+
+def downsample_history(
+    history: pd.DataFrame, max_points: int, method: str = "ohlc"
+) -> pd.DataFrame:
+    """Bound a history DataFrame to ``max_points`` bars for charting."""
+    if method == "lttb":
+        return downsample_lttb(history, max_points)
+    return downsample_ohlc(history, max_points)
@@ -0,0 +1,78 @@
+"""
+Recent demand per symbol, as an exponentially decaying request count.
+
+User-facing services call ``record_access(symbol)``; the prefetch scheduler
+reads ``symbol_access.scores()``. Work done by the scheduler itself runs under
+``background()`` so it does not count as demand and keep symbols hot forever.
+"""
+
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+_recording: ContextVar[bool] = ContextVar("symbol_access_recording", default=True)
+
+
+class AccessTracker:
+    """
+    Each access adds 1 to the symbol's score; scores halve every ``half_life``
+    seconds. Scores are stored relative to a fixed origin so an access is O(1)
+    and nothing needs to be decayed in the background.
+    """
+
+    def __init__(self, *, half_life: float, max_symbols: int):
+        self.half_life = half_life
+        self.max_symbols = max_symbols
+        self._origin = time.monotonic()
+        self._scores: dict[str, float] = {}
+
+    def _growth(self, now: float) -> float:
+        return math.exp((now - self._origin) * math.log(2) / self.half_life)
+
+    def record(self, symbol: str) -> None:
+        now = time.monotonic()
+        growth = self._growth(now)
+        if growth > 1e100:
+            self._rebase(now)
+            growth = 1.0
+        self._scores[symbol] = self._scores.get(symbol, 0.0) + growth
+        if len(self._scores) > self.max_symbols:
+            self._prune(len(self._scores) - self.max_symbols // 2)
+
+    def scores(self) -> dict[str, float]:
+        growth = self._growth(time.monotonic())
+        return {symbol: value / growth for symbol, value in self._scores.items()}
+
+    def _rebase(self, now: float) -> None:
+        growth = self._growth(now)
+        self._scores = {s: v / growth for s, v in self._scores.items()}
+        self._origin = now
+
+    def _prune(self, count: int) -> None:
+        """Drop the ``count`` coldest symbols."""
+        coldest = sorted(self._scores, key=self._scores.__getitem__)[:count]
+        for symbol in coldest:
+            del self._scores[symbol]
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+symbol_access = AccessTracker(half_life=3600.0, max_symbols=10_000)
+
+
+def record_access(symbol: str) -> None:
+    if _recording.get():
+        symbol_access.record(symbol)
+
+
+@contextmanager
+def background() -> Iterator[None]:
+    """Do not count accesses made inside this block (and tasks it starts)."""
+    token = _recording.set(False)
+    try:
+        yield
+    finally:
+        _recording.reset(token)
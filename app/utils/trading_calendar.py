@@ -0,0 +1,1370 @@
+"""
+Local trading-session calendar for the markets in ``MARKETS`` and the Yahoo
+exchange codes in ``EXCHANGES``.
+
+Every exchange has a timezone, regular hours (with an optional midday break),
+optional pre/post-market sessions, weekend days, and rule-based holidays and
+early closes. Holidays that follow lunar or religious calendars announced year
+by year (Lunar New Year, Diwali, Eid, Hebrew holidays...) are not modelled.
+Exchanges that close for them are flagged ``unmodelled_holidays``: cache TTLs
+treat them as trading on those days, which errs towards short TTLs, never
+towards holding prices as if the market were closed while it moves, and
+``market_status`` reports their sessions as "unknown" rather than "open".
+"""
+
+import re
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Callable, Hashable, Iterable, Optional
+from zoneinfo import ZoneInfo
+
+HolidayRule = Callable[[int, dict[date, str]], None]
+EarlyCloseRule = Callable[[int, dict[date, str]], dict[date, time]]
+
+MON, TUE, WED, THU, FRI, SAT, SUN = range(7)
+
+# Order used to summarise several exchanges: the most "open" phase wins
+PHASES = ("regular", "break", "pre", "post", "closed")
+
+# How far to look for the next (or previous) session
+_SEARCH_DAYS = 30
+
+
+def _easter(year: int) -> date:
+    """Western Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    weekday = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * weekday) // 451
+    month, day = divmod(h + weekday - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _orthodox_easter(year: int) -> date:
+    """Orthodox Easter Sunday (Meeus' Julian algorithm, as a Gregorian date)."""
+    d = (19 * (year % 19) + 15) % 30
+    e = (2 * (year % 4) + 4 * (year % 7) - d + 34) % 7
+    month, day = divmod(d + e + 114, 31)
+    return date(year, month, day + 1) + timedelta(days=13)
+
+
+def _next_free_weekday(day: date, taken: dict[date, str]) -> date:
+    while day.weekday() >= SAT or day in taken:
+        day += timedelta(days=1)
+    return day
+
+
+# Observance rules: where a holiday falling on a weekend is observed instead
+
+
+def _nearest_weekday(day: date, taken: dict[date, str]) -> date:
+    """Saturday -> Friday, Sunday -> Monday (US)."""
+    if day.weekday() == SAT:
+        return day - timedelta(days=1)
+    if day.weekday() == SUN:
+        return day + timedelta(days=1)
+    return day
+
+
+def _sunday_to_monday(day: date, taken: dict[date, str]) -> date:
+    return day + timedelta(days=1) if day.weekday() == SUN else day
+
+
+def _substitute_weekday(day: date, taken: dict[date, str]) -> date:
+    """Weekend holidays move to the next weekday that is not a holiday (UK, AU)."""
+    return _next_free_weekday(day, taken)
+
+
+def _substitute_sunday(day: date, taken: dict[date, str]) -> date:
+    """Only Sunday holidays move, to the next free weekday (Japan)."""
+    return _next_free_weekday(day, taken) if day.weekday() == SUN else day
+
+
+Observance = Callable[[date, dict[date, str]], date]
+
+
+def _fixed(
+    month: int,
+    day: int,
+    name: str,
+    observe: Optional[Observance] = None,
+    since: Optional[int] = None,
+) -> HolidayRule:
+    def rule(year: int, taken: dict[date, str]) -> None:
+        if since is not None and year < since:
+            return
+        holiday = date(year, month, day)
+        taken[observe(holiday, taken) if observe else holiday] = name
+
+    return rule
+
+
+def _nth_weekday(month: int, weekday: int, n: int, name: str) -> HolidayRule:
+    """The ``n``-th ``weekday`` of ``month``; ``n=-1`` is the last one."""
+
+    def rule(year: int, taken: dict[date, str]) -> None:
+        if n > 0:
+            first = date(year, month, 1)
+            offset = (weekday - first.weekday()) % 7 + 7 * (n - 1)
+            taken[first + timedelta(days=offset)] = name
+        else:
+            last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+            taken[last - timedelta(days=(last.weekday() - weekday) % 7)] = name
+
+    return rule
+
+
+def _weekday_on_or_before(month: int, day: int, weekday: int, name: str) -> HolidayRule:
+    def rule(year: int, taken: dict[date, str]) -> None:
+        anchor = date(year, month, day)
+        taken[anchor - timedelta(days=(anchor.weekday() - weekday) % 7)] = name
+
+    return rule
+
+
+def _easter_offset(days: int, name: str, orthodox: bool = False) -> HolidayRule:
+    def rule(year: int, taken: dict[date, str]) -> None:
+        easter = _orthodox_easter(year) if orthodox else _easter(year)
+        taken[easter + timedelta(days=days)] = name
+
+    return rule
+
+
+def _japanese_equinox(month: int, name: str) -> HolidayRule:
+    """Vernal (March) or autumnal (September) equinox day, valid 1980-2099."""
+    base = 20.8431 if month == 3 else 23.2488
+
+    def rule(year: int, taken: dict[date, str]) -> None:
+        day = int(base + 0.242194 * (year - 1980) - (year - 1980) // 4)
+        holiday = date(year, month, day)
+        taken[_substitute_sunday(holiday, taken)] = name
+
+    return rule
+
+
+def _early_close(month: int, day: int, at: time) -> EarlyCloseRule:
+    """Close at ``at`` on this date when it is a trading day."""
+
+    def rule(year: int, holidays: dict[date, str]) -> dict[date, time]:
+        early = date(year, month, day)
+        return {early: at} if early not in holidays else {}
+
+    return rule
+
+
+def _early_close_after(holiday: str, at: time) -> EarlyCloseRule:
+    """Close at ``at`` on the day after ``holiday`` (e.g. Black Friday)."""
+
+    def rule(year: int, holidays: dict[date, str]) -> dict[date, time]:
+        return {
+            day + timedelta(days=1): at
+            for day, name in holidays.items()
+            if name == holiday and day.year == year
+        }
+
+    return rule
+
+
+@lru_cache(maxsize=1024)
+def _holidays(rules: tuple[HolidayRule, ...], year: int) -> dict[date, str]:
+    taken: dict[date, str] = {}
+    for rule in rules:
+        rule(year, taken)
+    return taken
+
+
+@lru_cache(maxsize=1024)
+def _early_closes(
+    rules: tuple[EarlyCloseRule, ...], holidays: tuple[HolidayRule, ...], year: int
+) -> dict[date, time]:
+    closes: dict[date, time] = {}
+    for rule in rules:
+        closes.update(rule(year, _holidays(holidays, year)))
+    return closes
+
+
+@dataclass(frozen=True)
+class Session:
+    """One trading day's sessions, as UTC datetimes."""
+
+    day: date
+    pre_open: datetime  # == open when there is no pre-market session
+    open: datetime
+    close: datetime
+    post_close: datetime  # == close when there is no post-market session
+    break_start: Optional[datetime] = None
+    break_end: Optional[datetime] = None
+    early_close: bool = False
+
+    def phase(self, now: datetime) -> Optional[str]:
+        if self.pre_open <= now < self.open:
+            return "pre"
+        if self.open <= now < self.close:
+            if self.break_start and self.break_start <= now < self.break_end:
+                return "break"
+            return "regular"
+        if self.close <= now < self.post_close:
+            return "post"
+        return None
+
+
+@dataclass(frozen=True)
+class MarketState:
+    phase: str  # one of PHASES
+    next_open: Optional[datetime]
+    next_close: Optional[datetime]
+    holiday: Optional[str] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.phase in ("regular", "break")
+
+
+@dataclass(frozen=True)
+class ExchangeCalendar:
+    """
+    Trading hours of one exchange, in its local time.
+
+    With ``overnight`` the session of trading day D opens on the evening of
+    D-1 (FX and futures, which trade from Sunday evening to Friday).
+    """
+
+    name: str
+    tz: str
+    open: time
+    close: time
+    pre_open: Optional[time] = None
+    post_close: Optional[time] = None
+    lunch: Optional[tuple[time, time]] = None
+    weekend: frozenset[int] = frozenset({SAT, SUN})
+    holidays: tuple[HolidayRule, ...] = ()
+    early_closes: tuple[EarlyCloseRule, ...] = ()
+    overnight: bool = False
+    always_open: bool = False
+    # Also closes for lunar/religious holidays, which are not modelled
+    unmodelled_holidays: bool = False
+
+    def holidays_in(self, year: int) -> dict[date, str]:
+        return _holidays(self.holidays, year)
+
+    def session(self, day: date) -> Optional[Session]:
+        """The sessions of ``day`` (local date), or None when it does not trade."""
+        return _session(self, day)
+
+    def _local_today(self, now: datetime) -> date:
+        return now.astimezone(ZoneInfo(self.tz)).date()
+
+    def current_session(self, now: datetime) -> Optional[Session]:
+        """The session whose pre-market to post-market span contains ``now``."""
+        today = self._local_today(now)
+        for offset in (-1, 0, 1):
+            session = self.session(today + timedelta(days=offset))
+            if session is not None and session.pre_open <= now < session.post_close:
+                return session
+        return None
+
+    def next_session(self, now: datetime) -> Optional[Session]:
+        """The first session starting (pre-market included) after ``now``."""
+        today = self._local_today(now)
+        for offset in range(_SEARCH_DAYS):
+            session = self.session(today + timedelta(days=offset))
+            if session is not None and session.pre_open > now:
+                return session
+        return None
+
+    def previous_session(self, now: datetime) -> Optional[Session]:
+        """The last session that ended (post-market included) before ``now``."""
+        today = self._local_today(now)
+        for offset in range(_SEARCH_DAYS):
+            session = self.session(today - timedelta(days=offset))
+            if session is not None and session.post_close <= now:
+                return session
+        return None
+
+    def state(self, now: Optional[datetime] = None) -> MarketState:
+        if self.always_open:
+            return MarketState(phase="regular", next_open=None, next_close=None)
+        now = now or datetime.now(timezone.utc)
+        today = self._local_today(now)
+        holiday = self.holidays_in(today.year).get(today)
+
+        current = self.current_session(now)
+        phase = (current.phase(now) if current else None) or "closed"
+        upcoming = self.next_session(now)
+        if phase == "pre":
+            next_open, next_close = current.open, current.close
+        elif phase == "regular":
+            next_open = upcoming.open if upcoming else None
+            next_close = current.close
+        elif phase == "break":
+            next_open, next_close = current.break_end, current.close
+        else:
+            next_open = upcoming.open if upcoming else None
+            next_close = upcoming.close if upcoming else None
+        return MarketState(phase, next_open, next_close, holiday)
+
+    def is_active(self, now: Optional[datetime] = None) -> bool:
+        """Whether prices can move now (pre, regular or post-market)."""
+        if self.always_open:
+            return True
+        now = now or datetime.now(timezone.utc)
+        current = self.current_session(now)
+        return current is not None and current.phase(now) not in (None, "break")
+
+    def cache_ttl(
+        self, active_ttl: float, max_ttl: float, now: Optional[datetime] = None
+    ) -> float:
+        """
+        TTL for data that only changes while the exchange trades: ``active_ttl``
+        during a session, otherwise until the next session (or the end of the
+        midday break) starts, capped at ``max_ttl``.
+        """
+        if self.always_open:
+            return active_ttl
+        now = now or datetime.now(timezone.utc)
+        current = self.current_session(now)
+        if current is not None:
+            if current.phase(now) != "break":
+                return active_ttl
+            resumes = current.break_end
+        else:
+            upcoming = self.next_session(now)
+            if upcoming is None:
+                return max_ttl
+            resumes = upcoming.pre_open
+        return max(active_ttl, min((resumes - now).total_seconds(), max_ttl))
+
+    def quiet_since(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """When the last session ended, if the exchange is not trading now."""
+        if self.always_open:
+            return None
+        now = now or datetime.now(timezone.utc)
+        if self.current_session(now) is not None:
+            return None
+        previous = self.previous_session(now)
+        return previous.post_close if previous else None
+
+
+@lru_cache(maxsize=4096)
+def _session(calendar: ExchangeCalendar, day: date) -> Optional[Session]:
+    if day.weekday() in calendar.weekend:
+        return None
+    if day in calendar.holidays_in(day.year):
+        return None
+    zone = ZoneInfo(calendar.tz)
+
+    def at(when: time, on: date = day) -> datetime:
+        return datetime.combine(on, when, tzinfo=zone).astimezone(timezone.utc)
+
+    early = _early_closes(calendar.early_closes, calendar.holidays, day.year).get(day)
+    open_day = day - timedelta(days=1) if calendar.overnight else day
+    open_at, close_at = at(calendar.open, open_day), at(early or calendar.close)
+    return Session(
+        day=day,
+        pre_open=at(calendar.pre_open, open_day) if calendar.pre_open else open_at,
+        open=open_at,
+        close=close_at,
+        # No extended session after an early close
+        post_close=(
+            at(calendar.post_close) if calendar.post_close and not early else close_at
+        ),
+        break_start=at(calendar.lunch[0]) if calendar.lunch else None,
+        break_end=at(calendar.lunch[1]) if calendar.lunch else None,
+        early_close=early is not None,
+    )
+
+
+def _hours(open_: str, close: str) -> dict:
+    return {"open": time.fromisoformat(open_), "close": time.fromisoformat(close)}
+
+
+def _lunch(start: str, end: str) -> tuple[time, time]:
+    return time.fromisoformat(start), time.fromisoformat(end)
+
+
+NEW_YEAR = _fixed(1, 1, "New Year's Day")
+GOOD_FRIDAY = _easter_offset(-2, "Good Friday")
+EASTER_MONDAY = _easter_offset(1, "Easter Monday")
+MAUNDY_THURSDAY = _easter_offset(-3, "Maundy Thursday")
+ASCENSION = _easter_offset(39, "Ascension Day")
+WHIT_MONDAY = _easter_offset(50, "Whit Monday")
+CORPUS_CHRISTI = _easter_offset(60, "Corpus Christi")
+LABOUR_DAY = _fixed(5, 1, "Labour Day")
+CHRISTMAS_EVE = _fixed(12, 24, "Christmas Eve")
+CHRISTMAS = _fixed(12, 25, "Christmas Day")
+BOXING_DAY = _fixed(12, 26, "Boxing Day")
+NEW_YEARS_EVE = _fixed(12, 31, "New Year's Eve")
+
+US_HOLIDAYS = (
+    _fixed(1, 1, "New Year's Day", _sunday_to_monday),
+    _nth_weekday(1, MON, 3, "Martin Luther King Jr. Day"),
+    _nth_weekday(2, MON, 3, "Washington's Birthday"),
+    GOOD_FRIDAY,
+    _nth_weekday(5, MON, -1, "Memorial Day"),
+    _fixed(6, 19, "Juneteenth", _nearest_weekday, since=2022),
+    _fixed(7, 4, "Independence Day", _nearest_weekday),
+    _nth_weekday(9, MON, 1, "Labor Day"),
+    _nth_weekday(11, THU, 4, "Thanksgiving Day"),
+    _fixed(12, 25, "Christmas Day", _nearest_weekday),
+)
+US_EARLY_CLOSES = (
+    _early_close(7, 3, time(13)),
+    _early_close_after("Thanksgiving Day", time(13)),
+    _early_close(12, 24, time(13)),
+)
+
+UK_HOLIDAYS = (
+    _fixed(1, 1, "New Year's Day", _substitute_weekday),
+    GOOD_FRIDAY,
+    EASTER_MONDAY,
+    _nth_weekday(5, MON, 1, "Early May Bank Holiday"),
+    _nth_weekday(5, MON, -1, "Spring Bank Holiday"),
+    _nth_weekday(8, MON, -1, "Summer Bank Holiday"),
+    _fixed(12, 25, "Christmas Day", _substitute_weekday),
+    _fixed(12, 26, "Boxing Day", _substitute_weekday),
+)
+UK_EARLY_CLOSES = (
+    _early_close(12, 24, time(12, 30)),
+    _early_close(12, 31, time(12, 30)),
+)
+
+EURONEXT_HOLIDAYS = (
+    NEW_YEAR,
+    GOOD_FRIDAY,
+    EASTER_MONDAY,
+    LABOUR_DAY,
+    CHRISTMAS,
+    BOXING_DAY,
+)
+XETRA_HOLIDAYS = EURONEXT_HOLIDAYS + (CHRISTMAS_EVE, NEW_YEARS_EVE)
+ITALY_HOLIDAYS = XETRA_HOLIDAYS + (_fixed(8, 15, "Assumption Day"),)
+SWISS_HOLIDAYS = (
+    NEW_YEAR,
+    _fixed(1, 2, "Berchtold's Day"),
+    GOOD_FRIDAY,
+    EASTER_MONDAY,
+    LABOUR_DAY,
+    ASCENSION,
+    WHIT_MONDAY,
+    _fixed(8, 1, "Swiss National Day"),
+    CHRISTMAS_EVE,
+    CHRISTMAS,
+    BOXING_DAY,
+    NEW_YEARS_EVE,
+)
+NORDIC_HOLIDAYS = (
+    NEW_YEAR,
+    GOOD_FRIDAY,
+    EASTER_MONDAY,
+    CHRISTMAS_EVE,
+    CHRISTMAS,
+    BOXING_DAY,
+    NEW_YEARS_EVE,
+)
+OSLO_HOLIDAYS = NORDIC_HOLIDAYS + (
+    MAUNDY_THURSDAY,
+    LABOUR_DAY,
+    _fixed(5, 17, "Constitution Day"),
+    ASCENSION,
+    WHIT_MONDAY,
+)
+POLAND_HOLIDAYS = XETRA_HOLIDAYS + (
+    _fixed(1, 6, "Epiphany"),
+    _fixed(5, 3, "Constitution Day"),
+    CORPUS_CHRISTI,
+    _fixed(8, 15, "Assumption Day"),
+    _fixed(11, 1, "All Saints' Day"),
+    _fixed(11, 11, "Independence Day"),
+)
+CENTRAL_EUROPE_HOLIDAYS = EURONEXT_HOLIDAYS + (CHRISTMAS_EVE,)
+ORTHODOX_HOLIDAYS = (
+    NEW_YEAR,
+    _easter_offset(-2, "Orthodox Good Friday", orthodox=True),
+    _easter_offset(1, "Orthodox Easter Monday", orthodox=True),
+    LABOUR_DAY,
+    CHRISTMAS,
+    BOXING_DAY,
+)
+TURKEY_HOLIDAYS = (
+    NEW_YEAR,
+    _fixed(4, 23, "National Sovereignty and Children's Day"),
+    LABOUR_DAY,
+    _fixed(5, 19, "Youth and Sports Day"),
+    _fixed(7, 15, "Democracy and National Unity Day"),
+    _fixed(8, 30, "Victory Day"),
+    _fixed(10, 29, "Republic Day"),
+)
+
+CANADA_HOLIDAYS = (
+    _fixed(1, 1, "New Year's Day", _substitute_weekday),
+    _nth_weekday(2, MON, 3, "Family Day"),
+    GOOD_FRIDAY,
+    _weekday_on_or_before(5, 24, MON, "Victoria Day"),
+    _fixed(7, 1, "Canada Day", _substitute_weekday),
+    _nth_weekday(8, MON, 1, "Civic Holiday"),
+    _nth_weekday(9, MON, 1, "Labour Day"),
+    _nth_weekday(10, MON, 2, "Thanksgiving Day"),
+    _fixed(12, 25, "Christmas Day", _substitute_weekday),
+    _fixed(12, 26, "Boxing Day", _substitute_weekday),
+)
+MEXICO_HOLIDAYS = (
+    NEW_YEAR,
+    _nth_weekday(2, MON, 1, "Constitution Day"),
+    _nth_weekday(3, MON, 3, "Benito Juárez's Birthday"),
+    MAUNDY_THURSDAY,
+    GOOD_FRIDAY,
+    LABOUR_DAY,
+    _fixed(9, 16, "Independence Day"),
+    _nth_weekday(11, MON, 3, "Revolution Day"),
+    _fixed(12, 12, "Day of the Virgin of Guadalupe"),
+    CHRISTMAS,
+)
+BRAZIL_HOLIDAYS = (
+    NEW_YEAR,
+    _easter_offset(-48, "Carnival Monday"),
+    _easter_offset(-47, "Carnival Tuesday"),
+    GOOD_FRIDAY,
+    _fixed(4, 21, "Tiradentes"),
+    LABOUR_DAY,
+    CORPUS_CHRISTI,
+    _fixed(9, 7, "Independence Day"),
+    _fixed(10, 12, "Our Lady of Aparecida"),
+    _fixed(11, 2, "All Souls' Day"),
+    _fixed(11, 15, "Republic Proclamation Day"),
+    _fixed(11, 20, "Black Consciousness Day", since=2024),
+    CHRISTMAS_EVE,
+    CHRISTMAS,
+    NEW_YEARS_EVE,
+)
+ARGENTINA_HOLIDAYS = (
+    NEW_YEAR,
+    _easter_offset(-48, "Carnival Monday"),
+    _easter_offset(-47, "Carnival Tuesday"),
+    _fixed(3, 24, "Day of Remembrance"),
+    _fixed(4, 2, "Malvinas Day"),
+    MAUNDY_THURSDAY,
+    GOOD_FRIDAY,
+    LABOUR_DAY,
+    _fixed(5, 25, "May Revolution"),
+    _fixed(6, 20, "Flag Day"),
+    _fixed(7, 9, "Independence Day"),
+    _fixed(12, 8, "Immaculate Conception"),
+    CHRISTMAS,
+)
+CHILE_HOLIDAYS = (
+    NEW_YEAR,
+    GOOD_FRIDAY,
+    LABOUR_DAY,
+    _fixed(5, 21, "Navy Day"),
+    _fixed(9, 18, "Independence Day"),
+    _fixed(9, 19, "Army Day"),
+    _fixed(12, 8, "Immaculate Conception"),
+    CHRISTMAS,
+    NEW_YEARS_EVE,
+)
+COLOMBIA_HOLIDAYS = (
+    NEW_YEAR,
+    MAUNDY_THURSDAY,
+    GOOD_FRIDAY,
+    LABOUR_DAY,
+    _fixed(7, 20, "Independence Day"),
+    _fixed(8, 7, "Battle of Boyacá"),
+    _fixed(12, 8, "Immaculate Conception"),
+    CHRISTMAS,
+)
+
+JAPAN_HOLIDAYS = (
+    NEW_YEAR,
+    _fixed(1, 2, "Market Holiday"),
+    _fixed(1, 3, "Market Holiday"),
+    _nth_weekday(1, MON, 2, "Coming of Age Day"),
+    _fixed(2, 11, "National Foundation Day", _substitute_sunday),
+    _fixed(2, 23, "Emperor's Birthday", _substitute_sunday),
+    _japanese_equinox(3, "Vernal Equinox Day"),
+    _fixed(4, 29, "Showa Day", _substitute_sunday),
+    # Golden Week in reverse so a Sunday holiday substitutes past the others
+    _fixed(5, 5, "Children's Day", _substitute_sunday),
+    _fixed(5, 4, "Greenery Day", _substitute_sunday),
+    _fixed(5, 3, "Constitution Memorial Day", _substitute_sunday),
+    _nth_weekday(7, MON, 3, "Marine Day"),
+    _fixed(8, 11, "Mountain Day", _substitute_sunday),
+    _nth_weekday(9, MON, 3, "Respect for the Aged Day"),
+    _japanese_equinox(9, "Autumnal Equinox Day"),
+    _nth_weekday(10, MON, 2, "Sports Day"),
+    _fixed(11, 3, "Culture Day", _substitute_sunday),
+    _fixed(11, 23, "Labour Thanksgiving Day", _substitute_sunday),
+    _fixed(12, 31, "Market Holiday"),
+)
+HONG_KONG_HOLIDAYS = (
+    _fixed(1, 1, "New Year's Day", _sunday_to_monday),
+    GOOD_FRIDAY,
+    EASTER_MONDAY,
+    _fixed(5, 1, "Labour Day", _sunday_to_monday),
+    _fixed(7, 1, "HKSAR Establishment Day", _sunday_to_monday),
+    _fixed(10, 1, "National Day", _sunday_to_monday),
+    _fixed(12, 25, "Christmas Day", _substitute_weekday),
+    _fixed(12, 26, "Boxing Day", _substitute_weekday),
+)
+CHINA_HOLIDAYS = (
+    NEW_YEAR,
+    LABOUR_DAY,
+    _fixed(10, 1, "National Day"),
+    _fixed(10, 2, "National Day"),
+    _fixed(10, 3, "National Day"),
+)
+KOREA_HOLIDAYS = (
+    NEW_YEAR,
+    _fixed(3, 1, "Independence Movement Day"),
+    _fixed(5, 5, "Children's Day"),
+    _fixed(6, 6, "Memorial Day"),
+    _fixed(8, 15, "Liberation Day"),
+    _fixed(10, 3, "National Foundation Day"),
+    _fixed(10, 9, "Hangul Day"),
+    CHRISTMAS,
+    _fixed(12, 31, "Market Holiday"),
+)
+TAIWAN_HOLIDAYS = (
+    NEW_YEAR,
+    _fixed(2, 28, "Peace Memorial Day"),
+    _fixed(10, 10, "National Day"),
+)
+SINGAPORE_HOLIDAYS = (
+    _fixed(1, 1, "New Year's Day", _sunday_to_monday),
+    GOOD_FRIDAY,
+    _fixed(5, 1, "Labour Day", _sunday_to_monday),
+    _fixed(8, 9, "National Day", _sunday_to_monday),
+    _fixed(12, 25, "Christmas Day", _sunday_to_monday),
+)
+MALAYSIA_HOLIDAYS = (
+    NEW_YEAR,
+    LABOUR_DAY,
+    _fixed(8, 31, "National Day"),
+    _fixed(9, 16, "Malaysia Day"),
+    CHRISTMAS,
+)
+THAILAND_HOLIDAYS = (
+    NEW_YEAR,
+    _fixed(4, 6, "Chakri Memorial Day"),
+    _fixed(4, 13, "Songkran Festival"),
+    _fixed(4, 14, "Songkran Festival"),
+    _fixed(4, 15, "Songkran Festival"),
+    LABOUR_DAY,
+    _fixed(7, 28, "King's Birthday"),
+    _fixed(8, 12, "Mother's Day"),
+    _fixed(10, 13, "King Bhumibol Memorial Day"),
+    _fixed(10, 23, "Chulalongkorn Day"),
+    _fixed(12, 5, "Father's Day"),
+    _fixed(12, 10, "Constitution Day"),
+    NEW_YEARS_EVE,
+)
+INDONESIA_HOLIDAYS = (
+    NEW_YEAR,
+    LABOUR_DAY,
+    _fixed(6, 1, "Pancasila Day"),
+    _fixed(8, 17, "Independence Day"),
+    CHRISTMAS,
+)
+PHILIPPINES_HOLIDAYS = (
+    NEW_YEAR,
+    MAUNDY_THURSDAY,
+    GOOD_FRIDAY,
+    LABOUR_DAY,
+    _fixed(6, 12, "Independence Day"),
+    _fixed(11, 30, "Bonifacio Day"),
+    CHRISTMAS,
+    _fixed(12, 30, "Rizal Day"),
+    NEW_YEARS_EVE,
+)
+INDIA_HOLIDAYS = (
+    _fixed(1, 26, "Republic Day"),
+    _fixed(5, 1, "Maharashtra Day"),
+    _fixed(8, 15, "Independence Day"),
+    _fixed(10, 2, "Gandhi Jayanti"),
+    CHRISTMAS,
+)
+AUSTRALIA_HOLIDAYS = (
+    _fixed(1, 1, "New Year's Day", _substitute_weekday),
+    _fixed(1, 26, "Australia Day", _substitute_weekday),
+    GOOD_FRIDAY,
+    EASTER_MONDAY,
+    _fixed(4, 25, "Anzac Day"),
+    _nth_weekday(6, MON, 2, "King's Birthday"),
+    _fixed(12, 25, "Christmas Day", _substitute_weekday),
+    _fixed(12, 26, "Boxing Day", _substitute_weekday),
+)
+AUSTRALIA_EARLY_CLOSES = (
+    _early_close(12, 24, time(14, 10)),
+    _early_close(12, 31, time(14, 10)),
+)
+NEW_ZEALAND_HOLIDAYS = (
+    _fixed(1, 1, "New Year's Day", _substitute_weekday),
+    _fixed(1, 2, "Day after New Year's Day", _substitute_weekday),
+    _fixed(2, 6, "Waitangi Day", _substitute_weekday),
+    GOOD_FRIDAY,
+    EASTER_MONDAY,
+    _fixed(4, 25, "Anzac Day", _substitute_weekday),
+    _nth_weekday(6, MON, 1, "King's Birthday"),
+    _nth_weekday(10, MON, 4, "Labour Day"),
+    _fixed(12, 25, "Christmas Day", _substitute_weekday),
+    _fixed(12, 26, "Boxing Day", _substitute_weekday),
+)
+SOUTH_AFRICA_HOLIDAYS = (
+    _fixed(1, 1, "New Year's Day", _sunday_to_monday),
+    _fixed(3, 21, "Human Rights Day", _sunday_to_monday),
+    GOOD_FRIDAY,
+    _easter_offset(1, "Family Day"),
+    _fixed(4, 27, "Freedom Day", _sunday_to_monday),
+    _fixed(5, 1, "Workers' Day", _sunday_to_monday),
+    _fixed(6, 16, "Youth Day", _sunday_to_monday),
+    _fixed(8, 9, "National Women's Day", _sunday_to_monday),
+    _fixed(9, 24, "Heritage Day", _sunday_to_monday),
+    _fixed(12, 16, "Day of Reconciliation", _sunday_to_monday),
+    _fixed(12, 25, "Christmas Day", _sunday_to_monday),
+    _fixed(12, 26, "Day of Goodwill", _substitute_weekday),
+)
+SAUDI_HOLIDAYS = (
+    _fixed(2, 22, "Founding Day"),
+    _fixed(9, 23, "National Day"),
+)
+GULF_WEEKEND = frozenset({FRI, SAT})
+
+NYSE = ExchangeCalendar(
+    name="New York Stock Exchange",
+    tz="America/New_York",
+    **_hours("09:30", "16:00"),
+    pre_open=time(4),
+    post_close=time(20),
+    holidays=US_HOLIDAYS,
+    early_closes=US_EARLY_CLOSES,
+)
+CME_GLOBEX = ExchangeCalendar(
+    name="CME Globex",
+    tz="America/Chicago",
+    **_hours("17:00", "16:00"),
+    holidays=(NEW_YEAR, GOOD_FRIDAY, CHRISTMAS),
+    overnight=True,
+)
+FOREX = ExchangeCalendar(
+    name="Foreign exchange",
+    tz="America/New_York",
+    **_hours("17:00", "17:00"),
+    holidays=(NEW_YEAR, CHRISTMAS),
+    overnight=True,
+)
+CRYPTO = ExchangeCalendar(
+    name="Cryptocurrencies",
+    tz="UTC",
+    **_hours("00:00", "00:00"),
+    weekend=frozenset(),
+    always_open=True,
+)
+TSX = ExchangeCalendar(
+    name="Toronto Stock Exchange",
+    tz="America/Toronto",
+    **_hours("09:30", "16:00"),
+    holidays=CANADA_HOLIDAYS,
+    early_closes=(_early_close(12, 24, time(13)),),
+)
+BMV = ExchangeCalendar(
+    name="Mexican Stock Exchange",
+    tz="America/Mexico_City",
+    **_hours("08:30", "15:00"),
+    holidays=MEXICO_HOLIDAYS,
+)
+B3 = ExchangeCalendar(
+    name="B3",
+    tz="America/Sao_Paulo",
+    **_hours("10:00", "17:55"),
+    holidays=BRAZIL_HOLIDAYS,
+)
+BYMA = ExchangeCalendar(
+    name="Buenos Aires Stock Exchange",
+    tz="America/Argentina/Buenos_Aires",
+    **_hours("11:00", "17:00"),
+    holidays=ARGENTINA_HOLIDAYS,
+)
+SANTIAGO = ExchangeCalendar(
+    name="Santiago Stock Exchange",
+    tz="America/Santiago",
+    **_hours("09:30", "16:00"),
+    holidays=CHILE_HOLIDAYS,
+)
+BVC = ExchangeCalendar(
+    name="Colombia Stock Exchange",
+    tz="America/Bogota",
+    **_hours("09:30", "16:00"),
+    holidays=COLOMBIA_HOLIDAYS,
+)
+CARACAS = ExchangeCalendar(
+    name="Caracas Stock Exchange",
+    tz="America/Caracas",
+    **_hours("09:00", "13:00"),
+    holidays=(NEW_YEAR, CHRISTMAS),
+)
+
+LSE = ExchangeCalendar(
+    name="London Stock Exchange",
+    tz="Europe/London",
+    **_hours("08:00", "16:30"),
+    holidays=UK_HOLIDAYS,
+    early_closes=UK_EARLY_CLOSES,
+)
+XETRA = ExchangeCalendar(
+    name="Xetra",
+    tz="Europe/Berlin",
+    **_hours("09:00", "17:30"),
+    holidays=XETRA_HOLIDAYS,
+)
+# Regional German floors (Frankfurt, Stuttgart, Munich...) trade long hours
+GERMAN_REGIONAL = replace(
+    XETRA, name="German regional exchanges", **_hours("08:00", "22:00")
+)
+EURONEXT_PARIS = ExchangeCalendar(
+    name="Euronext Paris",
+    tz="Europe/Paris",
+    **_hours("09:00", "17:30"),
+    holidays=EURONEXT_HOLIDAYS,
+)
+EURONEXT_AMSTERDAM = replace(
+    EURONEXT_PARIS, name="Euronext Amsterdam", tz="Europe/Amsterdam"
+)
+EURONEXT_BRUSSELS = replace(
+    EURONEXT_PARIS, name="Euronext Brussels", tz="Europe/Brussels"
+)
+EURONEXT_LISBON = replace(
+    EURONEXT_PARIS,
+    name="Euronext Lisbon",
+    tz="Europe/Lisbon",
+    **_hours("08:00", "16:30"),
+)
+EURONEXT_DUBLIN = replace(
+    EURONEXT_PARIS,
+    name="Euronext Dublin",
+    tz="Europe/Dublin",
+    **_hours("08:00", "16:30"),
+)
+MILAN = ExchangeCalendar(
+    name="Borsa Italiana",
+    tz="Europe/Rome",
+    **_hours("09:00", "17:30"),
+    holidays=ITALY_HOLIDAYS,
+)
+MADRID = replace(EURONEXT_PARIS, name="Bolsa de Madrid", tz="Europe/Madrid")
+VIENNA = ExchangeCalendar(
+    name="Vienna Stock Exchange",
+    tz="Europe/Vienna",
+    **_hours("09:00", "17:30"),
+    holidays=XETRA_HOLIDAYS + (WHIT_MONDAY,),
+)
+SIX = ExchangeCalendar(
+    name="SIX Swiss Exchange",
+    tz="Europe/Zurich",
+    **_hours("09:00", "17:30"),
+    holidays=SWISS_HOLIDAYS,
+)
+STOCKHOLM = ExchangeCalendar(
+    name="Nasdaq Stockholm",
+    tz="Europe/Stockholm",
+    **_hours("09:00", "17:30"),
+    holidays=NORDIC_HOLIDAYS + (LABOUR_DAY, ASCENSION, _fixed(6, 6, "National Day")),
+)
+COPENHAGEN = replace(
+    STOCKHOLM,
+    name="Nasdaq Copenhagen",
+    tz="Europe/Copenhagen",
+    **_hours("09:00", "17:00"),
+    holidays=NORDIC_HOLIDAYS + (MAUNDY_THURSDAY, ASCENSION, WHIT_MONDAY),
+)
+HELSINKI = replace(
+    STOCKHOLM,
+    name="Nasdaq Helsinki",
+    tz="Europe/Helsinki",
+    **_hours("10:00", "18:30"),
+    holidays=NORDIC_HOLIDAYS
+    + (LABOUR_DAY, ASCENSION, _fixed(12, 6, "Independence Day")),
+)
+ICELAND = replace(
+    STOCKHOLM,
+    name="Nasdaq Iceland",
+    tz="Atlantic/Reykjavik",
+    **_hours("09:30", "15:30"),
+    holidays=NORDIC_HOLIDAYS + (MAUNDY_THURSDAY, LABOUR_DAY, ASCENSION, WHIT_MONDAY),
+)
+BALTIC = ExchangeCalendar(
+    name="Nasdaq Tallinn",
+    tz="Europe/Tallinn",
+    **_hours("10:00", "16:00"),
+    holidays=NORDIC_HOLIDAYS + (LABOUR_DAY,),
+)
+RIGA = replace(BALTIC, name="Nasdaq Riga", tz="Europe/Riga")
+VILNIUS = replace(BALTIC, name="Nasdaq Vilnius", tz="Europe/Vilnius")
+OSLO = ExchangeCalendar(
+    name="Euronext Oslo",
+    tz="Europe/Oslo",
+    **_hours("09:00", "16:20"),
+    holidays=OSLO_HOLIDAYS,
+)
+WARSAW = ExchangeCalendar(
+    name="Warsaw Stock Exchange",
+    tz="Europe/Warsaw",
+    **_hours("09:00", "17:00"),
+    holidays=POLAND_HOLIDAYS,
+)
+PRAGUE = ExchangeCalendar(
+    name="Prague Stock Exchange",
+    tz="Europe/Prague",
+    **_hours("09:00", "16:25"),
+    holidays=CENTRAL_EUROPE_HOLIDAYS,
+)
+BUDAPEST = replace(
+    PRAGUE,
+    name="Budapest Stock Exchange",
+    tz="Europe/Budapest",
+    **_hours("09:00", "17:00"),
+)
+ATHENS = ExchangeCalendar(
+    name="Athens Stock Exchange",
+    tz="Europe/Athens",
+    **_hours("10:00", "17:20"),
+    holidays=ORTHODOX_HOLIDAYS,
+)
+BUCHAREST = replace(
+    ATHENS,
+    name="Bucharest Stock Exchange",
+    tz="Europe/Bucharest",
+    **_hours("10:00", "17:45"),
+)
+ISTANBUL = ExchangeCalendar(
+    name="Borsa Istanbul",
+    tz="Europe/Istanbul",
+    **_hours("10:00", "18:00"),
+    holidays=TURKEY_HOLIDAYS,
+    unmodelled_holidays=True,
+)
+
+TEL_AVIV = ExchangeCalendar(
+    name="Tel Aviv Stock Exchange",
+    tz="Asia/Jerusalem",
+    **_hours("10:00", "17:25"),
+    unmodelled_holidays=True,
+)
+TADAWUL = ExchangeCalendar(
+    name="Saudi Exchange",
+    tz="Asia/Riyadh",
+    **_hours("10:00", "15:00"),
+    weekend=GULF_WEEKEND,
+    holidays=SAUDI_HOLIDAYS,
+    unmodelled_holidays=True,
+)
+QATAR = ExchangeCalendar(
+    name="Qatar Stock Exchange",
+    tz="Asia/Qatar",
+    **_hours("09:30", "13:15"),
+    weekend=GULF_WEEKEND,
+    holidays=(_fixed(12, 18, "National Day"),),
+    unmodelled_holidays=True,
+)
+KUWAIT = ExchangeCalendar(
+    name="Boursa Kuwait",
+    tz="Asia/Kuwait",
+    **_hours("09:00", "12:40"),
+    weekend=GULF_WEEKEND,
+    holidays=(NEW_YEAR, _fixed(2, 25, "National Day"), _fixed(2, 26, "Liberation Day")),
+    unmodelled_holidays=True,
+)
+EGYPT = ExchangeCalendar(
+    name="Egyptian Exchange",
+    tz="Africa/Cairo",
+    **_hours("10:00", "14:30"),
+    weekend=GULF_WEEKEND,
+    holidays=(
+        _fixed(1, 7, "Coptic Christmas"),
+        _fixed(1, 25, "Revolution Day"),
+        _fixed(7, 23, "Revolution Day"),
+        _fixed(10, 6, "Armed Forces Day"),
+    ),
+    unmodelled_holidays=True,
+)
+JSE = ExchangeCalendar(
+    name="Johannesburg Stock Exchange",
+    tz="Africa/Johannesburg",
+    **_hours("09:00", "17:00"),
+    holidays=SOUTH_AFRICA_HOLIDAYS,
+)
+
+JPX = ExchangeCalendar(
+    name="Japan Exchange Group",
+    tz="Asia/Tokyo",
+    **_hours("09:00", "15:30"),
+    lunch=_lunch("11:30", "12:30"),
+    holidays=JAPAN_HOLIDAYS,
+)
+HKEX = ExchangeCalendar(
+    name="Hong Kong Stock Exchange",
+    tz="Asia/Hong_Kong",
+    **_hours("09:30", "16:00"),
+    lunch=_lunch("12:00", "13:00"),
+    holidays=HONG_KONG_HOLIDAYS,
+    early_closes=(_early_close(12, 24, time(12)), _early_close(12, 31, time(12))),
+    unmodelled_holidays=True,
+)
+SHANGHAI = ExchangeCalendar(
+    name="Shanghai Stock Exchange",
+    tz="Asia/Shanghai",
+    **_hours("09:30", "15:00"),
+    lunch=_lunch("11:30", "13:00"),
+    holidays=CHINA_HOLIDAYS,
+    unmodelled_holidays=True,
+)
+SHENZHEN = replace(SHANGHAI, name="Shenzhen Stock Exchange")
+KRX = ExchangeCalendar(
+    name="Korea Exchange",
+    tz="Asia/Seoul",
+    **_hours("09:00", "15:30"),
+    holidays=KOREA_HOLIDAYS,
+    unmodelled_holidays=True,
+)
+TWSE = ExchangeCalendar(
+    name="Taiwan Stock Exchange",
+    tz="Asia/Taipei",
+    **_hours("09:00", "13:30"),
+    holidays=TAIWAN_HOLIDAYS,
+    unmodelled_holidays=True,
+)
+SGX = ExchangeCalendar(
+    name="Singapore Exchange",
+    tz="Asia/Singapore",
+    **_hours("09:00", "17:00"),
+    lunch=_lunch("12:00", "13:00"),
+    holidays=SINGAPORE_HOLIDAYS,
+    unmodelled_holidays=True,
+)
+BURSA = ExchangeCalendar(
+    name="Bursa Malaysia",
+    tz="Asia/Kuala_Lumpur",
+    **_hours("09:00", "17:00"),
+    lunch=_lunch("12:30", "14:30"),
+    holidays=MALAYSIA_HOLIDAYS,
+    unmodelled_holidays=True,
+)
+SET = ExchangeCalendar(
+    name="Stock Exchange of Thailand",
+    tz="Asia/Bangkok",
+    **_hours("10:00", "16:30"),
+    lunch=_lunch("12:30", "14:30"),
+    holidays=THAILAND_HOLIDAYS,
+    unmodelled_holidays=True,
+)
+IDX = ExchangeCalendar(
+    name="Indonesia Stock Exchange",
+    tz="Asia/Jakarta",
+    **_hours("09:00", "16:00"),
+    lunch=_lunch("12:00", "13:30"),
+    holidays=INDONESIA_HOLIDAYS,
+    unmodelled_holidays=True,
+)
+PSE = ExchangeCalendar(
+    name="Philippine Stock Exchange",
+    tz="Asia/Manila",
+    **_hours("09:30", "15:00"),
+    lunch=_lunch("12:00", "13:00"),
+    holidays=PHILIPPINES_HOLIDAYS,
+    unmodelled_holidays=True,
+)
+NSE = ExchangeCalendar(
+    name="National Stock Exchange of India",
+    tz="Asia/Kolkata",
+    **_hours("09:15", "15:30"),
+    pre_open=time(9),
+    holidays=INDIA_HOLIDAYS,
+    unmodelled_holidays=True,
+)
+BSE = replace(NSE, name="BSE")
+ASX = ExchangeCalendar(
+    name="Australian Securities Exchange",
+    tz="Australia/Sydney",
+    **_hours("10:00", "16:00"),
+    holidays=AUSTRALIA_HOLIDAYS,
+    early_closes=AUSTRALIA_EARLY_CLOSES,
+)
+NZX = ExchangeCalendar(
+    name="New Zealand Exchange",
+    tz="Pacific/Auckland",
+    **_hours("10:00", "16:45"),
+    holidays=NEW_ZEALAND_HOLIDAYS,
+)
+
+# Yahoo exchange code -> calendar. Covers every code in EXCHANGES plus the
+# pseudo-exchanges Yahoo reports for indices, futures, FX and crypto.
+EXCHANGE_CALENDARS: dict[str, ExchangeCalendar] = {
+    **dict.fromkeys(
+        ["ASE", "BTS", "CXI", "NCM", "NGM", "NMS", "NYQ", "OEM", "OQB", "OQX"],
+        NYSE,
+    ),
+    **dict.fromkeys(["PCX", "PNK", "YHD", "NAS", "NIM", "SNP", "DJI", "WCB"], NYSE),
+    **dict.fromkeys(["CME", "CBT", "NYM", "CMX", "NYB"], CME_GLOBEX),
+    "CCY": FOREX,
+    "CCC": CRYPTO,
+    **dict.fromkeys(["TOR", "VAN", "CNQ", "NEO"], TSX),
+    "MEX": BMV,
+    "SAO": B3,
+    "BUE": BYMA,
+    "SGO": SANTIAGO,
+    "BVC": BVC,
+    "CCS": CARACAS,
+    **dict.fromkeys(["LSE", "IOB", "AQS", "FGI"], LSE),
+    "ISE": EURONEXT_DUBLIN,
+    "GER": XETRA,
+    **dict.fromkeys(["BER", "DUS", "FRA", "HAM", "MUN", "STU"], GERMAN_REGIONAL),
+    "PAR": EURONEXT_PARIS,
+    "AMS": EURONEXT_AMSTERDAM,
+    "BRU": EURONEXT_BRUSSELS,
+    "LIS": EURONEXT_LISBON,
+    "MIL": MILAN,
+    "MCE": MADRID,
+    "VIE": VIENNA,
+    "EBS": SIX,
+    "STO": STOCKHOLM,
+    "CPH": COPENHAGEN,
+    "HEL": HELSINKI,
+    "ICE": ICELAND,
+    "TAL": BALTIC,
+    "RIS": RIGA,
+    "LIT": VILNIUS,
+    "OSL": OSLO,
+    "WSE": WARSAW,
+    "PRA": PRAGUE,
+    "BUD": BUDAPEST,
+    "ATH": ATHENS,
+    "BVB": BUCHAREST,
+    "IST": ISTANBUL,
+    "TLV": TEL_AVIV,
+    "SAU": TADAWUL,
+    "DOH": QATAR,
+    "KUW": KUWAIT,
+    "CAI": EGYPT,
+    "JNB": JSE,
+    **dict.fromkeys(["JPX", "FKA", "SAP"], JPX),
+    "HKG": HKEX,
+    "SHH": SHANGHAI,
+    "SHZ": SHENZHEN,
+    **dict.fromkeys(["KSC", "KOE"], KRX),
+    **dict.fromkeys(["TAI", "TWO"], TWSE),
+    "SES": SGX,
+    "KLS": BURSA,
+    "SET": SET,
+    "JKT": IDX,
+    **dict.fromkeys(["PHS", "PHP"], PSE),
+    "NSI": NSE,
+    "BSE": BSE,
+    "ASX": ASX,
+    "NZE": NZX,
+}
+
+# Yahoo symbol suffix -> exchange code; symbols without a suffix trade in the US
+SUFFIX_EXCHANGES = {
+    "L": "LSE",
+    "IL": "IOB",
+    "AQ": "AQS",
+    "IR": "ISE",
+    "DE": "GER",
+    "BE": "BER",
+    "DU": "DUS",
+    "F": "FRA",
+    "HM": "HAM",
+    "MU": "MUN",
+    "SG": "STU",
+    "PA": "PAR",
+    "AS": "AMS",
+    "BR": "BRU",
+    "LS": "LIS",
+    "MI": "MIL",
+    "MC": "MCE",
+    "VI": "VIE",
+    "SW": "EBS",
+    "ST": "STO",
+    "CO": "CPH",
+    "HE": "HEL",
+    "IC": "ICE",
+    "TL": "TAL",
+    "RG": "RIS",
+    "VS": "LIT",
+    "OL": "OSL",
+    "WA": "WSE",
+    "PR": "PRA",
+    "BD": "BUD",
+    "AT": "ATH",
+    "RO": "BVB",
+    "IS": "IST",
+    "TA": "TLV",
+    "SR": "SAU",
+    "QA": "DOH",
+    "KW": "KUW",
+    "CA": "CAI",
+    "JO": "JNB",
+    "T": "JPX",
+    "HK": "HKG",
+    "SS": "SHH",
+    "SZ": "SHZ",
+    "KS": "KSC",
+    "KQ": "KOE",
+    "TW": "TAI",
+    "TWO": "TWO",
+    "SI": "SES",
+    "KL": "KLS",
+    "BK": "SET",
+    "JK": "JKT",
+    "PS": "PHS",
+    "NS": "NSI",
+    "BO": "BSE",
+    "AX": "ASX",
+    "NZ": "NZE",
+    "TO": "TOR",
+    "V": "VAN",
+    "CN": "CNQ",
+    "NE": "NEO",
+    "MX": "MEX",
+    "SA": "SAO",
+    "BA": "BUE",
+    "SN": "SGO",
+    "CL": "BVC",
+    "CR": "CCS",
+}
+
+# Yahoo crypto pairs (BTC-USD, ETH-EUR); share classes look like BRK-B
+_CRYPTO_PAIR = re.compile(r"^[A-Z0-9]+-(USD|USDT|USDC|EUR|GBP|JPY|BTC|ETH)$")
+
+QUOTE_TYPE_CALENDARS = {
+    "CRYPTOCURRENCY": CRYPTO,
+    "CURRENCY": FOREX,
+    "FUTURE": CME_GLOBEX,
+}
+
+# Exchanges behind each Yahoo market summary in MARKETS
+MARKET_CALENDARS: dict[str, tuple[ExchangeCalendar, ...]] = {
+    "US": (NYSE,),
+    "GB": (LSE,),
+    "EUROPE": (XETRA, EURONEXT_PARIS, MILAN, MADRID, SIX, EURONEXT_AMSTERDAM),
+    "ASIA": (JPX, HKEX, SHANGHAI, KRX, TWSE, SGX, NSE, ASX),
+    "RATES": (CME_GLOBEX,),
+    "COMMODITIES": (CME_GLOBEX,),
+    "CURRENCIES": (FOREX,),
+    "CRYPTOCURRENCIES": (CRYPTO,),
+}
+
+
+def get_calendar(exchange: Optional[str]) -> Optional[ExchangeCalendar]:
+    return EXCHANGE_CALENDARS.get(exchange.upper()) if exchange else None
+
+
+def calendar_for_symbol(
+    symbol: str,
+    *,
+    exchange: Optional[str] = None,
+    quote_type: Optional[str] = None,
+) -> Optional[ExchangeCalendar]:
+    """
+    The calendar a Yahoo symbol trades on, from its exchange code when known,
+    otherwise from its quote type or symbol shape. None when it cannot be told
+    (e.g. an index such as ^FTSE); callers then keep their default behaviour.
+    """
+    calendar = get_calendar(exchange)
+    if calendar is not None:
+        return calendar
+    if quote_type and quote_type.upper() in QUOTE_TYPE_CALENDARS:
+        return QUOTE_TYPE_CALENDARS[quote_type.upper()]
+
+    symbol = symbol.strip().upper()
+    if symbol.endswith("=X"):
+        return FOREX
+    if symbol.endswith("=F"):
+        return CME_GLOBEX
+    if symbol.startswith("^"):
+        return None
+    if _CRYPTO_PAIR.match(symbol):
+        return CRYPTO
+    if "." in symbol:
+        # Yahoo writes share classes with a dash (BRK-B); a dot is an exchange
+        return get_calendar(SUFFIX_EXCHANGES.get(symbol.rsplit(".", 1)[1]))
+    return NYSE
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+# Order used to summarise several exchanges' statuses: any certain open wins
+_STATUSES = ("open", "unknown", "closed")
+
+
+def _status(calendar: ExchangeCalendar, state: MarketState) -> str:
+    """
+    "open" or "closed"; "unknown" when the calendar says open but the day may
+    be a holiday it does not model.
+    """
+    if not state.is_open:
+        return "closed"
+    return "unknown" if calendar.unmodelled_holidays else "open"
+
+
+def market_status(
+    calendars: Iterable[ExchangeCalendar], now: Optional[datetime] = None
+) -> dict:
+    """
+    Summary of one or more exchanges: open while any of them is, with the
+    earliest upcoming open and, while open, the latest close. The status is
+    "unknown" when the only exchanges trading by the calendar may be closed
+    for a holiday it does not model (see ``unmodelled_holidays``).
+    """
+    now = now or datetime.now(timezone.utc)
+    calendars = list(calendars)
+    states = [calendar.state(now) for calendar in calendars]
+    statuses = [_status(calendar, state) for calendar, state in zip(calendars, states)]
+    phase = min((s.phase for s in states), key=PHASES.index)
+    opens = [s.next_open for s in states if s.next_open]
+    open_closes = [s.next_close for s in states if s.is_open and s.next_close]
+    closes = [s.next_close for s in states if s.next_close]
+    return {
+        "status": min(statuses, key=_STATUSES.index),
+        "session": phase,
+        "next_open": _iso(min(opens, default=None)),
+        "next_close": _iso(
+            max(open_closes) if open_closes else min(closes, default=None)
+        ),
+        "exchanges": [
+            {
+                "name": calendar.name,
+                "timezone": calendar.tz,
+                "status": exchange_status,
+                "session": state.phase,
+                "next_open": _iso(state.next_open),
+                "next_close": _iso(state.next_close),
+                "holiday": state.holiday,
+            }
+            for calendar, state, exchange_status in zip(calendars, states, statuses)
+        ],
+    }
+
+
+def market_hours_ttl(
+    active_ttl: float,
+    max_ttl: float,
+    calendar_of: Callable[[Hashable, Any], Optional[ExchangeCalendar]],
+) -> Callable[[Hashable, Any], Optional[float]]:
+    """
+    A TTLCache ``ttl_policy`` for market data: ``active_ttl`` while the
+    entry's exchange trades, until it reopens otherwise. Entries whose
+    exchange is unknown keep the cache's default TTL.
+    """
+
+    def policy(key: Hashable, value: Any) -> Optional[float]:
+        calendar = calendar_of(key, value)
+        return None if calendar is None else calendar.cache_ttl(active_ttl, max_ttl)
+
+    return policy
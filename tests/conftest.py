@@ -0,0 +1,14 @@
+import os
+
+# app.core.config validates these on import; no test talks to these services
+for name, value in {
+    "PROJECT_NAME": "test",
+    "SUPABASE_URL": "https://test.supabase.co",
+    "SUPABASE_KEY": "test",
+    "SUPABASE_KEY_ANON": "test",
+    "SUPABASE_SERVICE_KEY": "test",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_USER": "test",
+    "ALPHA_VANTAGE_API_KEY": "test",
+}.items():
+    os.environ.setdefault(name, value)
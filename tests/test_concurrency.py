@@ -0,0 +1,303 @@
+import asyncio
+from functools import partial
+
+import pytest
+
+from app.utils.concurrency import (
+    AdaptiveLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    SingleFlight,
+)
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"price": 1}
+
+    async def main():
+        return await asyncio.gather(*(flight.do("AAPL", fetch) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"calls": 1, "deduplicated": 9, "inflight": 0}
+
+
+def test_different_keys_do_not_share():
+    flight = SingleFlight()
+
+    async def main():
+        return await asyncio.gather(
+            flight.do("A", partial(asyncio.sleep, 0.01, "a")),
+            flight.do("B", partial(asyncio.sleep, 0.01, "b")),
+        )
+
+    assert asyncio.run(main()) == ["a", "b"]
+    assert flight.calls == 2
+
+
+def test_error_reaches_every_waiter():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def main():
+        return await asyncio.gather(
+            *(flight.do("AAPL", fetch) for _ in range(5)), return_exceptions=True
+        )
+
+    errors = asyncio.run(main())
+    assert len(errors) == 5
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert flight.calls == 1
+
+
+def test_next_call_after_completion_fetches_again():
+    flight = SingleFlight()
+
+    async def main():
+        await flight.do("AAPL", partial(asyncio.sleep, 0, 1))
+        await flight.do("AAPL", partial(asyncio.sleep, 0, 2))
+
+    asyncio.run(main())
+    assert flight.calls == 2
+    assert len(flight) == 0
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    flight = SingleFlight()
+    finished = []
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        finished.append(True)
+        return "done"
+
+    async def main():
+        first = asyncio.create_task(flight.do("AAPL", fetch))
+        second = asyncio.create_task(flight.do("AAPL", fetch))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
+    assert finished == [True]
+    assert flight.calls == 1
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def breaker(clock, **overrides):
+    options = dict(
+        name="test",
+        window=60,
+        min_calls=4,
+        failure_rate=0.5,
+        slow_call=1.0,
+        slow_call_rate=0.5,
+        open_for=10,
+        max_open_for=35,
+        probes=2,
+    )
+    return CircuitBreaker(**{**options, **overrides}, clock=clock)
+
+
+def call(circuit, *, ok=True, duration=0.1):
+    probe = circuit.allow()
+    circuit.record(ok=ok, duration=duration, probe=probe)
+
+
+def trip(circuit):
+    for _ in range(circuit.min_calls):
+        call(circuit, ok=False)
+    assert circuit.state == CircuitBreaker.OPEN
+
+
+def test_breaker_stays_closed_below_min_calls():
+    circuit = breaker(Clock())
+    for _ in range(3):
+        call(circuit, ok=False)
+    assert circuit.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_opens_on_failure_rate():
+    circuit = breaker(Clock())
+    call(circuit)
+    call(circuit)
+    call(circuit, ok=False)
+    assert circuit.state == CircuitBreaker.CLOSED
+    call(circuit, ok=False)
+    assert circuit.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        circuit.allow()
+
+
+def test_breaker_opens_on_slow_call_rate():
+    circuit = breaker(Clock())
+    call(circuit)
+    call(circuit)
+    call(circuit, duration=2.0)
+    call(circuit, duration=2.0)
+    assert circuit.state == CircuitBreaker.OPEN
+
+
+def test_outcomes_older_than_window_are_forgotten():
+    clock = Clock()
+    circuit = breaker(clock)
+    call(circuit, ok=False)
+    call(circuit, ok=False)
+    clock.now += 61
+    for ok in (True, True, True, False):
+        call(circuit, ok=ok)
+    assert circuit.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_half_opens_after_wait():
+    clock = Clock()
+    circuit = breaker(clock)
+    trip(circuit)
+    clock.now += 9.5
+    assert circuit.state == CircuitBreaker.OPEN
+    assert circuit.retry_after() == pytest.approx(0.5)
+    clock.now += 0.5
+    assert circuit.state == CircuitBreaker.HALF_OPEN
+
+
+def test_half_open_admits_limited_probes_then_closes():
+    clock = Clock()
+    circuit = breaker(clock)
+    trip(circuit)
+    clock.now += 10
+    probes = [circuit.allow(), circuit.allow()]
+    assert probes == [True, True]
+    with pytest.raises(CircuitOpenError):
+        circuit.allow()
+
+    circuit.record(ok=True, duration=0.1, probe=True)
+    assert circuit.state == CircuitBreaker.HALF_OPEN
+    circuit.record(ok=True, duration=0.1, probe=True)
+    assert circuit.state == CircuitBreaker.CLOSED
+    assert circuit.allow() is False
+
+
+def test_released_probe_frees_its_slot():
+    clock = Clock()
+    circuit = breaker(clock, probes=1)
+    trip(circuit)
+    clock.now += 10
+    circuit.release(probe=circuit.allow())
+    assert circuit.allow() is True
+
+
+def test_failed_probe_doubles_open_time_up_to_max():
+    clock = Clock()
+    circuit = breaker(clock)
+    trip(circuit)
+    for expected in (20, 35, 35):
+        clock.now += circuit.retry_after()
+        call(circuit, ok=False)
+        assert circuit.state == CircuitBreaker.OPEN
+        assert circuit.retry_after() == pytest.approx(expected)
+
+
+def test_closing_resets_open_time():
+    clock = Clock()
+    circuit = breaker(clock)
+    trip(circuit)
+    clock.now += 10
+    call(circuit, ok=False)
+    clock.now += 20
+    call(circuit)
+    call(circuit)
+    assert circuit.state == CircuitBreaker.CLOSED
+    trip(circuit)
+    assert circuit.retry_after() == pytest.approx(10)
+
+
+def test_limiter_halves_on_overload():
+    clock = Clock()
+    limiter = AdaptiveLimiter(initial=8, min_limit=1, max_limit=8, clock=clock)
+
+    async def overload():
+        started = await limiter.acquire()
+        clock.now += 1
+        limiter.release(started, success=False, overloaded=True)
+
+    asyncio.run(overload())
+    assert limiter.limit == 4
+    asyncio.run(overload())
+    assert limiter.limit == 2
+
+
+def test_limiter_counts_inflight_overloads_once():
+    clock = Clock()
+    limiter = AdaptiveLimiter(initial=8, min_limit=1, max_limit=8, clock=clock)
+
+    async def burst():
+        started = [await limiter.acquire() for _ in range(3)]
+        clock.now += 1
+        for at in started:
+            limiter.release(at, success=False, overloaded=True)
+
+    asyncio.run(burst())
+    assert limiter.limit == 4
+    assert limiter.decreases == 1
+
+
+def test_limiter_never_drops_below_min():
+    limiter = AdaptiveLimiter(initial=2, min_limit=2, max_limit=8, clock=Clock())
+
+    async def overload():
+        limiter.release(await limiter.acquire(), success=False, overloaded=True)
+
+    asyncio.run(overload())
+    assert limiter.limit == 2
+
+
+def test_limiter_grows_back_while_saturated():
+    clock = Clock()
+    limiter = AdaptiveLimiter(initial=4, min_limit=1, max_limit=4, clock=clock)
+
+    async def saturate():
+        started = [await limiter.acquire() for _ in range(int(limiter.limit))]
+        for at in started:
+            limiter.release(at)
+
+    async def recover():
+        limiter.release(await limiter.acquire(), overloaded=True)
+        assert limiter.limit == 2
+        for _ in range(20):
+            clock.now += 1
+            await saturate()
+
+    asyncio.run(recover())
+    assert limiter.limit == 4
+    assert limiter.increases > 0
+
+
+def test_limiter_does_not_grow_when_underused():
+    limiter = AdaptiveLimiter(initial=2, min_limit=1, max_limit=8, clock=Clock())
+
+    async def single():
+        for _ in range(10):
+            limiter.release(await limiter.acquire())
+
+    asyncio.run(single())
+    assert limiter.limit == 2
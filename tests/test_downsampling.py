@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.stocks import downsample_lttb, downsample_ohlc
+
+
+def history(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(size=n).cumsum()
+    return pd.DataFrame(
+        {
+            "Open": close + rng.normal(size=n),
+            "High": close + 2,
+            "Low": close - 2,
+            "Close": close,
+            "Volume": rng.integers(100, 1000, size=n).astype("f8"),
+            "Dividends": 0.0,
+            "Stock Splits": 0.0,
+        },
+        index=pd.date_range("2026-01-01", periods=n, freq="1min", tz="UTC"),
+    )
+
+
+@pytest.mark.parametrize("downsample", [downsample_lttb, downsample_ohlc])
+@pytest.mark.parametrize("n, max_points", [(1000, 100), (101, 100), (57, 10)])
+def test_length_is_bounded(downsample, n, max_points):
+    assert len(downsample(history(n), max_points)) <= max_points
+
+
+@pytest.mark.parametrize("downsample", [downsample_lttb, downsample_ohlc])
+@pytest.mark.parametrize("n", [0, 5, 100])
+def test_short_input_returned_unchanged(downsample, n):
+    frame = history(n)
+    assert downsample(frame, 100) is frame
+
+
+def test_lttb_keeps_first_and_last_bars():
+    frame = history(1000)
+    sampled = downsample_lttb(frame, 50)
+    assert len(sampled) == 50
+    assert sampled.index[0] == frame.index[0]
+    assert sampled.index[-1] == frame.index[-1]
+
+
+def test_lttb_returns_original_bars_in_order():
+    frame = history(1000)
+    sampled = downsample_lttb(frame, 50)
+    assert sampled.index.is_monotonic_increasing
+    pd.testing.assert_frame_equal(sampled, frame.loc[sampled.index])
+
+
+def test_lttb_keeps_a_spike():
+    frame = history(1000)
+    frame.iloc[500, frame.columns.get_loc("Close")] = 1000.0
+    assert frame.index[500] in downsample_lttb(frame, 20).index
+
+
+def test_lttb_tolerates_missing_closes():
+    frame = history(200)
+    frame.iloc[::7, frame.columns.get_loc("Close")] = np.nan
+    assert len(downsample_lttb(frame, 20)) == 20
+
+
+def test_ohlc_buckets_keep_candle_semantics():
+    frame = history(1000)
+    sampled = downsample_ohlc(frame, 30)
+    starts = list(frame.index.get_indexer(sampled.index)) + [len(frame)]
+    assert starts[0] == 0
+    for i, (lo, hi) in enumerate(zip(starts, starts[1:])):
+        bucket = frame.iloc[lo:hi]
+        row = sampled.iloc[i]
+        assert row["Open"] == bucket["Open"].iloc[0]
+        assert row["High"] == bucket["High"].max()
+        assert row["Low"] == bucket["Low"].min()
+        assert row["Close"] == bucket["Close"].iloc[-1]
+        assert row["Volume"] == pytest.approx(bucket["Volume"].sum())
+
+
+def test_ohlc_keeps_first_open_and_last_close():
+    frame = history(1000)
+    sampled = downsample_ohlc(frame, 30)
+    assert sampled.index[0] == frame.index[0]
+    assert sampled["Open"].iloc[0] == frame["Open"].iloc[0]
+    assert sampled["Close"].iloc[-1] == frame["Close"].iloc[-1]
+    assert sampled["Volume"].sum() == pytest.approx(frame["Volume"].sum())
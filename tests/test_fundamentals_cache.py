@@ -0,0 +1,94 @@
+import asyncio
+import json
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from app.services.fundamentals_service import (
+    FundamentalsCache,
+    FundamentalsEntry,
+    _decode,
+    _encode,
+)
+
+
+def roundtrip(value):
+    return _decode(json.loads(json.dumps(_encode(value))))
+
+
+def test_statement_frame_roundtrip():
+    # Statements: line items by fiscal period end
+    frame = pd.DataFrame(
+        {
+            pd.Timestamp("2024-09-30"): [391.0e9, np.nan, 1],
+            pd.Timestamp("2023-09-30"): [383.3e9, 2.5, 2],
+        },
+        index=pd.Index(["Total Revenue", "EPS", "Count"]),
+    )
+    pdt.assert_frame_equal(roundtrip(frame), frame)
+
+
+def test_mixed_dtype_frame_roundtrip():
+    frame = pd.DataFrame(
+        {
+            "epsEstimate": [1.5, 1.6],
+            "surprise": pd.array([1, None], dtype="Int64"),
+            "period": ["0q", "+1q"],
+            "reported": [True, False],
+        },
+        index=pd.DatetimeIndex(["2024-01-31", "2024-04-30"], name="quarter"),
+    )
+    pdt.assert_frame_equal(roundtrip(frame), frame)
+
+
+def test_tz_aware_series_roundtrip():
+    dividends = pd.Series(
+        [0.24, 0.25],
+        index=pd.DatetimeIndex(["2024-05-10", "2024-08-12"], name="Date").tz_localize(
+            "America/New_York"
+        ),
+        name="Dividends",
+    )
+    pdt.assert_series_equal(roundtrip(dividends), dividends)
+
+
+def test_empty_series_roundtrip():
+    splits = pd.Series([], dtype="float64", name="Stock Splits")
+    pdt.assert_series_equal(roundtrip(splits), splits, check_index_type=False)
+
+
+def test_calendar_roundtrip():
+    calendar = {
+        "Dividend Date": date(2024, 8, 15),
+        "Earnings Date": [date(2024, 10, 31)],
+        "Earnings High": 1.6,
+        "Revenue Average": np.int64(94_000_000_000),
+    }
+    assert roundtrip(calendar) == calendar
+
+
+def test_unknown_types_are_refused():
+    with pytest.raises(TypeError):
+        _encode(object())
+
+
+def test_entries_reload_from_disk(tmp_path):
+    frame = pd.DataFrame({"a": [1.0]}, index=["x"])
+    entry = FundamentalsEntry(value=frame, fetched_at=1.0, expires_at=2.0)
+    asyncio.run(
+        FundamentalsCache(max_entries=4, directory=str(tmp_path)).set(
+            ("AAPL", "financials"), entry
+        )
+    )
+
+    loaded = asyncio.run(
+        FundamentalsCache(max_entries=4, directory=str(tmp_path)).get(
+            ("AAPL", "financials")
+        )
+    )
+    assert (loaded.fetched_at, loaded.expires_at) == (1.0, 2.0)
+    pdt.assert_frame_equal(loaded.value, frame)
+    assert [p.suffix for p in tmp_path.iterdir()] == [".json"]
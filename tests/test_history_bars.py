@@ -0,0 +1,178 @@
+import asyncio
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from app.services import history_service
+from app.services.history_service import (
+    BAR_DTYPE,
+    HistoryStore,
+    _merge_bars,
+    _merge_locked,
+    _missed_session,
+    _needs_full_refresh,
+    _out_of_window,
+    _refresh,
+    _trim,
+)
+from app.utils.trading_calendar import NYSE
+
+DAY = 86_400 * 10**9
+# A Thursday morning in New York; Wednesday 2026-10-14 is the last full session
+NOW = datetime(2026, 10, 15, 12, tzinfo=timezone.utc)
+
+
+def bars(*rows):
+    """Bars from (day, close) or (day, close, dividends, stock_splits) tuples."""
+    result = np.zeros(len(rows), dtype=BAR_DTYPE)
+    for i, (day, close, *actions) in enumerate(rows):
+        dividends, splits = (actions + [0.0, 0.0])[:2]
+        result[i] = (day * DAY, close, close, close, close, 100, dividends, splits)
+    return result
+
+
+def at(*stamps, tz="America/New_York"):
+    """Bars stamped at local ``stamps``."""
+    result = bars(*((0, 10.0) for _ in stamps))
+    result["timestamp"] = [pd.Timestamp(stamp, tz=tz).value for stamp in stamps]
+    return result
+
+
+def test_merge_appends_new_bars():
+    merged = _merge_bars(bars((1, 10), (2, 11)), bars((3, 12)))
+    assert list(merged["close"]) == [10, 11, 12]
+
+
+def test_merge_replaces_from_first_fresh_bar():
+    merged = _merge_bars(
+        bars((1, 10), (2, 11), (3, 12)), bars((2, 21), (3, 22), (4, 23))
+    )
+    assert list(merged["timestamp"] // DAY) == [1, 2, 3, 4]
+    assert list(merged["close"]) == [10, 21, 22, 23]
+
+
+def test_merge_without_fresh_bars_keeps_stored():
+    stored = bars((1, 10), (2, 11))
+    assert _merge_bars(stored, bars()) is stored
+
+
+def test_no_full_refresh_when_overlap_matches():
+    stored = bars((1, 10), (2, 11), (3, 12))
+    assert not _needs_full_refresh(stored, bars((2, 11), (3, 12.5), (4, 13)))
+
+
+def test_full_refresh_when_overlapping_bar_changed():
+    stored = bars((1, 10), (2, 11), (3, 12))
+    assert _needs_full_refresh(stored, bars((2, 5.5), (3, 6), (4, 6.5)))
+
+
+def test_full_refresh_when_overlap_is_missing():
+    stored = bars((1, 10), (2, 11), (3, 12))
+    assert _needs_full_refresh(stored, bars((3, 12), (4, 13)))
+
+
+def test_full_refresh_on_new_split_or_dividend():
+    stored = bars((1, 10), (2, 11), (3, 12))
+    assert _needs_full_refresh(stored, bars((2, 11), (3, 12), (4, 6, 0.0, 2.0)))
+    assert _needs_full_refresh(stored, bars((2, 11), (3, 12), (4, 12, 0.5)))
+
+
+def test_actions_already_stored_do_not_trigger_refresh():
+    stored = bars((1, 10), (2, 11), (3, 12, 0.5))
+    assert not _needs_full_refresh(stored, bars((2, 11), (3, 12, 0.5), (4, 13)))
+
+
+def test_too_little_history_never_needs_full_refresh():
+    assert not _needs_full_refresh(bars((1, 10)), bars((1, 99), (2, 100)))
+
+
+def test_overlap_older_than_intraday_window_is_out_of_window():
+    stored = at("2026-10-06 15:58", "2026-10-06 15:59")
+    assert _out_of_window(stored, "1m", NOW)
+    assert not _out_of_window(stored, "5m", NOW)
+    assert not _out_of_window(stored, "1d", NOW)
+
+
+def test_trim_drops_bars_outside_intraday_window():
+    stored = at("2026-10-07 15:59", "2026-10-09 09:30", "2026-10-14 15:59")
+    assert len(_trim(stored, "1m", NOW)) == 2
+    assert len(_trim(stored, "5m", NOW)) == 3
+    assert len(_trim(stored, "1d", NOW)) == 3
+
+
+def test_empty_fetch_behind_last_session_is_missed():
+    stored = at("2026-10-13 15:55")
+    assert _missed_session(stored, bars(), "5m", NYSE, NOW)
+    assert _missed_session(at("2026-10-12"), bars(), "1d", NYSE, NOW)
+
+
+def test_empty_fetch_up_to_last_session_is_not_missed():
+    assert not _missed_session(at("2026-10-14 15:55"), bars(), "5m", NYSE, NOW)
+    assert not _missed_session(at("2026-10-14"), bars(), "1d", NYSE, NOW)
+    # Weekly bars are stamped at the start of the week
+    assert not _missed_session(at("2026-10-12"), bars(), "1wk", NYSE, NOW)
+    assert not _missed_session(at("2026-10-13 15:55"), bars(), "5m", None, NOW)
+
+
+def test_non_empty_fetch_is_never_missed():
+    stored = at("2026-10-13 15:55")
+    assert not _missed_session(stored, at("2026-10-13 15:55"), "5m", NYSE, NOW)
+
+
+class _Provider:
+    """Returns nothing for incremental fetches and ``backfill`` for full ones."""
+
+    def __init__(self, backfill):
+        self.backfill = backfill
+        self.calls = []
+
+    async def get_history(self, symbol, *, interval, start=None, period=None):
+        self.calls.append("period" if period else "start")
+        return self.backfill if period else pd.DataFrame()
+
+
+def test_refresh_backfills_when_incremental_fetch_comes_back_empty(
+    tmp_path, monkeypatch
+):
+    store = HistoryStore(str(tmp_path))
+    monkeypatch.setattr(history_service, "history_store", store)
+    monkeypatch.setattr(history_service, "_needs_refresh", lambda *_: True)
+    # Far enough back that a session has completed since, whatever today is
+    stale = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=6)
+    stored = at(stale - pd.Timedelta(minutes=5), stale, tz=None)
+    store.write("AAPL", "5m", stored, "UTC")
+
+    recent = pd.date_range(end=pd.Timestamp.now(tz="UTC"), periods=3, freq="5min")
+    provider = _Provider(pd.DataFrame({"Close": [1.0, 2.0, 3.0]}, index=recent))
+    refreshed = asyncio.run(_refresh(provider, "AAPL", "5m"))
+
+    assert provider.calls == ["start", "period"]
+    assert list(refreshed.bars["close"]) == [1.0, 2.0, 3.0]
+    assert list(store.read("AAPL", "5m").bars["close"]) == [1.0, 2.0, 3.0]
+
+
+def test_bulk_merge_keeps_what_another_writer_stored(tmp_path, monkeypatch):
+    store = HistoryStore(str(tmp_path))
+    monkeypatch.setattr(history_service, "history_store", store)
+    # Re-adjusted and written after the bulk refresh read the store
+    store.write("AAPL", "1d", bars((1, 5), (2, 5.5)), "UTC")
+
+    entry = asyncio.run(_merge_locked("AAPL", "1d", bars((1, 10), (2, 11)), NOW))
+
+    assert list(entry.bars["close"]) == [5, 5.5]
+    assert list(store.read("AAPL", "1d").bars["close"]) == [5, 5.5]
+
+
+def test_bulk_merge_against_disk_backfills_on_changed_overlap(tmp_path, monkeypatch):
+    store = HistoryStore(str(tmp_path))
+    monkeypatch.setattr(history_service, "history_store", store)
+    monkeypatch.setattr(history_service, "_needs_refresh", lambda *_: True)
+    store.write("AAPL", "1d", bars((1, 5), (2, 5.5), (3, 6)), "UTC")
+
+    fresh = bars((2, 11), (3, 12), (4, 13))
+    assert asyncio.run(_merge_locked("AAPL", "1d", fresh, NOW)) is None
+    fresh = bars((2, 5.5), (3, 6.5), (4, 7))
+    entry = asyncio.run(_merge_locked("AAPL", "1d", fresh, NOW))
+    assert list(store.read("AAPL", "1d").bars["close"]) == [5, 5.5, 6.5, 7]
+    assert list(entry.bars["close"]) == [5, 5.5, 6.5, 7]
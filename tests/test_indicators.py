@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from app.utils.indicators import ema, rsi, wilder
+
+
+def prices(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 + rng.normal(size=n).cumsum()
+
+
+def reference_ewm(values, alpha, start, seed):
+    out = np.full(len(values), np.nan)
+    if start >= len(values):
+        return out
+    out[start] = seed
+    for t in range(start + 1, len(values)):
+        out[t] = alpha * values[t] + (1 - alpha) * out[t - 1]
+    return out
+
+
+def reference_ema(close, period):
+    if period > len(close):
+        return np.full(len(close), np.nan)
+    return reference_ewm(close, 2 / (period + 1), period - 1, close[:period].mean())
+
+
+def reference_rsi(close, period):
+    out = np.full(len(close), np.nan)
+    if period >= len(close):
+        return out
+    delta = np.diff(close)
+    gain = np.clip(delta[:period], 0, None).mean()
+    loss = np.clip(-delta[:period], 0, None).mean()
+    for t in range(period, len(close)):
+        if t > period:
+            change = delta[t - 1]
+            gain = (gain * (period - 1) + max(change, 0)) / period
+            loss = (loss * (period - 1) + max(-change, 0)) / period
+        if loss == 0:
+            out[t] = 100.0 if gain > 0 else 50.0
+        else:
+            out[t] = 100 - 100 / (1 + gain / loss)
+    return out
+
+
+# Long enough to span several closed-form blocks for every period
+@pytest.mark.parametrize("n", [0, 1, 19, 20, 21, 500, 12_000])
+@pytest.mark.parametrize("period", [1, 2, 20, 200])
+def test_ema_matches_recursion(n, period):
+    close = prices(n)
+    np.testing.assert_allclose(
+        ema(close, period), reference_ema(close, period), rtol=1e-9, equal_nan=True
+    )
+
+
+@pytest.mark.parametrize("n", [0, 1, 14, 15, 16, 500, 20_000])
+@pytest.mark.parametrize("period", [2, 14, 50])
+def test_rsi_matches_wilder_recursion(n, period):
+    close = prices(n)
+    np.testing.assert_allclose(
+        rsi(close, period), reference_rsi(close, period), rtol=1e-9, equal_nan=True
+    )
+
+
+def test_warm_up_bars_are_nan():
+    close = prices(100)
+    assert np.isnan(ema(close, 20)[:19]).all()
+    assert not np.isnan(ema(close, 20)[19:]).any()
+    assert np.isnan(rsi(close, 14)[:14]).all()
+    assert not np.isnan(rsi(close, 14)[14:]).any()
+
+
+def test_ema_seeded_with_simple_average():
+    close = prices(30)
+    assert ema(close, 20)[19] == pytest.approx(close[:20].mean())
+
+
+def test_nan_propagates_like_the_recursion():
+    close = prices(300)
+    close[150] = np.nan
+    expected = reference_ema(close, 20)
+    result = ema(close, 20)
+    np.testing.assert_allclose(result, expected, rtol=1e-9, equal_nan=True)
+    assert not np.isnan(result[19:150]).any()
+    assert np.isnan(result[150:]).all()
+
+
+def test_nan_in_seed_window_leaves_everything_undefined():
+    close = prices(100)
+    close[3] = np.nan
+    assert np.isnan(ema(close, 20)).all()
+    assert np.isnan(wilder(close, 14)).all()
+
+
+def test_rsi_edge_values():
+    assert rsi(np.arange(30.0), 14)[-1] == 100.0
+    assert rsi(np.arange(30.0)[::-1], 14)[-1] == 0.0
+    assert rsi(np.full(30, 5.0), 14)[-1] == 50.0
@@ -0,0 +1,141 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import correlation_service, history_service
+from app.services.history_service import BAR_DTYPE, StoredHistory
+from app.utils.returns import (
+    align_closes,
+    correlation,
+    covariance,
+    returns_matrix,
+    rolling_correlation,
+)
+
+
+def gappy_returns(rows=300, columns=5, seed=0):
+    """Correlated returns with NaNs at different dates in every column."""
+    rng = np.random.default_rng(seed)
+    common = rng.normal(size=(rows, 1))
+    returns = 0.6 * common + rng.normal(size=(rows, columns))
+    returns[rng.random((rows, columns)) < 0.2] = np.nan
+    returns[:40, 3] = np.nan  # a later listing
+    return returns
+
+
+def test_correlation_matches_pandas_pairwise_complete():
+    returns = gappy_returns()
+    expected = pd.DataFrame(returns).corr(min_periods=2).to_numpy()
+    np.testing.assert_allclose(correlation(returns), expected, atol=1e-12)
+
+
+def test_covariance_matches_pandas_pairwise_complete():
+    returns = gappy_returns()
+    expected = pd.DataFrame(returns).cov(min_periods=2).to_numpy()
+    np.testing.assert_allclose(covariance(returns), expected, atol=1e-12)
+
+
+def test_min_periods_blanks_sparse_pairs():
+    returns = gappy_returns(rows=50)
+    returns[:45, 4] = np.nan
+    result = correlation(returns, min_periods=10)
+    expected = pd.DataFrame(returns).corr(min_periods=10).to_numpy()
+    np.testing.assert_allclose(result, expected, atol=1e-12)
+    assert np.isnan(result[4, :4]).all()
+
+
+def reference_rolling(returns, benchmark, window, min_periods):
+    out = np.full(returns.shape, np.nan)
+    for row in range(len(returns)):
+        lo = max(0, row - window + 1)
+        for column in range(returns.shape[1]):
+            x = returns[lo : row + 1, column]
+            y = benchmark[lo : row + 1]
+            both = ~np.isnan(x) & ~np.isnan(y)
+            if both.sum() >= max(min_periods, 2):
+                out[row, column] = np.corrcoef(x[both], y[both])[0, 1]
+    return out
+
+
+@pytest.mark.parametrize("window, min_periods", [(20, 10), (63, 31), (5, 2)])
+def test_rolling_correlation_uses_trailing_window(window, min_periods):
+    returns = gappy_returns(rows=200)
+    benchmark = returns[:, 0]
+    result = rolling_correlation(returns, benchmark, window, min_periods)
+    expected = reference_rolling(returns, benchmark, window, min_periods)
+    np.testing.assert_allclose(result, expected, atol=1e-9, equal_nan=True)
+
+
+def test_rolling_correlation_with_itself_is_one():
+    returns = gappy_returns(rows=100)
+    result = rolling_correlation(returns, returns[:, 0], 20, 10)
+    defined = result[:, 0][~np.isnan(result[:, 0])]
+    assert len(defined) > 0
+    np.testing.assert_allclose(defined, 1.0)
+
+
+def test_returns_skip_over_missing_dates():
+    closes = np.array([[10.0, 20.0], [11.0, np.nan], [12.1, 22.0]])
+    returns = returns_matrix(closes)
+    assert np.isnan(returns[0]).all()
+    np.testing.assert_allclose(returns[1:, 0], [0.1, 0.1])
+    assert np.isnan(returns[1, 1])
+    assert returns[2, 1] == pytest.approx(0.1)
+
+
+def test_align_closes_on_union_of_dates():
+    days = np.array(["2026-01-02", "2026-01-05", "2026-01-06"], dtype="M8[D]")
+    union, matrix = align_closes([days, days[1:]], [np.array([1.0, 2, 3]), [5, 6]])
+    assert list(union) == list(days)
+    np.testing.assert_array_equal(matrix, [[1, np.nan], [2, 5], [3, 6]])
+
+
+def stored(days, closes):
+    bars = np.zeros(len(days), dtype=BAR_DTYPE)
+    bars["timestamp"] = pd.DatetimeIndex(days).tz_localize("America/New_York").asi8
+    bars["close"] = closes
+    return StoredHistory(bars=bars, tz="America/New_York", fetched_at=0.0)
+
+
+def test_correlation_service_aligns_symbols_on_dates(monkeypatch):
+    days = pd.bdate_range("2026-01-05", periods=80)
+    rng = np.random.default_rng(1)
+    closes = 100 * np.exp(rng.normal(0, 0.01, size=(80, 3)).cumsum(axis=0))
+    histories = {
+        "AAA": stored(days, closes[:, 0]),
+        "BBB": stored(days[::2], closes[::2, 1]),  # trades every other day
+        "CCC": stored(days[10:], closes[10:, 2]),
+    }
+
+    async def get_stored_histories(provider, symbols, **kwargs):
+        return {s: histories[s] for s in symbols if s in histories}, {}
+
+    monkeypatch.setattr(history_service, "get_stored_histories", get_stored_histories)
+    result = asyncio.run(
+        correlation_service.get_correlation(
+            None,
+            ["aaa", "BBB", "CCC", "ZZZ"],
+            period="max",
+            window=20,
+            concurrency=1,
+            deadline=1,
+        )
+    )
+
+    assert result["symbols"] == ["AAA", "BBB", "CCC"]
+    assert result["errors"] == {"ZZZ": "No price data found."}
+    frame = pd.DataFrame(
+        {
+            s: history_service.bars_to_frame(h.bars, h.tz, "1d")["Close"]
+            for s, h in histories.items()
+        }
+    )
+    frame.index = frame.index.tz_localize(None)
+    expected = frame.apply(lambda c: c.dropna().pct_change()).iloc[1:]
+    np.testing.assert_allclose(
+        result["correlation"], expected.corr().to_numpy(), atol=1e-12
+    )
+    assert result["rolling_correlation"]["benchmark"] == "AAA"
+    assert len(result["rolling_correlation"]["values"]["CCC"]) == len(result["dates"])
@@ -0,0 +1,167 @@
+import math
+
+import pytest
+
+from app.schemas.screener import ScreenerCondition
+from app.utils.screener import canonical_conditions
+from app.utils.screener_engine import EquityUniverse, UnsupportedScreen
+
+ROWS = [
+    {
+        "symbol": "AAA",
+        "region": "us",
+        "sector": "Technology",
+        "exchange": "NMS",
+        "regularMarketPrice": 10.0,
+        "marketCap": 3e9,
+        "trailingPE": 12.0,
+    },
+    {
+        "symbol": "BBB",
+        "region": "us",
+        "sector": "Energy",
+        "exchange": "NYQ",
+        "regularMarketPrice": 50.0,
+        "marketCap": 1e9,
+    },
+    {
+        "symbol": "CCC",
+        "region": "us",
+        "sector": "Technology",
+        "exchange": "NYQ",
+        "regularMarketPrice": 30.0,
+        "marketCap": 2e9,
+        "trailingPE": 40.0,
+    },
+    {
+        "symbol": "DDD",
+        "region": "gb",
+        "sector": "Technology",
+        "exchange": "LSE",
+        "regularMarketPrice": 20.0,
+        "marketCap": 5e9,
+        "trailingPE": 8.0,
+    },
+]
+
+
+@pytest.fixture
+def universe():
+    return EquityUniverse.from_rows(ROWS, ["us"])
+
+
+def screen(universe, conditions, logical_operator="and", **kwargs):
+    conditions, logical_operator = canonical_conditions(
+        [ScreenerCondition(field=f, operator=op, value=v) for f, op, v in conditions],
+        logical_operator,
+    )
+    return universe.screen(conditions, logical_operator, **kwargs)
+
+
+def symbols(result):
+    return [quote["symbol"] for quote in result["quotes"]]
+
+
+def test_from_rows_dedupes_and_sorts_by_symbol():
+    universe = EquityUniverse.from_rows([ROWS[2], ROWS[0], ROWS[2]], ["us"])
+    assert [row["symbol"] for row in universe.rows] == ["AAA", "CCC"]
+
+
+def test_screen_filters_within_loaded_region(universe):
+    result = screen(
+        universe,
+        [("region", "eq", "us"), ("sector", "eq", "technology")],
+    )
+    assert symbols(result) == ["AAA", "CCC"]
+    assert result["total"] == 2
+
+
+def test_missing_values_match_no_condition(universe):
+    result = screen(
+        universe, [("region", "eq", "us"), ("peratio.lasttwelvemonths", "lt", 100)]
+    )
+    assert symbols(result) == ["AAA", "CCC"]
+
+
+def test_btwm_is_inclusive(universe):
+    result = screen(
+        universe, [("region", "eq", "US"), ("intradayprice", "btwm", ["10", "30"])]
+    )
+    assert symbols(result) == ["AAA", "CCC"]
+
+
+def test_sort_and_page(universe):
+    result = screen(
+        universe,
+        [("region", "eq", "us")],
+        sort_field="intradaymarketcap",
+        sort_asc=False,
+        offset=1,
+        limit=1,
+    )
+    assert symbols(result) == ["CCC"]
+    assert result == {"quotes": result["quotes"], "count": 1, "total": 3}
+
+
+def test_nan_sorts_last(universe):
+    result = screen(
+        universe,
+        [("region", "eq", "us")],
+        sort_field="peratio.lasttwelvemonths",
+    )
+    assert symbols(result) == ["AAA", "CCC", "BBB"]
+
+
+@pytest.mark.parametrize(
+    "conditions, logical_operator",
+    [
+        # Not limited to loaded regions
+        ([("sector", "eq", "technology")], "and"),
+        ([("region", "is-in", ["us", "gb"])], "and"),
+        # OR can reach rows outside the snapshot
+        ([("region", "eq", "us"), ("intradayprice", "gt", 5)], "or"),
+        # Field not held locally
+        ([("region", "eq", "us"), ("eodvolume", "gt", 5)], "and"),
+        # Range operator on a category
+        ([("region", "eq", "us"), ("sector", "gt", "a")], "and"),
+    ],
+)
+def test_unsupported_screens_are_refused(universe, conditions, logical_operator):
+    with pytest.raises(UnsupportedScreen):
+        screen(universe, conditions, logical_operator)
+
+
+def test_unknown_sort_field_is_refused(universe):
+    with pytest.raises(UnsupportedScreen):
+        screen(universe, [("region", "eq", "us")], sort_field="eodvolume")
+
+
+def test_intraday_fields_are_refused_once_stale(universe):
+    universe.built_at -= 120
+    with pytest.raises(UnsupportedScreen):
+        screen(
+            universe,
+            [("region", "eq", "us"), ("intradayprice", "gt", 5)],
+            intraday_max_age=60,
+        )
+    with pytest.raises(UnsupportedScreen):
+        screen(
+            universe,
+            [("region", "eq", "us")],
+            sort_field="intradaymarketcap",
+            intraday_max_age=60,
+        )
+    # Slower-moving fields are still answered
+    result = screen(
+        universe,
+        [("region", "eq", "us"), ("peratio.lasttwelvemonths", "gt", 20)],
+        intraday_max_age=60,
+    )
+    assert symbols(result) == ["CCC"]
+
+
+def test_nan_is_stored_for_non_numeric_values():
+    universe = EquityUniverse.from_rows(
+        [{"symbol": "X", "region": "us", "regularMarketPrice": "n/a"}], ["us"]
+    )
+    assert math.isnan(universe.numeric["intradayprice"][0])
@@ -0,0 +1,256 @@
+import math
+
+import pytest
+import yfinance as yf
+
+from app.schemas.screener import ScreenerCondition
+from app.utils.screener import (
+    _merge_and,
+    _merge_or,
+    _Range,
+    build_equity_query,
+    canonical_conditions,
+    plan_query,
+    screener_fingerprint,
+)
+
+Q = yf.EquityQuery
+
+
+def price(op, *values):
+    return Q(op, ["intradayprice", *values])
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# _Range
+# ---------------------------------------------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "interval, empty",
+    [
+        (_Range(5, True, 5, True), False),
+        (_Range(5, True, 5, False), True),
+        (_Range(5, False, 5, True), True),
+        (_Range(6, True, 5, True), True),
+        (_Range(), False),
+    ],
+)
+def test_range_empty(interval, empty):
+    assert interval.empty is empty
+
+
+def test_range_contains_respects_closed_ends():
+    interval = _Range(1, True, 2, False)
+    assert 1 in interval
+    assert 1.5 in interval
+    assert 2 not in interval
+    assert 0.5 not in interval
+
+
+def test_intersect_touching_open_end_is_empty():
+    above = _Range(low=5, low_closed=False)
+    below = _Range(high=5, high_closed=True)
+    assert above.intersect(below).empty
+
+
+def test_intersect_touching_closed_ends_is_a_point():
+    above = _Range(low=5, low_closed=True)
+    below = _Range(high=5, high_closed=True)
+    assert above.intersect(below) == _Range(5, True, 5, True)
+
+
+def test_intersect_keeps_the_tighter_end():
+    assert _Range(1, True, 10, True).intersect(_Range(1, False, 8, True)) == _Range(
+        1, False, 8, True
+    )
+
+
+def test_union_of_open_ends_that_touch_is_not_one_interval():
+    assert _Range(high=5).union(_Range(low=5)) is None
+
+
+def test_union_of_touching_ends_with_one_closed():
+    merged = _Range(high=5, high_closed=True).union(_Range(low=5, high=10))
+    assert merged == _Range(high=10)
+
+
+def test_union_of_disjoint_ranges():
+    assert _Range(1, True, 2, True).union(_Range(3, True, 4, True)) is None
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# _merge_and / _merge_or
+# ---------------------------------------------------------------------------------------------------------------------
+
+
+def test_merge_and_intersects_ranges_per_field():
+    merged = _merge_and(
+        [
+            ("range", "x", _Range(low=1, low_closed=True)),
+            ("range", "x", _Range(high=10)),
+            ("range", "y", _Range(low=0)),
+        ]
+    )
+    assert ("range", "x", _Range(1, True, 10, False)) in merged
+    assert ("range", "y", _Range(low=0)) in merged
+
+
+def test_merge_and_empty_range_matches_nothing():
+    assert (
+        _merge_and([("range", "x", _Range(low=10)), ("range", "x", _Range(high=5))])
+        is None
+    )
+
+
+def test_merge_and_filters_is_in_values_by_range():
+    merged = _merge_and(
+        [
+            ("in", "x", frozenset({1, 5, 10})),
+            ("range", "x", _Range(low=4, low_closed=True)),
+        ]
+    )
+    assert merged == [("in", "x", frozenset({5, 10}))]
+
+
+def test_merge_and_is_in_outside_range_matches_nothing():
+    assert (
+        _merge_and([("in", "x", frozenset({1, 2})), ("range", "x", _Range(low=3))])
+        is None
+    )
+
+
+def test_merge_and_intersects_is_in_values():
+    assert _merge_and(
+        [("in", "region", frozenset({"us", "gb"})), ("in", "region", {"gb", "de"})]
+    ) == [("in", "region", frozenset({"gb"}))]
+
+
+def test_merge_or_unions_overlapping_ranges():
+    merged = _merge_or(
+        [
+            ("range", "x", _Range(1, True, 5, True)),
+            ("range", "x", _Range(3, True, 8, True)),
+        ]
+    )
+    assert merged == [("range", "x", _Range(1, True, 8, True))]
+
+
+def test_merge_or_keeps_ranges_whose_union_is_unbounded():
+    above, below = _Range(low=5), _Range(high=10)
+    merged = _merge_or([("range", "x", above), ("range", "x", below)])
+    assert len(merged) == 2
+    assert {interval for _, _, interval in merged} == {above, below}
+
+
+def test_merge_or_unions_is_in_values():
+    assert _merge_or(
+        [("in", "region", frozenset({"us"})), ("in", "region", frozenset({"gb"}))]
+    ) == [("in", "region", frozenset({"us", "gb"}))]
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# plan_query
+# ---------------------------------------------------------------------------------------------------------------------
+
+
+def test_plan_contradiction_is_none():
+    assert plan_query(Q("and", [price("gt", 10), price("lt", 5)])) is None
+
+
+def test_plan_touching_open_ends_is_none():
+    assert plan_query(Q("and", [price("gt", 5), price("lte", 5)])) is None
+
+
+def test_plan_touching_closed_ends_is_eq():
+    planned = plan_query(Q("and", [price("gte", 5), price("lte", 5)]))
+    assert planned.to_dict() == price("eq", 5).to_dict()
+
+
+def test_plan_closed_range_is_btwn():
+    planned = plan_query(Q("and", [price("gte", 5), price("lte", 20), price("lt", 30)]))
+    assert planned.to_dict() == price("btwn", 5, 20).to_dict()
+
+
+def test_plan_or_unbounded_union_is_kept_as_is():
+    planned = plan_query(Q("or", [price("gt", 5), price("lt", 10)]))
+    assert planned.to_dict() == Q("or", [price("gt", 5), price("lt", 10)]).to_dict()
+
+
+def test_plan_or_of_eq_becomes_is_in():
+    planned = plan_query(
+        Q("or", [Q("eq", ["region", "us"]), Q("eq", ["region", "gb"])])
+    )
+    assert planned.to_dict() == Q("is-in", ["region", "gb", "us"]).to_dict()
+
+
+def test_plan_is_in_intersected_with_range():
+    planned = plan_query(
+        Q("and", [Q("is-in", ["intradayprice", 1, 5, 10]), price("gt", 4)])
+    )
+    assert planned.to_dict() == Q("is-in", ["intradayprice", 5, 10]).to_dict()
+
+
+def test_plan_flattens_nested_groups():
+    nested = Q("and", [price("gt", 1), Q("eq", ["region", "us"])])
+    planned = plan_query(Q("and", [nested, Q("and", [price("lt", 9), price("gt", 2)])]))
+    assert (
+        planned.to_dict()
+        == plan_query(
+            Q("and", [price("gt", 2), price("lt", 9), Q("eq", ["region", "us"])])
+        ).to_dict()
+    )
+    assert len(planned.operands) == 3
+
+
+def test_equivalent_screens_share_a_fingerprint():
+    first = plan_query(Q("and", [Q("eq", ["region", "us"]), price("gt", 10)]))
+    second = plan_query(
+        Q("and", [price("gt", 10.0), price("gt", 5), Q("eq", ["region", "us"])])
+    )
+    assert screener_fingerprint(first) == screener_fingerprint(second)
+
+
+def test_unbounded_bound_is_not_emitted():
+    planned = plan_query(price("gt", 3))
+    assert not any(isinstance(v, float) and math.isinf(v) for v in planned.operands)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Request conditions
+# ---------------------------------------------------------------------------------------------------------------------
+
+
+def cond(field, operator, value):
+    return ScreenerCondition(field=field, operator=operator, value=value)
+
+
+def test_canonical_conditions_ignore_order_case_and_duplicates():
+    first = canonical_conditions(
+        [cond("region", "IS-IN", ["us", "gb", "us"]), cond("intradayprice", "gt", 5.0)],
+        "AND",
+    )
+    second = canonical_conditions(
+        [
+            cond("intradayprice", "gt", 5),
+            cond("region", "is-in", ["gb", "us"]),
+            cond("intradayprice", "gt", 5),
+        ],
+        "and",
+    )
+    assert first == second
+
+
+def test_build_query_converts_btwm_and_numeric_strings():
+    query = build_equity_query([cond("intradayprice", "btwm", ["5", "20"])], "and")
+    assert query.to_dict() == price("btwn", 5, 20).to_dict()
+
+
+def test_build_query_contradiction_is_none():
+    assert (
+        build_equity_query(
+            [cond("intradayprice", "gt", "10"), cond("intradayprice", "lt", "5")],
+            "and",
+        )
+        is None
+    )
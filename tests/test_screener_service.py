@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from app.services import screener_service
+from app.services.screener_service import YAHOO_MAX_SCREEN_SIZE, _blocks, _screen_rows
+
+
+@pytest.mark.parametrize(
+    "offset, limit, blocks",
+    [
+        (0, 50, [(0, 50)]),
+        (10, 20, [(0, 50)]),
+        (60, 50, [(50, 100)]),
+        (30, 240, [(0, 250), (250, 50)]),
+        (10, 250, [(0, 250), (250, 50)]),
+        (200, 250, [(200, 250)]),
+    ],
+)
+def test_blocks_cover_rows_within_yahoo_limit(offset, limit, blocks):
+    assert _blocks(offset, limit) == blocks
+    assert all(size <= YAHOO_MAX_SCREEN_SIZE for _, size in blocks)
+    assert blocks[0][0] <= offset
+    assert sum(blocks[-1]) >= offset + limit
+
+
+class _Provider:
+    def __init__(self):
+        self.calls = []
+
+    async def screen(self, query, *, size, offset=0, **kwargs):
+        self.calls.append((offset, size))
+        return {"quotes": [{"row": row} for row in range(offset, offset + size)]}
+
+
+def test_split_blocks_are_stitched_together(monkeypatch):
+    monkeypatch.setattr(
+        screener_service.screen_cache, "get_or_fetch", lambda key, fetch: fetch()
+    )
+    provider = _Provider()
+    data = asyncio.run(_screen_rows(provider, ("test",), None, offset=30, limit=240))
+    assert provider.calls == [(0, 250), (250, 50)]
+    assert [quote["row"] for quote in data["quotes"]] == list(range(30, 270))
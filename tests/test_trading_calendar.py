@@ -0,0 +1,146 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.utils.trading_calendar import (
+    HKEX,
+    LSE,
+    NYSE,
+    _easter,
+    _orthodox_easter,
+    market_status,
+)
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "year, easter",
+    [
+        (2000, date(2000, 4, 23)),
+        (2019, date(2019, 4, 21)),
+        (2024, date(2024, 3, 31)),
+        (2025, date(2025, 4, 20)),
+        (2026, date(2026, 4, 5)),
+        (2038, date(2038, 4, 25)),
+    ],
+)
+def test_easter(year, easter):
+    assert _easter(year) == easter
+
+
+@pytest.mark.parametrize(
+    "year, easter",
+    [
+        (2021, date(2021, 5, 2)),
+        (2023, date(2023, 4, 16)),
+        (2024, date(2024, 5, 5)),
+        (2025, date(2025, 4, 20)),
+        (2026, date(2026, 4, 12)),
+    ],
+)
+def test_orthodox_easter(year, easter):
+    assert _orthodox_easter(year) == easter
+
+
+@pytest.mark.parametrize(
+    "day, trades",
+    [
+        # Independence Day on a Saturday is observed on the Friday
+        (date(2026, 7, 3), False),
+        (date(2026, 7, 6), True),
+        # New Year's Day on a Saturday is not observed at all
+        (date(2021, 12, 31), True),
+        (date(2022, 1, 3), True),
+        # ...but on a Sunday it moves to the Monday
+        (date(2023, 1, 2), False),
+        (date(2022, 12, 26), False),
+        (date(2026, 4, 3), False),  # Good Friday
+        (date(2026, 11, 26), False),  # Thanksgiving
+        (date(2021, 6, 18), True),  # Juneteenth only from 2022
+        (date(2022, 6, 20), False),
+    ],
+)
+def test_us_holidays(day, trades):
+    assert (NYSE.session(day) is not None) == trades
+
+
+@pytest.mark.parametrize(
+    "day, close",
+    [
+        (date(2026, 11, 27), utc(2026, 11, 27, 18)),  # day after Thanksgiving
+        (date(2026, 12, 24), utc(2026, 12, 24, 18)),
+        (date(2025, 7, 3), utc(2025, 7, 3, 17)),
+        (date(2026, 12, 23), utc(2026, 12, 23, 21)),
+    ],
+)
+def test_us_early_closes(day, close):
+    session = NYSE.session(day)
+    assert session.close == close
+    assert session.early_close == (close.hour != 21)
+
+
+def test_early_close_skipped_when_day_is_a_holiday():
+    # July 3 2026 is the observed Independence Day
+    assert NYSE.session(date(2026, 7, 3)) is None
+
+
+@pytest.mark.parametrize(
+    "year, holidays",
+    [
+        # Christmas on a Saturday, Boxing Day on a Sunday
+        (2021, {date(2021, 12, 27), date(2021, 12, 28)}),
+        # Christmas on a Sunday
+        (2022, {date(2022, 12, 26), date(2022, 12, 27)}),
+        (2026, {date(2026, 12, 25), date(2026, 12, 28)}),
+    ],
+)
+def test_uk_christmas_substitute_days(year, holidays):
+    december = {day for day in LSE.holidays_in(year) if day.month == 12}
+    assert december == holidays
+
+
+def test_uk_new_year_substitute_day():
+    assert date(2022, 1, 3) in LSE.holidays_in(2022)
+    assert LSE.session(date(2022, 1, 3)) is None
+
+
+@pytest.mark.parametrize(
+    "now, ttl",
+    [
+        (utc(2026, 10, 16, 15), 60),  # Friday session
+        (utc(2026, 10, 17, 0, 30), 55.5 * 3600),  # until Monday's pre-market
+        (utc(2026, 10, 18, 20), 12 * 3600),
+        (utc(2026, 10, 19, 7, 59, 30), 60),  # never below the active TTL
+    ],
+)
+def test_cache_ttl_across_weekend(now, ttl):
+    assert NYSE.cache_ttl(60, 7 * 24 * 3600, now) == pytest.approx(ttl)
+
+
+def test_cache_ttl_capped_by_max():
+    assert NYSE.cache_ttl(60, 3600, utc(2026, 10, 17, 12)) == 3600
+
+
+# Wednesday 11:00 in Hong Kong, 23:00 on Tuesday in New York
+HONG_KONG_MORNING = utc(2026, 10, 14, 3)
+
+
+def test_unmodelled_holidays_report_unknown_while_open():
+    status = market_status([HKEX], HONG_KONG_MORNING)
+    assert status["status"] == "unknown"
+    assert status["session"] == "regular"
+    assert market_status([NYSE], HONG_KONG_MORNING)["status"] == "closed"
+
+
+def test_status_of_several_exchanges_prefers_certain_open():
+    assert market_status([NYSE, HKEX], HONG_KONG_MORNING)["status"] == "unknown"
+    overlap = utc(2026, 10, 14, 14)
+    assert market_status([NYSE, LSE], overlap)["status"] == "open"
+    assert market_status([HKEX, LSE], overlap)["status"] == "open"
+
+
+def test_unmodelled_holidays_still_closed_outside_hours():
+    assert market_status([HKEX], utc(2026, 10, 17, 3))["status"] == "closed"